@@ -0,0 +1,32 @@
+"""
+This file implements the way to run the job analysis workers service.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.0.1"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import argparse
+
+from queuemanager import create_app
+
+parser = argparse.ArgumentParser(description='Run the queue manager job analysis workers')
+parser.add_argument('--processes', type=int, default=None,
+                    help='Number of worker processes (Default: ANALYSIS_WORKER_PROCESSES or the number of cores)')
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    app = create_app(__name__, enabled_modules=set())
+
+    if app.config.get('ANALYSIS_QUEUE') is None:
+        parser.exit(1, "ANALYSIS_QUEUE isn't set, the jobs are analyzed by the Socket.IO server\n")
+
+    from queuemanager.analysis import AnalysisWorkerPool
+    processes = args.processes or app.config.get('ANALYSIS_WORKER_PROCESSES')
+    app.logger.info("Starting the analysis workers...")
+    AnalysisWorkerPool(processes, name=__name__).run()
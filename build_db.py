@@ -37,3 +37,8 @@ if __name__ == '__main__':
     from queuemanager.database import init_app, init_db
     init_app(app)
     init_db(app)
+
+    # The running servers reload the materials and extruder types catalog
+    from queuemanager.catalog import catalog_idx
+    catalog_idx.init_app(app)
+    catalog_idx.invalidate()
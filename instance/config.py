@@ -20,8 +20,49 @@ class Config(object):
     SWAGGER_UI_DOC_EXPANSION = 'list'
 
     FILE_MANAGER_UPLOAD_DIR = './uploaded_files/'
+    FILE_MANAGER_SHARD_LEVELS = 2
+    FILE_MANAGER_ACCEL_REDIRECT_PREFIX = '/files/'
+    FILE_MANAGER_ANALYSIS_CACHE_PATH = './analysis_cache.sqlite3'
+    FILE_MANAGER_ANALYSIS_CACHE_SIZE = 10000
+    FILE_MANAGER_RECONCILER_CURSOR_PATH = './reconciler_cursor.json'
+    FILE_MANAGER_RECONCILER_QUARANTINE_DIR = './quarantined_files/'
+    FILE_MANAGER_RECONCILER_BATCH_SIZE = 100
+    FILE_MANAGER_RECONCILER_RATE = 50
+    FILE_MANAGER_RECONCILER_GRACE_PERIOD = 3600
+    FILE_MANAGER_COLD_STORAGE_DIR = './cold_files/'
+    FILE_MANAGER_COLD_STORAGE_COMPRESSION = 'gzip'
+    FILE_MANAGER_COLD_STORAGE_QUOTA = 50 * 1024 * 1024 * 1024
+    FILE_MANAGER_COLD_STORAGE_AFTER_DAYS = 30
+    FILE_MANAGER_PRECOMPRESSED_ENCODINGS = ['gzip']
+    FILE_MANAGER_STORAGE_BACKEND = 'local'
+    FILE_MANAGER_S3_BUCKET = None
+    FILE_MANAGER_S3_PREFIX = ''
+    FILE_MANAGER_S3_ENDPOINT_URL = None
+    FILE_MANAGER_S3_REGION = None
+    FILE_MANAGER_S3_ACCESS_KEY_ID = None
+    FILE_MANAGER_S3_SECRET_ACCESS_KEY = None
 
     SOCKETIO_MESSAGE_QUEUE = "redis://redis.dev.server:6379/1"
+    SOCKETIO_PREFETCH_TIME_LEFT = 600
+    SOCKETIO_PROGRESS_PERSIST_INTERVAL = 30
+    SOCKETIO_PROGRESS_PERSIST_DELTA = 5.0
+    SOCKETIO_PROGRESS_FLUSH_INTERVAL = 30
+    SOCKETIO_JOBS_UPDATED_WINDOW = 0.15
+    SOCKETIO_JOBS_UPDATED_AT_REQUEST_END = True
+    SOCKETIO_JOBS_DELTA = True
+    SOCKETIO_TEMPERATURES_MAX_EXTRUDERS = 2
+    SOCKETIO_TEMPERATURES_RAW_SIZE = 600
+    SOCKETIO_TEMPERATURES_10S_SIZE = 360
+    SOCKETIO_TEMPERATURES_1M_SIZE = 1440
+    SOCKETIO_TELEMETRY_RATES = [0.2, 1.0, 5.0]
+    SOCKETIO_TELEMETRY_DEFAULT_RATE = 1.0
+    SOCKETIO_PAYLOAD_CACHE_SIZE = 1024
+    JOB_CHANGES_HISTORY_SIZE = 10000
+
+    # Set it to a Redis URL to analyze the jobs in the analysis service (analysis_service.py), that must be running
+    ANALYSIS_QUEUE = None
+    ANALYSIS_QUEUE_KEY = "queuemanager:analysis"
+    ANALYSIS_WORKER_PROCESSES = None
 
     IDENTITY_HEADER = "X-Identity"
     AUTHORIZATION_HEADER = "Authorization"
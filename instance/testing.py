@@ -13,5 +13,19 @@ class Config(_Config):
     }
 
     SOCKETIO_MESSAGE_QUEUE = None
+    SOCKETIO_JOBS_UPDATED_WINDOW = 0
+    SOCKETIO_JOBS_UPDATED_AT_REQUEST_END = False
+    SOCKETIO_JOBS_DELTA = False
+    SOCKETIO_PROGRESS_PERSIST_INTERVAL = 0
+    SOCKETIO_PROGRESS_FLUSH_INTERVAL = 0
+    SOCKETIO_TELEMETRY_DEFAULT_RATE = None
+
+    ANALYSIS_QUEUE = None
 
     FILE_MANAGER_UPLOAD_DIR = './files/'
+    FILE_MANAGER_SHARD_LEVELS = 0
+    FILE_MANAGER_RECONCILER_CURSOR_PATH = None
+    FILE_MANAGER_RECONCILER_QUARANTINE_DIR = None
+    FILE_MANAGER_RECONCILER_RATE = None
+    FILE_MANAGER_COLD_STORAGE_DIR = None
+    FILE_MANAGER_ANALYSIS_CACHE_PATH = ':memory:'
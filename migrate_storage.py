@@ -0,0 +1,23 @@
+"""
+This file implements the migration of the stored files to the sharded directory layout.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.0.1"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from queuemanager import create_app
+
+
+if __name__ == "__main__":
+    app = create_app(__name__, enabled_modules={"app-database", "file-storage"})
+
+    with app.app_context():
+        from queuemanager.file_storage import file_mgr
+        app.logger.info("Moving the stored files to the sharded layout...")
+        migrated_files = file_mgr.migrate_to_sharded_layout()
+        app.logger.info("{} files moved to the sharded layout".format(migrated_files))
@@ -76,11 +76,16 @@ def create_app(name=__name__, testing=False, init_db_manager_values=False, enabl
         if "app-database" in enabled_modules:
             from .database import init_app as db_init_app
             db_init_app(app)
+            from .catalog import init_app as catalog_init_app
+            catalog_init_app(app)
 
         # Init the database manager values
         if init_db_manager_values and "app-database" in enabled_modules:
             from .database import db_mgr
             db_mgr.init_static_values()
+            # Load the materials and extruder types catalog in memory
+            from .catalog import catalog_idx
+            catalog_idx.load()
             # If the server is in 'development' or 'testing' mode, initialize the printers and jobs state
             if app.config.get("ENV") in ("development", "testing"):
                 db_mgr.init_printers_state()
@@ -0,0 +1,14 @@
+"""
+This module implements the background job analysis service.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from .queues import LocalAnalysisQueue, RedisAnalysisQueue, create_analysis_queue, get_consumer_name
+from .worker import AnalysisWorker, AnalysisWorkerPool, ANALYSIS_WORKER_MODULES
@@ -0,0 +1,137 @@
+"""
+This module implements the queues used for sending the job analysis requests to the analysis workers.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import json
+import queue
+import socket
+
+
+class LocalAnalysisQueue(object):
+    """
+    This class implements an in-process analysis queue. It's only useful when the worker runs in the same process,
+    for example in the tests.
+    """
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, job_id: int, room: str = None):
+        self._queue.put((job_id, room))
+
+    def get(self, timeout: float = None):
+        """
+        Return the next (job id, room) request or None if there isn't any request after 'timeout' seconds.
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def recover(self):
+        # The requests of the process are lost with it, there's nothing to recover
+        return 0
+
+    def ack(self):
+        """
+        Mark the last request returned by get() as processed.
+        """
+        pass
+
+    def __len__(self):
+        return self._queue.qsize()
+
+
+class RedisAnalysisQueue(object):
+    """
+    This class implements the analysis queue shared between the Socket.IO servers and the analysis workers using
+    a Redis list.
+
+    When the queue is used by a consumer (an analysis worker), every request is moved atomically to the processing
+    list of the consumer when it's taken, and it's only removed from there when the consumer acknowledges it. If the
+    worker dies in the middle of an analysis, the request is still in its processing list, and it's sent back to the
+    queue when a worker with the same consumer name starts again (see recover()). So every request is delivered at
+    least once.
+    """
+    def __init__(self, url: str, key: str = "queuemanager:analysis", consumer: str = None):
+        import redis
+        self.key = key
+        self.consumer = consumer
+        self.processing_key = "{}:processing:{}".format(key, consumer) if consumer is not None else None
+        self._redis = redis.StrictRedis.from_url(url)
+        self._processing_item = None
+
+    def put(self, job_id: int, room: str = None):
+        self._redis.lpush(self.key, json.dumps({"job_id": job_id, "room": room}))
+
+    def recover(self):
+        """
+        Send back to the queue the requests that a previous worker with the same consumer name didn't acknowledge.
+        Returns the number of recovered requests.
+        """
+        if self.processing_key is None:
+            return 0
+
+        recovered_requests = 0
+        while self._redis.rpoplpush(self.processing_key, self.key) is not None:
+            recovered_requests += 1
+        return recovered_requests
+
+    def get(self, timeout: float = None):
+        """
+        Return the next (job id, room) request or None if there isn't any request after 'timeout' seconds.
+        """
+        timeout = 0 if timeout is None else max(1, int(timeout))
+
+        if self.processing_key is None:
+            item = self._redis.brpop(self.key, timeout=timeout)
+            item = item[1] if item is not None else None
+        else:
+            item = self._redis.brpoplpush(self.key, self.processing_key, timeout=timeout)
+            self._processing_item = item
+
+        if item is None:
+            return None
+
+        request = json.loads(item.decode())
+        return request["job_id"], request["room"]
+
+    def ack(self):
+        """
+        Mark the last request returned by get() as processed, removing it from the processing list.
+        """
+        if self._processing_item is not None:
+            self._redis.lrem(self.processing_key, 1, self._processing_item)
+            self._processing_item = None
+
+    def __len__(self):
+        return self._redis.llen(self.key)
+
+
+def get_consumer_name(index: int):
+    """
+    Return the consumer name of the worker with this index in the pool of this host.
+    """
+    return "{}:{}".format(socket.gethostname(), index)
+
+
+def create_analysis_queue(url: str, key: str = "queuemanager:analysis", consumer: str = None):
+    """
+    Create the analysis queue for the given URL. Returns None if the URL is None, that means that the jobs are
+    analyzed inline by the Socket.IO server. The consumer name is only given by the analysis workers.
+    """
+    if url is None:
+        return None
+    elif url == "local":
+        return LocalAnalysisQueue()
+    elif url.startswith("redis://"):
+        return RedisAnalysisQueue(url, key, consumer)
+    else:
+        raise ValueError("Unknown analysis queue URL '{}'".format(url))
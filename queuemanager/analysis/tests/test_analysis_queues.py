@@ -0,0 +1,37 @@
+"""
+This module implements the analysis queues test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import pytest
+
+from ..queues import LocalAnalysisQueue, create_analysis_queue
+
+
+def test_local_analysis_queue():
+    analysis_queue = LocalAnalysisQueue()
+
+    analysis_queue.put(1, "room-1")
+    analysis_queue.put(2)
+
+    assert len(analysis_queue) == 2
+    assert analysis_queue.get(timeout=0) == (1, "room-1")
+    assert analysis_queue.get(timeout=0) == (2, None)
+    analysis_queue.ack()
+    assert analysis_queue.get(timeout=0) is None
+    assert analysis_queue.recover() == 0
+
+
+def test_create_analysis_queue():
+    assert create_analysis_queue(None) is None
+    assert isinstance(create_analysis_queue("local"), LocalAnalysisQueue)
+
+    with pytest.raises(ValueError):
+        create_analysis_queue("unknown://queue")
@@ -0,0 +1,140 @@
+"""
+This module implements the job analysis workers.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import multiprocessing
+import os
+import signal
+import time
+
+from .queues import create_analysis_queue, get_consumer_name
+
+# Modules enabled in the analysis worker processes
+ANALYSIS_WORKER_MODULES = {
+    "app-database",
+    "file-storage",
+    "socketio-ext"
+}
+
+
+class AnalysisWorker(object):
+    """
+    This class consumes the analysis requests of the queue and analyzes the jobs. The result is sent to the client
+    that requested the analysis (and the 'jobs_updated' event to all the clients) through the Socket.IO message queue.
+    """
+    def __init__(self, app, analysis_queue, socketio_manager=None):
+        self.app = app
+        self.analysis_queue = analysis_queue
+        self.processed_jobs = 0
+        self._stopped = False
+
+        # Set the SocketIOManager object
+        if socketio_manager is None:
+            from ..socketio import socketio_mgr
+            self.socketio_manager = socketio_mgr
+        else:
+            self.socketio_manager = socketio_manager
+
+    def process_next(self, timeout: float = None):
+        """
+        Analyze the next job in the queue. Returns False if there wasn't any request after 'timeout' seconds.
+        """
+        request = self.analysis_queue.get(timeout=timeout)
+        if request is None:
+            return False
+
+        job_id, room = request
+
+        with self.app.app_context():
+            try:
+                self.socketio_manager.run_job_analysis(job_id, room=room)
+            except Exception as e:
+                self.app.logger.exception("Unexpected error analyzing the job with ID {}: {}".format(job_id, e))
+
+        # The failed analyses are acknowledged too, they would fail again
+        self.analysis_queue.ack()
+        self.processed_jobs += 1
+        return True
+
+    def run(self, timeout: float = 1.0):
+        recovered_requests = self.analysis_queue.recover()
+        if recovered_requests:
+            self.app.logger.warning("{} unfinished analysis requests sent back to the queue".format(
+                recovered_requests))
+
+        while not self._stopped:
+            self.process_next(timeout=timeout)
+
+    def stop(self):
+        self._stopped = True
+
+
+def _run_worker_process(name: str, index: int):
+    from .. import create_app
+    app = create_app(name, init_db_manager_values=True, enabled_modules=ANALYSIS_WORKER_MODULES)
+    # The worker restarted in the same place of the pool takes the requests left by the previous one
+    worker = AnalysisWorker(
+        app, create_analysis_queue(app.config['ANALYSIS_QUEUE'], app.config['ANALYSIS_QUEUE_KEY'],
+                                   consumer=get_consumer_name(index))
+    )
+
+    # Finish the current analysis before exiting
+    signal.signal(signal.SIGTERM, lambda *_args: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_args: worker.stop())
+
+    worker.run()
+
+
+class AnalysisWorkerPool(object):
+    """
+    This class starts and supervises a pool of analysis worker processes. Each process has its own application,
+    database connection and queue consumer, so the analysis throughput scales with the number of cores.
+    """
+    def __init__(self, processes: int = None, name: str = __name__):
+        self.processes = processes or os.cpu_count() or 1
+        self.name = name
+        self.workers = []
+        self._stopped = False
+        # New processes are spawned, so they don't inherit the parent sockets or the monkey patched hub state
+        self._context = multiprocessing.get_context("spawn")
+
+    def _start_worker(self, index: int):
+        process = self._context.Process(target=_run_worker_process, args=(self.name, index), daemon=True)
+        process.start()
+        return process
+
+    def run(self, check_interval: float = 1.0):
+        self.workers = [self._start_worker(i) for i in range(self.processes)]
+
+        signal.signal(signal.SIGTERM, lambda *_args: self.stop())
+
+        try:
+            while not self._stopped:
+                # Restart the workers that died unexpectedly
+                for i, process in enumerate(self.workers):
+                    if not process.is_alive():
+                        self.workers[i] = self._start_worker(i)
+                time.sleep(check_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.terminate()
+
+    def stop(self):
+        self._stopped = True
+
+    def terminate(self, timeout: float = 30.0):
+        for process in self.workers:
+            if process.is_alive():
+                process.terminate()
+        for process in self.workers:
+            process.join(timeout)
+        self.workers = []
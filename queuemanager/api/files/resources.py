@@ -10,8 +10,11 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
-from flask import send_file, current_app, make_response
+from flask import send_file, current_app, make_response, request
 from flask_restplus import Resource, marshal
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import wrap_file
 
 from .definitions import api
 from .models import (
@@ -20,6 +23,7 @@ from .models import (
 from ...identity import identity_mgr
 from ...database import db_mgr as db
 from ...file_storage import file_mgr
+from ...socketio import socketio_mgr
 
 
 @api.route("/<int:file_id>")
@@ -27,32 +31,137 @@ class File(Resource):
     """
     /files/<file_id>
     """
+    @staticmethod
+    def _select_content_encoding():
+        """
+        Return the precompressed encoding preferred by the client (from the 'Accept-Encoding' request header), or
+        None if the file has to be sent without compression
+        """
+        best_encoding, best_quality = None, 0
+        for encoding in file_mgr.precompressed_encodings:
+            quality = request.accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best_encoding, best_quality = encoding, quality
+
+        return best_encoding
+
+    @staticmethod
+    def _set_file_validators(response, file, encoding=None):
+        """
+        Add the ETag and Last-Modified headers to the response and check the conditional request headers
+        """
+        etag, last_modified, size = file_mgr.get_file_validators(file, encoding)
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers['Accept-Ranges'] = 'bytes'
+        response.vary.add('Accept-Encoding')
+
+        return size
+
     @staticmethod
     def _get_file_development(file):
         """
-        Read and send the file attached with the response
+        Read and send the file attached with the response, compressed if the client accepts it. The 'If-None-Match',
+        'If-Modified-Since' and 'Range' request headers are answered with a 304 or a 206 response.
         """
-        file_d = file_mgr.get_file_d(file)
+        encoding = File._select_content_encoding()
+        if encoding is not None:
+            file_d = open(file_mgr.get_compressed_file(file, encoding), "rb")
+        else:
+            file_d = file_mgr.get_file_d(file, binary=True)
 
-        return send_file(file_d, as_attachment=True, attachment_filename=file.name)
+        response = send_file(file_d, mimetype='application/octet-stream', as_attachment=True,
+                             attachment_filename=file.name, add_etags=False, conditional=False)
+        size = File._set_file_validators(response, file, encoding)
+        response.content_length = size
+        if encoding is not None:
+            response.content_encoding = encoding
+
+        return response.make_conditional(request, accept_ranges=True, complete_length=size)
 
     @staticmethod
     def _get_file_production(file):
         """
-        Make an internal redirection to the file resource
+        Make an internal redirection to the file resource (or to its compressed copy if the client accepts it). The
+        conditional requests for a file that the client already has are answered here, and the 'Range' requests
+        are served by nginx. nginx replaces the 'ETag' header with its own, so the internal location has to send
+        the one of this response instead (see the README).
         """
+        encoding = File._select_content_encoding()
+
         response = make_response()
-        response.headers['X-Accel-Redirect'] = '/files/{}'.format(str(file.id))
+        response.headers['X-Accel-Redirect'] = file_mgr.get_accel_redirect_path(file, encoding)
         response.headers['Content-Type'] = 'application/octet-stream'
         response.headers['Content-Disposition'] = 'attachment; filename="{}"'.format(file.name)
+        File._set_file_validators(response, file, encoding)
+        if encoding is not None:
+            response.content_encoding = encoding
+
+        response.make_conditional(request)
+        if response.status_code == 304:
+            # The client has the file already, don't redirect to it
+            del response.headers['X-Accel-Redirect']
+
+        return response
+
+    @staticmethod
+    def _get_requested_range(response, size):
+        """
+        Return the byte range requested in the 'Range' header, or None if the whole file has to be sent: when there
+        isn't any range, when more than one range is requested or when the 'If-Range' validator (an entity tag or
+        a date) doesn't match the file anymore.
+        """
+        if request.range is None or len(request.range.ranges) != 1:
+            return None
+
+        if_range = request.if_range
+        if if_range.etag is not None and if_range.etag != response.get_etag()[0]:
+            return None
+        if if_range.date is not None and if_range.date != response.last_modified:
+            return None
+
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            raise RequestedRangeNotSatisfiable(length=size)
+
+        return byte_range
+
+    @staticmethod
+    def _get_file_from_storage(file):
+        """
+        Stream the file (or the requested range of it) from the storage backend, when the files aren't stored in the
+        local filesystem. The 'If-None-Match' and 'If-Modified-Since' request headers are answered with a 304.
+        """
+        response = make_response()
+        response.headers['Content-Type'] = 'application/octet-stream'
+        response.headers['Content-Disposition'] = 'attachment; filename="{}"'.format(file.name)
+        size = File._set_file_validators(response, file)
+
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+        start, end = 0, size
+        byte_range = File._get_requested_range(response, size)
+        if byte_range is not None:
+            start, end = byte_range
+            response.status_code = 206
+            response.content_range = ContentRange("bytes", start, end, size)
+
+        response.response = wrap_file(request.environ, file_mgr.get_file_stream(file, start, end))
+        response.direct_passthrough = True
+        response.content_length = end - start
 
         return response
 
     @api.doc(id="get_file")
     @api.doc(security="printer_identity")
     @api.response(200, "Success")
+    @api.response(206, "Partial content of the file")
+    @api.response(304, "The file wasn't modified")
     @api.response(401, "Unauthorized resource access")
     @api.response(404, "Can't find any file with this ID in the database")
+    @api.response(416, "The requested range is not satisfiable")
     @api.response(422, "Invalid identity")
     @api.response(500, "Unable to read the data from the database")
     @api.response(500, "Unable to retrieve the file from the filesystem")
@@ -60,7 +169,7 @@ class File(Resource):
     def get(self, file_id: int):
         """
         Returns the file with id=file_id or make an internal redirection to the file resource
-        (depends on the environment)
+        (depends on the environment and the storage backend)
         """
         current_printer = identity_mgr.get_identity()
 
@@ -71,16 +180,17 @@ class File(Resource):
         if not file:
             return {"message": "Can't find any file with this ID in the database."}, 404
 
-        can_access_file = False
-        for job in file.jobs:
-            if job.assigned_printer.id == current_printer["id"]:
-                can_access_file = True
-                break
+        # The printers can also download the file of the job hinted to them before it's assigned
+        can_access_file = any(job.assigned_printer is not None and job.assigned_printer.id == current_printer["id"]
+                              for job in file.jobs) or \
+            socketio_mgr.prefetch_hints.is_hinted(current_printer["id"], {job.id for job in file.jobs})
 
         if not can_access_file:
             return {'message': "This printer can't access to the requested file."}, 401
 
-        if current_app.config.get("ENV") == "production":
+        if not file_mgr.storage.is_local:
+            return self._get_file_from_storage(file)
+        elif current_app.config.get("ENV") == "production":
             return self._get_file_production(file)
         else:
             return self._get_file_development(file)
@@ -112,11 +222,10 @@ class FileInfo(Resource):
         if not file:
             return {"message": "Can't find any file with this ID in the database."}, 404
 
-        can_access_file = False
-        for job in file.jobs:
-            if job.assigned_printer.id == current_printer["id"]:
-                can_access_file = True
-                break
+        # The printers can also download the file of the job hinted to them before it's assigned
+        can_access_file = any(job.assigned_printer is not None and job.assigned_printer.id == current_printer["id"]
+                              for job in file.jobs) or \
+            socketio_mgr.prefetch_hints.is_hinted(current_printer["id"], {job.id for job in file.jobs})
 
         if not can_access_file:
             return {'message': "This printer can't access to the requested file."}, 401
@@ -62,6 +62,13 @@ job_model = api.model('Job', {
     'extruders_data': fields.Nested(job_extruder_model, as_list=True, skip_none=True)
 })
 
+jobs_delta_model = api.model('JobsDelta', {
+    'revision': fields.Integer,
+    'full': fields.Boolean,
+    'upserted': fields.List(fields.Nested(job_model, skip_none=True)),
+    'removed': fields.List(fields.Integer)
+})
+
 edit_job_model = api.model('EditJob', {
     'name': fields.String,
 })
@@ -24,6 +24,7 @@ class GetJobsSchema(Schema):
     name = fields.String()
     can_be_printed = fields.Boolean(attribute="canBePrinted")
     order_by_priority = fields.Boolean(missing=False)
+    since_revision = fields.Integer(validate=lambda revision: revision >= 0)
 
 
 class GetJobsNotDoneSchema(Schema):
@@ -16,7 +16,7 @@ from flask_restplus.mask import apply as apply_mask
 
 from .definitions import api
 from .models import (
-    job_model, edit_job_model, reorder_job_model, job_state_model
+    job_model, jobs_delta_model, edit_job_model, reorder_job_model, job_state_model
 )
 from .parameter_schemas import (
     GetJobsSchema, GetJobsNotDoneSchema, DeleteJobSchema
@@ -30,7 +30,7 @@ from ...file_storage import FileDescriptor, file_mgr
 from ...file_storage.exceptions import (
     FileManagerError
 )
-from ...socketio import socketio_mgr
+from ...socketio import socketio_mgr, job_changes
 
 
 @api.route("")
@@ -47,7 +47,9 @@ class Jobs(Resource):
     @api.param("name", "Get job with this name", "query", **{"type": str})
     @api.param("can_be_printed", "Get jobs that can be printed or not", "query", **{"type": bool})
     @api.param("order_by_priority", "Get the jobs ordered by the priority index", "query", **{"type": bool, "default": False})
+    @api.param("since_revision", "Get only the jobs changed and removed after this revision", "query", **{"type": int})
     @api.response(200, "Success", [job_model])
+    @api.response(200, "Success (with 'since_revision')", jobs_delta_model)
     @api.response(400, "Invalid query parameter")
     @api.response(401, "Unauthorized resource access")
     @api.response(404, "The requested job don\'t exist")
@@ -73,6 +75,11 @@ class Jobs(Resource):
         else:
             deserialized_parameters = deserialized_parameters.data
 
+        # Read the 'since_revision' param from the query
+        since_revision = deserialized_parameters.pop("since_revision", None)
+        if since_revision is not None:
+            return self._get_jobs_since_revision(since_revision)
+
         # Read the 'order_by_priority' param from the query
         order_by_priority = deserialized_parameters["order_by_priority"]
         del deserialized_parameters["order_by_priority"]
@@ -85,6 +92,31 @@ class Jobs(Resource):
             return {'message': 'The requested job don\'t exist.'}, 404
 
 
+    @staticmethod
+    def _get_jobs_since_revision(revision: int):
+        """
+        Returns the jobs changed and the IDs of the jobs removed after the revision, or all the jobs if the changes
+        log doesn't go back to that revision (the 'full' flag is set then)
+        """
+        current_revision, upserted, removed = job_changes.get_changes_since(revision)
+
+        if upserted is None:
+            jobs = db.get_jobs()
+            removed = []
+        elif upserted:
+            # The jobs removed after the revision was read are sent in the next request
+            jobs = [job for job in (db.get_jobs(id=job_id) for job_id in upserted) if job is not None]
+        else:
+            jobs = []
+
+        return {
+            "revision": current_revision,
+            "full": upserted is None,
+            "upserted": marshal(jobs, job_model, skip_none=True),
+            "removed": removed
+        }, 200
+
+
 @api.route("/create")
 class JobCreate(Resource):
     @staticmethod
@@ -143,9 +175,8 @@ class JobCreate(Resource):
                 return {'message': 'No file attached with the request.'}, 400
             file_descriptor = self._generate_file_descriptor_development()
 
-        # Save the file into the server files storage
+        # Save the file into the server files storage (the file header is read while it's being saved)
         file = file_mgr.save_file(file_descriptor, user)
-        file_mgr.retrieve_file_basic_info(file)
 
         # Create the job from the file
         try:
@@ -302,6 +333,7 @@ class Job(Resource):
             db.delete_job(job)
 
         socketio_mgr.client_namespace.emit_jobs_updated(broadcast=True)
+        socketio_mgr.update_prefetch_hints()
 
         return {'message': 'Job <{}> deleted from the database.'.format(job.name)}, 200
 
@@ -389,8 +421,11 @@ class JobReorder(Resource):
             previous_job = None
 
         db.reorder_job_in_queue(job, previous_job)
+        # The priority of the jobs between the old and the new position is shifted too
+        job_changes.reset_history()
 
         socketio_mgr.client_namespace.emit_jobs_updated(broadcast=True)
+        socketio_mgr.update_prefetch_hints()
 
         return {'message': 'Job <{}> reordered successfully.'.format(job.name)}, 200
 
@@ -423,13 +458,13 @@ class JobReprint(Resource):
         if job is None:
             return {'message': 'There is no job with this ID in the database.'}, 404
 
+        # Restore the file from the cold storage (if needed) before the printer asks for it
+        file_mgr.rehydrate_file(job.file)
+
         db.reprint_done_job(job)
 
         socketio_mgr.client_namespace.emit_jobs_updated(broadcast=True)
 
-        jobs_in_queue = db.count_jobs_in_queue(only_can_be_printed=True)
-
-        if jobs_in_queue == 1:
-            socketio_mgr.assign_job_to_printer(job)
+        socketio_mgr.dispatch_job(job)
 
         return {'message': 'Job <{}> enqueued for reprint.'.format(job.name)}, 200
@@ -77,3 +77,11 @@ printer_model = api.model('Printer', {
     'total_printing_seconds': TimeToSecondsField(attribute="totalPrintingTime"),
     'current_job': fields.Nested(printer_current_job_model, skip_none=True)
 })
+
+printer_temperatures_model = api.model('PrinterTemperatures', {
+    'resolution': fields.String,
+    'interval': fields.Integer,
+    'timestamps': fields.List(fields.Float),
+    'bed': fields.List(fields.Float),
+    'extruders': fields.List(fields.List(fields.Float))
+})
@@ -0,0 +1,23 @@
+"""
+This module defines the all the api parameters schemas of the printer namespace.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from marshmallow import Schema, fields, validate
+
+from ...socketio.telemetry import TEMPERATURE_RESOLUTIONS
+
+
+class GetPrinterTemperaturesSchema(Schema):
+    """ Schema of the parameters accepted by the GET /printer/temperatures api resource """
+    printer_id = fields.Integer(validate=lambda id: id > 0, missing=1)
+    resolution = fields.String(validate=validate.OneOf(list(TEMPERATURE_RESOLUTIONS)), missing="raw")
+    since = fields.Float(validate=lambda since: since >= 0)
+    limit = fields.Integer(validate=lambda limit: limit > 0)
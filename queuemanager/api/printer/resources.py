@@ -10,14 +10,17 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+from flask import request
 from flask_restplus import Resource, marshal
 
 from .definitions import api
 from .models import (
-    printer_model, printer_material_model, printer_extruder_type_model
+    printer_model, printer_material_model, printer_extruder_type_model, printer_temperatures_model
 )
+from .parameter_schemas import GetPrinterTemperaturesSchema
 from ...identity import identity_mgr
 from ...database import db_mgr as db
+from ...socketio import socketio_mgr
 
 
 @api.route("")
@@ -75,3 +78,36 @@ class PrinterExtruderTypes(Resource):
         printer_extruder_types = db.get_printer_extruder_types()
 
         return marshal(printer_extruder_types, printer_extruder_type_model, skip_none=True), 200
+
+
+@api.route("/temperatures")
+class PrinterTemperatures(Resource):
+    """
+    /printer/temperatures
+    """
+    @api.doc(id="get_printer_temperatures")
+    @api.doc(security=["user_identity", "printer_identity"])
+    @api.param("printer_id", "Get the temperatures of the printer with this ID", "query", **{"type": int, "default": 1})
+    @api.param("resolution", "Resolution of the samples ('raw', '10s' or '1m')", "query", **{"type": str, "default": "raw"})
+    @api.param("since", "Get only the samples taken after this UNIX timestamp", "query", **{"type": float})
+    @api.param("limit", "Get only the last samples", "query", **{"type": int})
+    @api.response(200, "Success", printer_temperatures_model)
+    @api.response(400, "Invalid query parameter")
+    @identity_mgr.identity_required()
+    def get(self):
+        """
+        Returns the recent temperatures history of the printer, as one list for each value
+        """
+        deserialized_parameters = GetPrinterTemperaturesSchema().load(request.args)
+
+        if deserialized_parameters.errors:
+            return {
+                "errors": deserialized_parameters.errors,
+                "message": "Query parameters validation failed."
+            }, 400
+        else:
+            deserialized_parameters = deserialized_parameters.data
+
+        history = socketio_mgr.temperatures.get_history(**deserialized_parameters)
+
+        return marshal(history, printer_temperatures_model), 200
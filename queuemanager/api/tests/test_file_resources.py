@@ -10,17 +10,25 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+import gzip
 import json
+import os
+from shutil import copyfile
 
 from flask_restplus import marshal
 
 from queuemanager.api.files.models import file_model
+from queuemanager.file_storage import file_mgr
+from queuemanager.file_storage.backends import LocalStorageBackend
+from queuemanager.file_storage.file_manager import FileDescriptor
+from queuemanager.socketio import socketio_mgr
 
 
-def test_get_file(db_manager, http_client, app):
+def test_get_file(db_manager, file_manager, http_client, app):
     user = db_manager.get_users(id=1)
     printer = db_manager.get_printers(id=1)
-    file = db_manager.insert_file(user, "test", "./test-file.gcode")
+    copyfile("./test-file.gcode", "./files/test-file.gcode")
+    file = db_manager.insert_file(user, "test", "./files/test-file.gcode")
 
     auth_header = {"X-Identity": json.dumps({
         "type": "user",
@@ -64,19 +72,159 @@ def test_get_file(db_manager, http_client, app):
     assert r.status_code == 200
     assert r.data.decode('utf-8') == open(file.fullPath, "r").read()
     assert ('Content-Disposition', 'attachment; filename=test') in list(r.headers)
+    assert ('Accept-Ranges', 'bytes') in list(r.headers)
+    etag = r.headers['ETag']
+    assert r.headers['Last-Modified'] is not None
+
+    with open(file.fullPath, "rb") as f:
+        file_content = f.read()
+
+    # Resume the download from a byte offset
+    r = http_client.get("/api/files/1", headers=dict(auth_header, Range="bytes=100-"))
+    assert r.status_code == 206
+    assert r.data == file_content[100:]
+    assert r.headers['Content-Range'] == "bytes 100-{}/{}".format(len(file_content) - 1, len(file_content))
+
+    r = http_client.get("/api/files/1", headers=dict(auth_header, Range="bytes={}-".format(len(file_content))))
+    assert r.status_code == 416
+
+    # The file didn't change, so it isn't sent again
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"If-None-Match": etag}))
+    assert r.status_code == 304
+    assert r.data == b""
+
+    # The compressed copy of the file is sent if the client accepts it
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"Accept-Encoding": "gzip, deflate"}))
+    assert r.status_code == 200
+    assert r.headers['Content-Encoding'] == "gzip"
+    assert r.headers['Vary'] == "Accept-Encoding"
+    assert int(r.headers['Content-Length']) == len(r.data) < len(file_content)
+    assert gzip.decompress(r.data) == file_content
+    assert r.headers['ETag'] != etag
+    assert os.path.exists(file.fullPath + ".gz")
+
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"Accept-Encoding": "gzip;q=0"}))
+    assert 'Content-Encoding' not in r.headers
+    assert r.data == file_content
+
+    os.remove(file.fullPath + ".gz")
 
     app.config["ENV"] = "production"
 
     r = http_client.get("/api/files/1", headers=auth_header)
     assert r.status_code == 200
     assert ('Content-Type', 'application/octet-stream') in list(r.headers)
-    assert ('X-Accel-Redirect', '/files/1') in list(r.headers)
+    assert ('X-Accel-Redirect', '/files/test-file.gcode') in list(r.headers)
     assert ('Content-Disposition', 'attachment; filename="test"') in list(r.headers)
     assert ('Content-Length', '0') in list(r.headers)
+    assert r.headers['ETag'] == etag
+
+    # The compressed copy is created before redirecting to it, with its own validators
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"Accept-Encoding": "gzip"}))
+    assert r.status_code == 200
+    assert ('X-Accel-Redirect', '/files/test-file.gcode.gz') in list(r.headers)
+    assert r.headers['Content-Encoding'] == "gzip"
+    assert r.headers['Vary'] == "Accept-Encoding"
+    assert os.path.exists(file.fullPath + ".gz")
+    compressed_etag = r.headers['ETag']
+    assert compressed_etag != etag
+
+    # The ETag sent by nginx is the one of the response, so the next requests of the client match it
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"If-None-Match": etag}))
+    assert r.status_code == 304
+    assert 'X-Accel-Redirect' not in r.headers
+
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"If-None-Match": compressed_etag,
+                                                                     "Accept-Encoding": "gzip"}))
+    assert r.status_code == 304
+    assert 'X-Accel-Redirect' not in r.headers
+
+    r = http_client.get("/api/files/1", headers=dict(auth_header, **{"If-None-Match": compressed_etag}))
+    assert r.status_code == 200
+    assert ('X-Accel-Redirect', '/files/test-file.gcode') in list(r.headers)
 
     app.config["ENV"] = "development"
 
 
+def test_get_file_from_storage(db_manager, file_manager, http_client, tmp_path, monkeypatch):
+    user = db_manager.get_users(id=1)
+    printer = db_manager.get_printers(id=1)
+    # A local backend in another directory, used as if it was remote
+    storage = LocalStorageBackend(str(tmp_path / "remote"))
+    storage.is_local = False
+    monkeypatch.setattr(file_mgr, "storage", storage)
+
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file = file_mgr.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    job = db_manager.insert_job("test-job", file, user)
+    db_manager.enqueue_created_job(job)
+    db_manager.update_job(job, canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, job)
+
+    with open("./test-file.gcode", "rb") as f:
+        file_content = f.read()
+
+    auth_header = {"X-Identity": json.dumps({
+        "type": "printer",
+        "id": printer.id,
+        "serial_number": printer.serialNumber
+    })}
+
+    # The file is streamed from the storage backend
+    r = http_client.get("/api/files/{}".format(file.id), headers=auth_header)
+    assert r.status_code == 200
+    assert r.data == file_content
+    etag, last_modified = r.headers['ETag'], r.headers['Last-Modified']
+
+    r = http_client.get("/api/files/{}".format(file.id), headers=dict(auth_header, Range="bytes=100-"))
+    assert r.status_code == 206
+    assert r.data == file_content[100:]
+
+    # The multiple ranges requests are answered with the whole file
+    r = http_client.get("/api/files/{}".format(file.id), headers=dict(auth_header, Range="bytes=0-9,20-29"))
+    assert r.status_code == 200
+    assert r.data == file_content
+
+    # The range is only sent if the 'If-Range' entity tag or date match the file
+    for if_range, status_code in ((etag, 206), ('"other"', 200),
+                                  (last_modified, 206), ("Thu, 01 Jan 1970 00:00:00 GMT", 200)):
+        r = http_client.get("/api/files/{}".format(file.id), headers=dict(auth_header, **{
+            "Range": "bytes=100-", "If-Range": if_range}))
+        assert r.status_code == status_code
+        assert r.data == (file_content[100:] if status_code == 206 else file_content)
+
+
+def test_get_prefetched_file(db_manager, file_manager, http_client):
+    user = db_manager.get_users(id=1)
+    printer = db_manager.get_printers(id=1)
+    copyfile("./test-file.gcode", "./files/test-file.gcode")
+    file = db_manager.insert_file(user, "test", "./files/test-file.gcode")
+    job = db_manager.insert_job("test-job", file, user)
+    db_manager.enqueue_created_job(job)
+    db_manager.update_job(job, canBePrinted=True)
+
+    auth_header = {"X-Identity": json.dumps({
+        "type": "printer",
+        "id": printer.id,
+        "serial_number": printer.serialNumber
+    })}
+
+    # The job isn't assigned to any printer yet
+    r = http_client.get("/api/files/{}".format(file.id), headers=auth_header)
+    assert r.status_code == 401
+    assert r.json == {'message': "This printer can't access to the requested file."}
+
+    # The printer can download the file of the job hinted to it
+    assert socketio_mgr.prefetch_hints.replace(printer.id, None, job.id)
+    r = http_client.get("/api/files/{}".format(file.id), headers=auth_header)
+    assert r.status_code == 200
+    assert r.data.decode('utf-8') == open(file.fullPath, "r").read()
+
+    socketio_mgr.prefetch_hints.pop(printer.id)
+    r = http_client.get("/api/files/{}".format(file.id), headers=auth_header)
+    assert r.status_code == 401
+
+
 def test_get_file_info(db_manager, http_client):
     user = db_manager.get_users(id=1)
     printer = db_manager.get_printers(id=1)
@@ -16,9 +16,12 @@ import json
 from io import BytesIO
 from shutil import copyfile
 
+import pytest
+
 from flask_restplus import marshal
 
 from queuemanager.api.jobs.models import job_model, job_state_model
+from queuemanager.socketio import job_changes, socketio_mgr
 
 
 def test_get_jobs(db_manager, http_client):
@@ -123,6 +126,26 @@ def test_get_jobs(db_manager, http_client):
     assert r.status_code == 200
     assert r.json == marshal([jobs[2], jobs[1]], job_model, skip_none=True)
 
+    # Get only the changes made after a revision
+    revision = job_changes.get_revision()
+    db_manager.update_job(jobs[1], name="test-job-renamed")
+    db_manager.delete_job(jobs[0])
+
+    r = http_client.get("api/jobs?since_revision={}".format(revision), headers=auth_header)
+    assert r.status_code == 200
+    assert r.json["revision"] == job_changes.get_revision() > revision
+    assert r.json["full"] is False
+    assert r.json["upserted"] == marshal([jobs[1]], job_model, skip_none=True)
+    assert r.json["removed"] == [1]
+
+    r = http_client.get("api/jobs?since_revision={}".format(r.json["revision"]), headers=auth_header)
+    assert r.status_code == 200
+    assert r.json["upserted"] == []
+    assert r.json["removed"] == []
+
+    r = http_client.get("api/jobs?since_revision=-1", headers=auth_header)
+    assert r.status_code == 400
+
 
 def test_create_job(db_manager, http_client, socketio_client, app):
     user = db_manager.get_users(id=1)
@@ -217,9 +240,12 @@ def test_create_job(db_manager, http_client, socketio_client, app):
 
     app.config["ENV"] = "production"
 
+    # The file is moved from the Nginx temporary path, so use a copy of the test file
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+
     data = {
         'gcode.name': 'test_file.gcode',
-        'gcode.path': "./test-file.gcode",
+        'gcode.path': "./test-file-tmp.gcode",
         'name': 'test-job-2'
     }
     r = http_client.post('api/jobs/create', headers=auth_header, data=data)
@@ -593,6 +619,60 @@ def test_reorder_job(db_manager, http_client):
     assert r.json == marshal([jobs[1], jobs[0], jobs[2], jobs[3]], job_model, skip_none=True)
 
 
+def _get_scheduler_order(printer):
+    # Take the jobs from the scheduler as the printer would, one after the other
+    job_ids = []
+    job = socketio_mgr.get_next_job_of_printer(printer)
+    while job is not None:
+        job_ids.append(job.id)
+        socketio_mgr.scheduler.remove_job(job.id)
+        job = socketio_mgr.get_next_job_of_printer(printer)
+    return job_ids
+
+
+def test_scheduler_queue_order(db_manager, http_client, monkeypatch):
+    user = db_manager.get_users(id=1)
+    printer = db_manager.get_printers(id=1)
+    auth_header = {"X-Identity": json.dumps({
+        "type": "user",
+        "id": user.id,
+        "is_admin": True
+    })}
+
+    def _get_queue_order():
+        r = http_client.get("api/jobs?state=Waiting&can_be_printed=true&order_by_priority=true",
+                            headers=auth_header)
+        assert r.status_code == 200
+        return [job_data["id"] for job_data in r.json]
+
+    # The queue is empty when the scheduler is loaded, the jobs are added to it one by one
+    socketio_mgr.sync_scheduler()
+    assert socketio_mgr.scheduler.get_job_count() == 0
+
+    get_printers = db_manager.get_printers
+    monkeypatch.setattr(db_manager, "get_printers", lambda *_args, **_kwargs: pytest.fail("Queue loaded again"))
+    for i in range(4):
+        file = db_manager.insert_file(user, "test-file-{}".format(str(i)), "/home/Marc/test{}".format(str(i)))
+        job = db_manager.insert_job("test-job-{}".format(str(i)), file, user)
+        db_manager.enqueue_created_job(job)
+        db_manager.update_job(job, canBePrinted=True)
+        socketio_mgr.sync_scheduler()
+    monkeypatch.setattr(db_manager, "get_printers", get_printers)
+
+    queue_order = _get_queue_order()
+    assert len(queue_order) == 4
+    assert _get_scheduler_order(printer) == queue_order
+
+    # Reordering the queue shifts the priority of other jobs too, so the scheduler loads the whole queue again
+    r = http_client.put("api/jobs/{}/reorder".format(queue_order[-1]), headers=auth_header,
+                        json={"previous_job_id": queue_order[0]})
+    assert r.status_code == 200
+
+    queue_order = _get_queue_order()
+    assert len(queue_order) == 4
+    assert _get_scheduler_order(printer) == queue_order
+
+
 def test_reprint_job(db_manager, http_client, socketio_client, socketio_printer):
     user = db_manager.get_users(id=1)
     printer = db_manager.get_printers(id=1)
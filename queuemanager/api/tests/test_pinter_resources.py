@@ -17,6 +17,7 @@ from flask_restplus import marshal
 from queuemanager.api.printer.models import (
     printer_model, printer_material_model, printer_extruder_type_model
 )
+from queuemanager.socketio import socketio_mgr
 
 
 def test_get_printer(db_manager, http_client):
@@ -83,3 +84,47 @@ def test_get_printer_extruder_types(db_manager, http_client):
     r = http_client.get("api/printer/extruder_types", headers=auth_header)
     assert r.status_code == 200
     assert r.json == marshal(printer_extruder_types, printer_extruder_type_model, skip_none=True)
+
+
+def test_get_printer_temperatures(http_client):
+    # Send 30 seconds of samples, one every second
+    for i in range(30):
+        socketio_mgr.temperatures.add_sample(1, 60.0 + i, [{"index": 0, "temp_value": 210.0}], timestamp=1200.0 + i)
+
+    auth_header = {"X-Identity": json.dumps({
+        "type": "user",
+        "id": 1,
+        "is_admin": True
+    })}
+
+    r = http_client.get("api/printer/temperatures")
+    assert r.status_code == 401
+    assert r.json == {"message": "Missing Identity Header"}
+
+    r = http_client.get("api/printer/temperatures?resolution=5s", headers=auth_header)
+    assert r.status_code == 400
+
+    r = http_client.get("api/printer/temperatures?limit=3", headers=auth_header)
+    assert r.status_code == 200
+    assert r.json == {
+        "resolution": "raw",
+        "interval": 0,
+        "timestamps": [1227.0, 1228.0, 1229.0],
+        "bed": [87.0, 88.0, 89.0],
+        "extruders": [[210.0, 210.0, 210.0], [None, None, None]]
+    }
+
+    # The last 10 seconds bucket isn't closed yet
+    r = http_client.get("api/printer/temperatures?resolution=10s&since=1205", headers=auth_header)
+    assert r.status_code == 200
+    assert r.json == {
+        "resolution": "10s",
+        "interval": 10,
+        "timestamps": [1210.0],
+        "bed": [74.5],
+        "extruders": [[210.0], [None]]
+    }
+
+    r = http_client.get("api/printer/temperatures?printer_id=2", headers=auth_header)
+    assert r.status_code == 200
+    assert r.json["timestamps"] == []
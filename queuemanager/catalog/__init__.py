@@ -0,0 +1,23 @@
+"""
+This module defines the in-memory index of the printer materials and extruder types catalog.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from .catalog_index import CatalogIndex
+
+#################
+# CATALOG INDEX #
+#################
+
+catalog_idx = CatalogIndex()
+
+
+def init_app(app, *args, **kwargs):
+    catalog_idx.init_app(app, *args, **kwargs)
@@ -0,0 +1,204 @@
+"""
+This module implements the in-memory index of the printer materials and extruder types catalog.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import PrinterExtruderType, PrinterMaterial
+
+# Values of the catalog rows kept in the index. They aren't bound to any session, so reading them never queries the
+# database (the ORM objects can be loaded by its id when they're needed).
+CatalogMaterial = namedtuple("CatalogMaterial", ["id", "type", "GUID"])
+CatalogExtruderType = namedtuple("CatalogExtruderType", ["id", "nozzleDiameter"])
+
+# Key of the session info set with the indexes to invalidate when the catalog table changes are committed
+_CATALOG_CHANGED_KEY = "catalog_changed"
+
+
+class CatalogIndex(object):
+    """
+    This class keeps the printer materials (by type and GUID) and the extruder types (by nozzle diameter) in memory,
+    so the lookups made while analyzing the jobs and deserializing the printer events don't query the database. The
+    lookups return :class:`CatalogMaterial` and :class:`CatalogExtruderType` values instead of ORM objects.
+
+    The index is invalidated with a version counter, which is increased every time a session commits changes in the
+    catalog tables. When a message queue is configured, the counter is shared between all the server processes and
+    every new version is broadcast to them through the same Redis server used by Socket.IO. The processes only
+    listen for the new versions once they use the index, and they reload it the next time it's used after a new
+    version is received.
+    """
+    def __init__(self, app=None, db_manager=None):
+        self.app = None
+        self.version = 0
+        self.digest = None
+        self.materials = []
+        self.extruder_types = []
+        self.materials_by_type = {}
+        self.materials_by_guid = {}
+        self.extruder_types_by_nozzle_diameter = {}
+        self._loaded_version = None
+        self._redis = None
+        self._version_key = None
+        self._channel = None
+        self._listener = None
+
+        # Set the DBManager object
+        if db_manager is None:
+            from ..database import db_mgr
+            self.db_manager = db_mgr
+        else:
+            self.db_manager = db_manager
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._version_key = app.config.setdefault('CATALOG_INDEX_VERSION_KEY', 'queuemanager:catalog:version')
+        self._channel = app.config.setdefault('CATALOG_INDEX_CHANNEL', 'queuemanager:catalog')
+
+        message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+        if message_queue is not None and message_queue.startswith("redis://"):
+            import redis
+            self._redis = redis.StrictRedis.from_url(message_queue)
+
+        if not event.contains(Session, "after_flush", self._after_flush):
+            event.listen(Session, "after_flush", self._after_flush)
+            event.listen(Session, "after_commit", self._after_commit)
+        if not event.contains(Session, "after_rollback", self._after_rollback):
+            event.listen(Session, "after_rollback", self._after_rollback)
+
+    def set_db_manager(self, db_manager):
+        self.db_manager = db_manager
+
+    def _after_flush(self, session, _flush_context):
+        for obj in session.new | session.dirty | session.deleted:
+            if isinstance(obj, (PrinterMaterial, PrinterExtruderType)):
+                session.info.setdefault(_CATALOG_CHANGED_KEY, set()).add(id(self))
+                return
+
+    def _after_commit(self, session):
+        changed_indexes = session.info.get(_CATALOG_CHANGED_KEY, set())
+        if id(self) in changed_indexes:
+            changed_indexes.discard(id(self))
+            self.invalidate()
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop(_CATALOG_CHANGED_KEY, None)
+
+    def _start_listener(self):
+        if self._redis is None or self._listener is not None:
+            return
+
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel)
+
+        def listen():
+            for message in pubsub.listen():
+                try:
+                    self._set_version(int(message["data"]))
+                except (TypeError, ValueError):
+                    self.app.logger.warning("Invalid catalog version received: {}".format(message["data"]))
+
+        # The thread is a green thread in the eventlet processes (the threading module is monkey patched there)
+        self._listener = threading.Thread(target=listen, daemon=True)
+        self._listener.start()
+
+    def _set_version(self, version: int):
+        if version > self.version:
+            self.version = version
+
+    def _get_shared_version(self):
+        if self._redis is None:
+            return self.version
+        return int(self._redis.get(self._version_key) or 0)
+
+    def load(self):
+        """
+        Load the whole catalog from the database.
+        """
+        if self._redis is not None:
+            self._set_version(self._get_shared_version())
+
+        materials = [CatalogMaterial(material.id, material.type, material.GUID)
+                     for material in self.db_manager.get_printer_materials()]
+        extruder_types = [CatalogExtruderType(extruder_type.id, extruder_type.nozzleDiameter)
+                          for extruder_type in self.db_manager.get_printer_extruder_types()]
+        materials_by_type = {}
+        materials_by_guid = {}
+        extruder_types_by_nozzle_diameter = {}
+        catalog = []
+
+        for material in materials:
+            materials_by_type.setdefault(material.type, []).append(material)
+            if material.GUID is not None:
+                materials_by_guid[material.GUID] = material
+            catalog.append((material.id, material.type))
+
+        for extruder_type in extruder_types:
+            extruder_types_by_nozzle_diameter.setdefault(extruder_type.nozzleDiameter, []).append(extruder_type)
+            catalog.append((extruder_type.id, extruder_type.nozzleDiameter))
+
+        self.materials = materials
+        self.extruder_types = extruder_types
+        self.materials_by_type = materials_by_type
+        self.materials_by_guid = materials_by_guid
+        self.extruder_types_by_nozzle_diameter = extruder_types_by_nozzle_diameter
+        self.digest = hashlib.sha256(json.dumps(catalog).encode()).hexdigest()[:16]
+        self._loaded_version = self.version
+
+    def invalidate(self):
+        """
+        Mark the catalog as changed in all the server processes.
+        """
+        if self._redis is None:
+            self._set_version(self.version + 1)
+        else:
+            version = self._redis.incr(self._version_key)
+            self._set_version(version)
+            self._redis.publish(self._channel, version)
+
+    def _check_loaded(self):
+        # Only the processes that use the index need to know the new versions
+        self._start_listener()
+        if self._loaded_version != self.version:
+            self.load()
+
+    def get_digest(self):
+        self._check_loaded()
+        return self.digest
+
+    def get_materials(self):
+        self._check_loaded()
+        return list(self.materials)
+
+    def get_extruder_types(self):
+        self._check_loaded()
+        return list(self.extruder_types)
+
+    def get_materials_by_type(self, material_type: str):
+        self._check_loaded()
+        return list(self.materials_by_type.get(material_type, []))
+
+    def get_material_by_guid(self, guid: str):
+        self._check_loaded()
+        return self.materials_by_guid.get(guid)
+
+    def get_extruder_types_by_nozzle_diameter(self, nozzle_diameter: float):
+        self._check_loaded()
+        return list(self.extruder_types_by_nozzle_diameter.get(nozzle_diameter, []))
@@ -0,0 +1,56 @@
+"""
+This module implements the catalog index test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from ..catalog_index import CatalogIndex
+
+
+def test_catalog_index(app, db_manager):
+    catalog_index = CatalogIndex(app, db_manager=db_manager)
+    catalog_index.load()
+
+    for material in db_manager.get_printer_materials():
+        assert material.id in [m.id for m in catalog_index.get_materials_by_type(material.type)]
+        if material.GUID is not None:
+            assert catalog_index.get_material_by_guid(material.GUID).id == material.id
+
+    for extruder_type in db_manager.get_printer_extruder_types():
+        assert extruder_type.id in [e.id for e in catalog_index.get_extruder_types_by_nozzle_diameter(
+            extruder_type.nozzleDiameter)]
+
+    assert catalog_index.get_materials_by_type("Unknown") == []
+    assert catalog_index.get_material_by_guid("Unknown") is None
+    assert catalog_index.get_extruder_types_by_nozzle_diameter(-1.0) == []
+
+    # After invalidating the index, it's reloaded the next time it's used
+    digest = catalog_index.get_digest()
+    version = catalog_index.version
+    catalog_index.invalidate()
+    assert catalog_index.version == version + 1
+    assert catalog_index.get_digest() == digest
+
+
+def test_catalog_index_invalidated_on_commit(app, db_manager):
+    catalog_index = CatalogIndex(app, db_manager=db_manager)
+    catalog_index.load()
+    version = catalog_index.version
+
+    # Changing the catalog tables invalidates the index
+    material = db_manager.get_printer_materials()[0]
+    material.type = "Changed"
+    db_manager.commit_changes()
+    assert catalog_index.version > version
+    assert material.id in [m.id for m in catalog_index.get_materials_by_type("Changed")]
+
+    # Other changes don't
+    version = catalog_index.version
+    db_manager.update_printer(db_manager.get_printers(id=1), name="Sigmax 4.0 renamed")
+    assert catalog_index.version == version
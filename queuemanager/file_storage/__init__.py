@@ -10,7 +10,13 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+from .analysis_cache import AnalysisCache
+from .cold_storage import ColdStorage
 from .file_manager import FileManager, FileDescriptor
+from .gcode_header import GCodeHeader, GCodeHeaderParser
+from .layer_index import LayerIndex
+from .reconciler import StorageReconciler
+from .tiering import StorageTiering
 
 ################
 # FILE MANAGER #
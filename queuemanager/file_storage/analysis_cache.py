@@ -0,0 +1,100 @@
+"""
+This module implements the persistent cache of the job analysis results.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import json
+import os
+import sqlite3
+import time
+
+
+class AnalysisCache(object):
+    """
+    This class implements a persistent LRU cache of the job analysis results, stored in a SQLite database. When the
+    cache has more than 'max_size' entries, the least recently used ones are evicted.
+    """
+    def __init__(self, path: str = ":memory:", max_size: int = 10000):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._last_time = 0.0
+
+    def _now(self):
+        # Always increasing time, so the entries used in the same clock tick are still ordered
+        self._last_time = max(time.time(), self._last_time + 1e-6)
+        return self._last_time
+
+    def _get_connection(self):
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_cache_last_used ON analysis_cache (last_used)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str):
+        """
+        Return the cached analysis result with this key (or None if it isn't cached).
+        """
+        connection = self._get_connection()
+        row = connection.execute("SELECT value FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        connection.execute("UPDATE analysis_cache SET last_used = ? WHERE key = ?", (self._now(), key))
+        connection.commit()
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        """
+        Save the analysis result with this key, evicting the least recently used entries if needed.
+        """
+        connection = self._get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO analysis_cache (key, value, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(value), self._now())
+        )
+
+        count = connection.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        if count > self.max_size:
+            connection.execute(
+                "DELETE FROM analysis_cache WHERE key IN "
+                "(SELECT key FROM analysis_cache ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_size,)
+            )
+
+        connection.commit()
+
+    def clear(self):
+        connection = self._get_connection()
+        connection.execute("DELETE FROM analysis_cache")
+        connection.commit()
+
+    def __len__(self):
+        return self._get_connection().execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,38 @@
+"""
+This module implements the storage backends of the file contents.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from .base import StorageBackend, StorageObjectStat
+from .local import LocalStorageBackend
+from .s3 import S3StorageBackend
+
+
+def create_storage_backend(config: dict):
+    """
+    Create the storage backend selected with the 'FILE_MANAGER_STORAGE_BACKEND' config value ('local' or 's3').
+    """
+    backend = config.get('FILE_MANAGER_STORAGE_BACKEND', 'local')
+
+    if backend == "local":
+        return LocalStorageBackend(config['FILE_MANAGER_UPLOAD_DIR'], config.get('FILE_MANAGER_SHARD_LEVELS', 0))
+    elif backend == "s3":
+        return S3StorageBackend(
+            config['FILE_MANAGER_S3_BUCKET'],
+            prefix=config.get('FILE_MANAGER_S3_PREFIX', ''),
+            endpoint_url=config.get('FILE_MANAGER_S3_ENDPOINT_URL'),
+            region_name=config.get('FILE_MANAGER_S3_REGION'),
+            access_key_id=config.get('FILE_MANAGER_S3_ACCESS_KEY_ID'),
+            secret_access_key=config.get('FILE_MANAGER_S3_SECRET_ACCESS_KEY'),
+            max_pool_connections=config.get('FILE_MANAGER_S3_MAX_POOL_CONNECTIONS', 50),
+            multipart_chunk_size=config.get('FILE_MANAGER_S3_MULTIPART_CHUNK_SIZE', 8 * 1024 * 1024)
+        )
+    else:
+        raise ValueError("Unknown storage backend '{}'".format(backend))
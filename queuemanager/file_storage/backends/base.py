@@ -0,0 +1,71 @@
+"""
+This module defines the interface of the storage backends.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from collections import namedtuple
+
+from ..exceptions import StorageObjectNotFound
+
+# Size (bytes), last modification date and entity tag of a stored object
+StorageObjectStat = namedtuple("StorageObjectStat", ["size", "last_modified", "etag"])
+
+
+class StorageBackend(object):
+    """
+    This class defines the interface of the storage backends. The contents are identified by a key (its content
+    hash) and they're always written and read as streams, so they're never loaded in memory at once.
+    """
+    # The contents of the local backends can be accessed directly from the filesystem
+    is_local = False
+
+    def put_stream(self, key: str, stream):
+        """
+        Save the content read from the stream (a binary file object) with this key.
+        """
+        raise NotImplementedError()
+
+    def get_stream(self, key: str):
+        """
+        Return a binary file object for reading the content with this key.
+        """
+        raise NotImplementedError()
+
+    def get_range(self, key: str, start: int, end: int):
+        """
+        Return a binary file object for reading the content with this key from the byte 'start' until the byte
+        'end' (not included).
+        """
+        raise NotImplementedError()
+
+    def delete(self, key: str):
+        """
+        Delete the content with this key (if it exists).
+        """
+        raise NotImplementedError()
+
+    def stat(self, key: str):
+        """
+        Return the :class:`StorageObjectStat` of the content with this key.
+        """
+        raise NotImplementedError()
+
+    def exists(self, key: str):
+        try:
+            self.stat(key)
+        except StorageObjectNotFound:
+            return False
+        return True
+
+    def get_local_path(self, key: str):
+        """
+        Return the path of the content in the local filesystem (or None if the backend isn't local).
+        """
+        return None
@@ -0,0 +1,117 @@
+"""
+This module implements the local filesystem storage backend.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import io
+import os
+import uuid
+from datetime import datetime, timezone
+
+from .base import StorageBackend, StorageObjectStat
+from ..exceptions import StorageObjectNotFound
+
+# Size of the chunks copied at once
+LOCAL_STORAGE_CHUNK_SIZE = 1024 * 1024
+# Length of the key prefix used for each level of the sharded directory layout
+SHARD_PREFIX_LENGTH = 2
+
+
+class _RangeReader(io.RawIOBase):
+    """
+    Binary file object that reads only 'length' bytes of the wrapped file from its current position.
+    """
+    def __init__(self, fd, length: int):
+        self._fd = fd
+        self._remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._fd.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._fd.close()
+        super().close()
+
+
+def open_file_range(path: str, start: int = 0, end: int = None):
+    """
+    Open the file for reading from the byte 'start' until the byte 'end' (not included) or the end of the file.
+    """
+    fd = open(path, "rb")
+    if end is None:
+        end = os.fstat(fd.fileno()).st_size
+    fd.seek(start)
+    return io.BufferedReader(_RangeReader(fd, max(end - start, 0)))
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    This class stores the contents in a local directory, distributed in nested directories named by the first
+    characters of the key.
+    """
+    is_local = True
+
+    def __init__(self, root: str, shard_levels: int = 0):
+        self.root = root
+        self.shard_levels = shard_levels
+
+    def get_local_path(self, key: str):
+        shards = [key[i * SHARD_PREFIX_LENGTH:(i + 1) * SHARD_PREFIX_LENGTH] for i in range(self.shard_levels)]
+        return os.path.join(self.root, *shards, key)
+
+    def _open(self, key: str):
+        try:
+            return open(self.get_local_path(key), "rb")
+        except FileNotFoundError:
+            raise StorageObjectNotFound("The content '{}' doesn't exist.".format(key))
+
+    def put_stream(self, key: str, stream):
+        path = self.get_local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file, so a half written content is never taken as valid
+        tmp_path = "{}.{}.part".format(path, uuid.uuid4().hex)
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in iter(lambda: stream.read(LOCAL_STORAGE_CHUNK_SIZE), b""):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_stream(self, key: str):
+        return self._open(key)
+
+    def get_range(self, key: str, start: int, end: int):
+        try:
+            return open_file_range(self.get_local_path(key), start, end)
+        except FileNotFoundError:
+            raise StorageObjectNotFound("The content '{}' doesn't exist.".format(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.get_local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def stat(self, key: str):
+        try:
+            stat = os.stat(self.get_local_path(key))
+        except FileNotFoundError:
+            raise StorageObjectNotFound("The content '{}' doesn't exist.".format(key))
+
+        return StorageObjectStat(stat.st_size, datetime.fromtimestamp(int(stat.st_mtime), timezone.utc), key)
@@ -0,0 +1,116 @@
+"""
+This module implements the S3 compatible object storage backend.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import io
+
+from .base import StorageBackend, StorageObjectStat
+from ..exceptions import StorageObjectNotFound, FilesystemError
+
+
+class _StreamingBodyReader(io.RawIOBase):
+    """
+    Binary file object that reads the body of an object storage response.
+    """
+    def __init__(self, body):
+        self._body = body
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._body.close()
+        super().close()
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    This class stores the contents in a bucket of an S3 compatible object storage (AWS S3, MinIO...). All the
+    requests share the same pool of connections, the contents are uploaded in parts (in parallel) when they're
+    bigger than the multipart chunk size, and the responses bodies are read as streams.
+    """
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = None, region_name: str = None,
+                 access_key_id: str = None, secret_access_key: str = None, max_pool_connections: int = 50,
+                 multipart_chunk_size: int = 8 * 1024 * 1024, client=None):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix
+
+        if client is None:
+            client = boto3.client(
+                "s3", endpoint_url=endpoint_url, region_name=region_name, aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key, config=Config(max_pool_connections=max_pool_connections)
+            )
+        self.client = client
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_chunk_size, multipart_chunksize=multipart_chunk_size,
+            max_concurrency=max(max_pool_connections // 4, 1)
+        )
+
+    def _get_object_key(self, key: str):
+        return self.prefix + key
+
+    @staticmethod
+    def _is_not_found(error):
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def _get_object(self, key: str, **kwargs):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._get_object_key(key), **kwargs)
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise StorageObjectNotFound("The content '{}' doesn't exist.".format(key))
+            raise FilesystemError("Can't retrieve the content '{}' from the object storage.".format(key))
+
+    def put_stream(self, key: str, stream):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.upload_fileobj(stream, self.bucket, self._get_object_key(key), Config=self.transfer_config)
+        except ClientError:
+            raise FilesystemError("Unable to save the content '{}' in the object storage.".format(key))
+
+    def get_stream(self, key: str):
+        return io.BufferedReader(_StreamingBodyReader(self._get_object(key)["Body"]))
+
+    def get_range(self, key: str, start: int, end: int):
+        if end <= start:
+            return io.BytesIO()
+        response = self._get_object(key, Range="bytes={}-{}".format(start, end - 1))
+        return io.BufferedReader(_StreamingBodyReader(response["Body"]))
+
+    def delete(self, key: str):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._get_object_key(key))
+        except ClientError as e:
+            if self._is_not_found(e):
+                return
+            raise FilesystemError("Unable to delete the content '{}' from the object storage.".format(key))
+
+    def stat(self, key: str):
+        from botocore.exceptions import ClientError
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._get_object_key(key))
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise StorageObjectNotFound("The content '{}' doesn't exist.".format(key))
+            raise FilesystemError("Can't retrieve the content '{}' from the object storage.".format(key))
+
+        return StorageObjectStat(response["ContentLength"], response["LastModified"], key)
@@ -0,0 +1,166 @@
+"""
+This module implements the compressed cold storage of the files of the done jobs.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import gzip
+import os
+import uuid
+
+# Extension of the compressed files of each compression format
+COMPRESSED_FILE_EXTENSIONS = {
+    "gzip": ".gz",
+    "zstd": ".zst"
+}
+# Size of the chunks compressed and decompressed at once
+COLD_STORAGE_CHUNK_SIZE = 1024 * 1024
+# Suffix of the files that are being written
+TMP_FILE_SUFFIX = ".part"
+
+
+def open_compressed(path: str, mode: str, compression: str = "gzip", compression_level: int = None):
+    """
+    Open a compressed file for writing ("wb") or a decompressed stream of it for reading ("rb").
+    """
+    if compression == "zstd":
+        import zstandard
+        f = open(path, mode)
+        if mode == "wb":
+            return zstandard.ZstdCompressor(level=compression_level or 10).stream_writer(f)
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+    return gzip.open(path, mode, compresslevel=compression_level or 6)
+
+
+def compress_file(source_path: str, destination_path: str, compression: str = "gzip", compression_level: int = None):
+    """
+    Compress the file in chunks to the destination path. The content is written to a temporary file first, so a
+    half written copy is never taken as valid.
+    """
+    tmp_path = "{}.{}{}".format(destination_path, uuid.uuid4().hex, TMP_FILE_SUFFIX)
+    try:
+        with open(source_path, "rb") as source, \
+                open_compressed(tmp_path, "wb", compression, compression_level) as destination:
+            for chunk in iter(lambda: source.read(COLD_STORAGE_CHUNK_SIZE), b""):
+                destination.write(chunk)
+        os.replace(tmp_path, destination_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return destination_path
+
+
+class ColdStorage(object):
+    """
+    This class stores compressed copies of the file contents, named by its content hash. The compression and the
+    decompression are made in chunks, so the files are never loaded in memory at once.
+
+    When the stored copies take more than 'quota' bytes, the least recently used ones are evicted. Each copy is
+    marked as used (its modification time is updated) when it's stored and every time it's read. The file manager
+    only evicts the copies of the contents that are in the upload directory or in the storage backend too.
+    """
+    def __init__(self, path: str, compression: str = "gzip", quota: int = None, compression_level: int = None):
+        if compression not in COMPRESSED_FILE_EXTENSIONS:
+            raise ValueError("Unknown compression format '{}'".format(compression))
+
+        self.path = path
+        self.compression = compression
+        self.compression_level = compression_level
+        self.quota = quota
+        os.makedirs(self.path, exist_ok=True)
+
+    def get_path(self, content_hash: str):
+        return os.path.join(self.path, content_hash[:2], content_hash + COMPRESSED_FILE_EXTENSIONS[self.compression])
+
+    def contains(self, content_hash: str):
+        return os.path.exists(self.get_path(content_hash))
+
+    def store(self, content_path: str, content_hash: str):
+        """
+        Save a compressed copy of the content. If the content is already stored, it's only marked as used.
+        """
+        path = self.get_path(content_hash)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return compress_file(content_path, path, self.compression, self.compression_level)
+
+    def open(self, content_hash: str):
+        """
+        Open a decompressed stream of the stored content.
+        """
+        path = self.get_path(content_hash)
+        os.utime(path)
+        return open_compressed(path, "rb", self.compression)
+
+    def restore(self, content_hash: str, destination_path: str):
+        """
+        Decompress the stored content to the destination path.
+        """
+        tmp_path = "{}.{}{}".format(destination_path, uuid.uuid4().hex, TMP_FILE_SUFFIX)
+        try:
+            with self.open(content_hash) as source, open(tmp_path, "wb") as destination:
+                for chunk in iter(lambda: source.read(COLD_STORAGE_CHUNK_SIZE), b""):
+                    destination.write(chunk)
+            os.replace(tmp_path, destination_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def remove(self, content_hash: str):
+        path = self.get_path(content_hash)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _get_stored_files(self):
+        stored_files = []
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(COMPRESSED_FILE_EXTENSIONS[self.compression]):
+                    stat = entry.stat()
+                    stored_files.append((stat.st_mtime, stat.st_size, entry.path))
+        return stored_files
+
+    def get_usage(self):
+        return sum(size for _, size, _ in self._get_stored_files())
+
+    def is_full(self):
+        return self.quota is not None and self.get_usage() > self.quota
+
+    def get_content_hash(self, path: str):
+        return os.path.basename(path)[:-len(COMPRESSED_FILE_EXTENSIONS[self.compression])]
+
+    def evict(self, can_be_evicted=None):
+        """
+        Remove the least recently used copies until the stored copies fit in the quota, and return its paths. If
+        'can_be_evicted' is given, only the copies whose content hash it accepts are removed, so the copies that
+        are the last one of its content are kept even if the quota is exceeded.
+        """
+        if self.quota is None:
+            return []
+
+        stored_files = sorted(self._get_stored_files())
+        usage = sum(size for _, size, _ in stored_files)
+        evicted_files = []
+
+        for _, size, path in stored_files:
+            if usage <= self.quota:
+                break
+            if can_be_evicted is not None and not can_be_evicted(self.get_content_hash(path)):
+                continue
+            os.remove(path)
+            usage -= size
+            evicted_files.append(path)
+
+        return evicted_files
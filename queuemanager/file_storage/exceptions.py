@@ -44,3 +44,10 @@ class FilesystemError(FileManagerError):
     This exception represents when there was an error accessing to the filesystem
     """
     pass
+
+
+class StorageObjectNotFound(FilesystemError):
+    """
+    This exception represents when a file content doesn't exist in the storage backend
+    """
+    pass
@@ -10,23 +10,53 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+import hashlib
 import json
 import os
-import subprocess
+import threading
+import time
+import uuid
 import warnings
-from datetime import timedelta
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 import math
+import re
+from eventlet import tpool
 from werkzeug.utils import secure_filename
 
+from .analysis_cache import AnalysisCache
+from .backends import create_storage_backend
+from .backends.local import SHARD_PREFIX_LENGTH, open_file_range
+from .cold_storage import ColdStorage, COMPRESSED_FILE_EXTENSIONS, compress_file
 from .exceptions import (
-    MissingFileDataKeys, InvalidFileType, FilesystemError, InvalidFileData
+    MissingFileDataKeys, InvalidFileType, FilesystemError, InvalidFileData, StorageObjectNotFound
 )
+from .file_mover import move_file
+from .gcode_analyzer import GCodeAnalysis, GCodeAnalyzer
+from .gcode_header import GCodeHeader, GCodeHeaderParser, find_line_data
+from .layer_index import LayerIndex
+from .unit_of_work import AnalysisUnitOfWork
+from ..catalog import CatalogIndex
 from ..database import DBManager
 from ..database import (
     File, Job, User
 )
 
+# Size of the chunks read from the uploaded file streams
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Suffix of the files that are being saved and don't have its final (content addressed) name yet
+TMP_FILE_SUFFIX = ".part"
+# Suffix of the layer index saved next to each file content
+LAYER_INDEX_SUFFIX = ".layers"
+# Number of layer indexes kept in memory
+LAYER_INDEX_CACHE_SIZE = 32
+# Suffixes of the files saved next to each file content
+SIDECAR_SUFFIXES = (LAYER_INDEX_SUFFIX,) + tuple(COMPRESSED_FILE_EXTENSIONS.values())
+
+_CONTENT_HASH_REGEX = re.compile(r"[0-9a-f]{64}")
+
 
 class FileDescriptor(object):
     """
@@ -37,6 +67,7 @@ class FileDescriptor(object):
         self.filename = filename
         self.path = path
         self.flask_file = flask_file_obj
+        self.content_hash = None
 
 
 class FileManager(object):
@@ -44,11 +75,19 @@ class FileManager(object):
     This class implements the interface for save and retrieve files from the filesystem.
     """
     def __init__(self, app=None, file_data_prefix=";PrintInfo/",
-                 file_data_end="/PrintInfo\n", db_manager: DBManager = None):
+                 file_data_end="/PrintInfo\n", db_manager: DBManager = None, catalog_index: CatalogIndex = None):
         self.app = None
         self.file_data_prefix = file_data_prefix
         self.file_data_end = file_data_end
         self.upload_dir = None
+        self.shard_levels = 0
+        self.accel_redirect_prefix = None
+        self.move_strategy_counters = Counter()
+        self.analysis_cache = None
+        self.cold_storage = None
+        self.storage = None
+        self._layer_indexes = OrderedDict()
+        self._local = threading.local()
 
         if app is not None:
             self.init_app(app)
@@ -59,11 +98,17 @@ class FileManager(object):
         else:
             self.db_manager = db_manager
 
+        if catalog_index is None:
+            from ..catalog import catalog_idx
+            self.catalog_index = catalog_idx
+        else:
+            self.catalog_index = catalog_index
+
     def set_db_manager(self, db_manager):
         self.db_manager = db_manager
 
     def _create_upload_dir(self):
-        os.makedirs(self.app.config.get('FILE_MANAGER_UPLOAD_DIR'), exist_ok=True)
+        os.makedirs(self.upload_dir, exist_ok=True)
 
     def _get_allowed_materials_and_extruder_types(self, file: File):
         # Prepare the allowed materials and extruder types data
@@ -73,14 +118,14 @@ class FileManager(object):
         for i in range(len(list(file.fileData["extruders"]))):
             extruder = dict(file.fileData["extruders"][i])
             if bool(extruder["enabled"]):
-                # Get all the materials in the socketio_printer of this type
+                # Get all the materials in the catalog of this type
                 materials_of_this_type = \
-                    self.db_manager.get_printer_materials(type=str(extruder["material"]["type"]))
+                    self.catalog_index.get_materials_by_type(str(extruder["material"]["type"]))
                 for material in materials_of_this_type:
                     allowed_materials.append((material, i))
-                # Get all the extruder types in the socketio_printer of this nozzle diameter
+                # Get all the extruder types in the catalog of this nozzle diameter
                 extruders_of_this_size = \
-                    self.db_manager.get_printer_extruder_types(nozzleDiameter=float(extruder["nozzle_size"]))
+                    self.catalog_index.get_extruder_types_by_nozzle_diameter(float(extruder["nozzle_size"]))
                 for extruder_type in extruders_of_this_size:
                     allowed_extruder_types.append((extruder_type, i))
 
@@ -112,16 +157,36 @@ class FileManager(object):
 
         return fields_to_update
 
-    def _identify_file_info(self, line: str, file: File):
-        line_elements = line.split(":")
-        if len(line_elements) == 2:
-            if line_elements[0].lower() == "time":
-                estimated_printing_time = timedelta(seconds=float(line_elements[1].strip()))
-                self.db_manager.update_file(file, estimatedPrintingTime=estimated_printing_time)
-            elif line_elements[0].lower() == "filament used":
-                estimated_needed_material = \
-                    self._calculate_weight_from_filament_distance(float(line_elements[1].strip()[:-1]))
-                self.db_manager.update_file(file, estimatedNeededMaterial=estimated_needed_material)
+    def _get_file_header_fields(self, header: GCodeHeader):
+        # Prepare the fields to modify at the file object
+        fields_to_update = {}
+
+        if header.estimated_printing_time is not None:
+            fields_to_update["estimatedPrintingTime"] = header.estimated_printing_time
+
+        if header.filament_used is not None:
+            fields_to_update["estimatedNeededMaterial"] = sum(
+                self._calculate_weight_from_filament_distance(extruded_filament_distance)
+                for extruded_filament_distance in header.filament_used
+            )
+
+        if header.file_data is not None:
+            fields_to_update["fileData"] = header.file_data
+
+        return fields_to_update
+
+    def _get_file_moves_fields(self, header: GCodeHeader, analysis: GCodeAnalysis):
+        # Prefer the slicer estimations (if they are in the header) over the moves analysis
+        if header.estimated_printing_time is not None:
+            estimated_printing_time = header.estimated_printing_time
+        else:
+            estimated_printing_time = analysis.estimated_printing_time
+
+        return {
+            "estimatedPrintingTime": estimated_printing_time,
+            "estimatedNeededMaterial": sum(self._calculate_weight_from_filament_distance(extruded_filament_distance)
+                                           for _, extruded_filament_distance in analysis.filament_used)
+        }
 
     def _get_extruder_estimated_needed_material(self, file: File):
         # Prepare the extruder estimated needed material array
@@ -141,20 +206,130 @@ class FileManager(object):
         return extruder_estimated_needed_material
 
     @staticmethod
-    def _save_flask_file(flask_file, destination):
+    def _copy_stream(source, destination, consumers=(), chunk_size: int = UPLOAD_CHUNK_SIZE):
+        # Copy the source stream to the destination, passing each chunk to the consumers too
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            destination.write(chunk)
+            for consumer in consumers:
+                consumer(chunk)
+
+    @staticmethod
+    def _read_file_chunks(path, consumers, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        # Read the whole file passing each chunk to the consumers
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                for consumer in consumers:
+                    consumer(chunk)
+
+    def _save_flask_file(self, flask_file, destination, consumers=()):
         try:
-            flask_file.save(destination)
+            with open(destination, "wb") as f:
+                self._copy_stream(flask_file.stream, f, consumers)
         except OSError:
             raise FilesystemError("Unable to save the file in the server storage")
 
-    @staticmethod
-    def _move_file_async(origin, destination):
+    def _store_file_content(self, tmp_path, content_hash: str):
+        destination_path = self.get_content_path(content_hash)
+
         try:
-            with open(os.devnull, 'w') as fp:
-                subprocess.run(["cp", origin, destination], check=True, stdout=fp, stderr=fp)
-        except (subprocess.CalledProcessError, OSError):
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        except OSError:
             raise FilesystemError("Unable to save the file in the server storage")
 
+        # The temporary file is linked (not moved) to the content path, so the content can be stored again if it's
+        # deleted before the file is saved in the database (see _check_stored_content())
+        try:
+            os.link(tmp_path, destination_path)
+        except FileExistsError:
+            # The same content is already stored
+            pass
+        except OSError:
+            raise FilesystemError("Unable to save the file in the server storage")
+
+        # Upload the content to the storage backend (the local copy is removed once the file is saved)
+        if not self.storage.is_local and not self.storage.exists(content_hash):
+            try:
+                with open(destination_path, "rb") as f:
+                    tpool.execute(self.storage.put_stream, content_hash, f)
+            except OSError:
+                raise FilesystemError("Unable to save the file in the server storage")
+
+        return destination_path
+
+    def _check_stored_content(self, tmp_path, destination_path, content_hash: str):
+        """
+        Store the content again if another file with the same content was deleted between the content was stored
+        and the new file was saved in the database (the deletion only sees the new reference after the commit).
+        With a remote storage backend, the local copy stored by this file is removed once the content is uploaded.
+        """
+        try:
+            if self.storage.is_local:
+                if not os.path.exists(destination_path):
+                    self.app.logger.warning("The content '{}' was deleted while saving a file, storing it "
+                                            "again".format(content_hash))
+                    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                    os.link(tmp_path, destination_path)
+            else:
+                if not self.storage.exists(content_hash):
+                    self.app.logger.warning("The content '{}' was deleted while saving a file, storing it "
+                                            "again".format(content_hash))
+                    with open(tmp_path, "rb") as f:
+                        tpool.execute(self.storage.put_stream, content_hash, f)
+                # The local copy that was already there is kept, someone can be reading it
+                if os.path.exists(destination_path) and os.path.samefile(tmp_path, destination_path):
+                    self.remove_local_copy(content_hash)
+        except FileExistsError:
+            # The content was stored again by someone else
+            pass
+        except OSError:
+            raise FilesystemError("Unable to save the file in the server storage")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def remove_local_copy(self, content_hash: str):
+        """
+        Remove the copy of the content from the upload directory (and its compressed copies) if the content is in
+        the remote storage backend. It's downloaded again when it's needed. Returns False if it isn't removed.
+        """
+        if self.storage.is_local or not self.storage.exists(content_hash):
+            return False
+
+        path = self.get_content_path(content_hash)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._remove_compressed_files(path)
+
+        return True
+
+    def _get_file_with_same_content(self, file_obj: File, path: str):
+        for known_file in self.db_manager.get_files(fullPath=path):
+            if known_file.id != file_obj.id and known_file.fileData:
+                return known_file
+        return None
+
+    def _count_file_references(self, path: str):
+        return len(self.db_manager.get_files(fullPath=path))
+
+    def _move_file_async(self, origin, destination):
+        initial_time = time.time()
+
+        # Move the file from a native thread, so the eventlet hub isn't blocked during the copy
+        try:
+            strategy = tpool.execute(move_file, origin, destination)
+        except OSError as e:
+            self.app.logger.error("Unable to move the file '{}' to '{}'. Details: {}".format(origin, destination, e))
+            raise FilesystemError("Unable to save the file in the server storage")
+
+        self.move_strategy_counters[strategy] += 1
+        self.app.logger.info("File '{}' moved to '{}' using the '{}' strategy in {:.3f} seconds".format(
+            origin, destination, strategy, time.time() - initial_time))
+
     def init_app(self, app, create_upload_dir=True):
         self.app = app
 
@@ -166,25 +341,38 @@ class FileManager(object):
                 'Defaulting FILE_MANAGER_UPLOAD_DIR to "./data/files/".'
             )
 
-        self.upload_dir = app.config.setdefault('FILE_MANAGER_UPLOAD_DIR ', './data/files')
+        self.upload_dir = app.config.setdefault('FILE_MANAGER_UPLOAD_DIR', './data/files/')
+        self.shard_levels = app.config.setdefault('FILE_MANAGER_SHARD_LEVELS', 2)
+        self.accel_redirect_prefix = app.config.setdefault('FILE_MANAGER_ACCEL_REDIRECT_PREFIX', '/files/')
+        self.storage = create_storage_backend(app.config)
+        self.precompressed_encodings = app.config.setdefault('FILE_MANAGER_PRECOMPRESSED_ENCODINGS', ['gzip'])
+        for encoding in self.precompressed_encodings:
+            if encoding not in COMPRESSED_FILE_EXTENSIONS:
+                raise ValueError("Unknown precompressed encoding '{}'".format(encoding))
 
         if create_upload_dir:
             self._create_upload_dir()
 
+        analysis_cache_path = app.config.get('FILE_MANAGER_ANALYSIS_CACHE_PATH')
+        if analysis_cache_path is not None:
+            self.analysis_cache = AnalysisCache(
+                analysis_cache_path, app.config.get('FILE_MANAGER_ANALYSIS_CACHE_SIZE', 10000))
+
+        cold_storage_dir = app.config.get('FILE_MANAGER_COLD_STORAGE_DIR')
+        if cold_storage_dir is not None:
+            self.cold_storage = ColdStorage(
+                cold_storage_dir, app.config.get('FILE_MANAGER_COLD_STORAGE_COMPRESSION', 'gzip'),
+                app.config.get('FILE_MANAGER_COLD_STORAGE_QUOTA'))
+
     def retrieve_file_data(self, file: File):
-        # Initialize the file data variable
-        file_data_str = ""
-        # Open the file for reading
-        with self.get_file_d(file) as f:
-            # Search for the file data start
-            for line in f:
-                if line.startswith(self.file_data_prefix) and line.endswith(self.file_data_end):
-                    file_data_str = line[len(self.file_data_prefix):line.find(self.file_data_end)]
+        # Search for the file data line, starting from the end of the file (where the slicer writes it)
+        with self.get_file_d(file, binary=True) as f:
+            file_data_str = find_line_data(f, self.file_data_prefix.encode(), self.file_data_end.encode())
 
         if file_data_str:
             try:
-                file_data = json.loads(file_data_str)
-            except json.JSONDecodeError as e:
+                file_data = json.loads(file_data_str.decode())
+            except ValueError as e:
                 self.app.logger.error("The file data can't be loaded. Details: " + str(e))
                 raise InvalidFileData("The file data can't be loaded. Details: " + str(e))
             self.db_manager.update_file(file, fileData=file_data)
@@ -193,20 +381,98 @@ class FileManager(object):
                 "The file data can't be loaded. Details: The file don't contain the data dictionary")
             raise InvalidFileData("The file data can't be loaded. Details: The file don't contain the data dictionary")
 
+    def _check_file_data_error(self, file: File, header: GCodeHeader):
+        if header.file_data_error is not None:
+            self.app.logger.warning("The file data of the file '" + str(file) + "' can't be loaded. "
+                                    "Details: " + header.file_data_error)
+
+    def read_file_header(self, file: File, read_file_data: bool = True):
+        parser = GCodeHeaderParser(self.file_data_prefix, self.file_data_end)
+
+        # Read the header comments from the file beginning and the file data from the file end
+        with self.get_file_d(file, binary=True) as f:
+            try:
+                header = parser.parse_file(f, read_file_data=read_file_data)
+            except (ValueError, TypeError):
+                self.app.logger.error("Can't read the file '" + str(file) + "' information. "
+                                      "Try to obtain it from the file data")
+                raise InvalidFileData("There was an error retrieving the file information")
+
+        self._check_file_data_error(file, header)
+
+        return header
+
+    def analyze_file_moves(self, file: File):
+        # Analyze all the moves of the file, this is much slower than reading the header
+        with self.get_file_d(file, binary=True) as f:
+            analysis = GCodeAnalyzer().analyze_file(f)
+
+        # Save the layer index built while analyzing the moves next to the file content
+        try:
+            analysis.layer_index.save(self.get_layer_index_path(file))
+        except OSError as e:
+            self.app.logger.warning("The layer index of the file '" + str(file) + "' can't be saved. "
+                                    "Details: " + str(e))
+
+        return analysis
+
+    def get_layer_index_path(self, file: File):
+        return self.get_file_path(file) + LAYER_INDEX_SUFFIX
+
+    def get_layer_index(self, file: File):
+        """
+        Return the layer index of the file (or None if the file moves weren't analyzed yet).
+        """
+        path = self.get_layer_index_path(file)
+
+        if path in self._layer_indexes:
+            self._layer_indexes.move_to_end(path)
+            return self._layer_indexes[path]
+
+        try:
+            layer_index = LayerIndex.load(path)
+        except (OSError, ValueError):
+            return None
+
+        self._layer_indexes[path] = layer_index
+        if len(self._layer_indexes) > LAYER_INDEX_CACHE_SIZE:
+            self._layer_indexes.popitem(last=False)
+
+        return layer_index
+
+    def get_job_progress_info(self, job: Job, progress: float):
+        """
+        Map the job printing progress to the layer that is being printed and the estimated time left (or None
+        and None if the file doesn't have a layer index).
+        """
+        layer_index = self.get_layer_index(job.file)
+        if layer_index is None:
+            return None, None
+
+        estimated_printing_time = job.file.estimatedPrintingTime
+        layer, seconds_left = layer_index.get_progress_info(
+            progress, estimated_printing_time.total_seconds() if estimated_printing_time is not None else None)
+
+        return layer, timedelta(seconds=seconds_left) if seconds_left is not None else None
+
+    def retrieve_file_header(self, file: File, read_file_data: bool = True):
+        header = self.read_file_header(file, read_file_data)
+
+        # Save all the retrieved information with only one update
+        fields_to_update = self._get_file_header_fields(header)
+
+        # If the header doesn't have the file estimations, calculate them from the file moves
+        if header.estimated_printing_time is None or header.filament_used is None:
+            moves_fields = self._get_file_moves_fields(header, self.analyze_file_moves(file))
+            for key, value in moves_fields.items():
+                fields_to_update.setdefault(key, value)
+        if fields_to_update:
+            self.db_manager.update_file(file, **fields_to_update)
+
+        return header
+
     def retrieve_file_basic_info(self, file: File):
-        # Open the file for reading
-        with self.get_file_d(file) as f:
-            # Search for the file data start
-            for line in f:
-                if line[0] == ";":
-                    try:
-                        self._identify_file_info(line[1:], file)
-                    except (ValueError, TypeError):
-                        self.app.logger.error("Can't read the file '" + str(file) + "' information. "
-                                              "Try to obtain it from the file data")
-                        raise InvalidFileData("There was an error retrieving the file information")
-                    if file.estimatedPrintingTime is not None and file.estimatedNeededMaterial is not None:
-                        break
+        return self.retrieve_file_header(file, read_file_data=False)
 
     def set_job_allowed_config_from_file_data(self, job: Job):
         # Check that the file data is not empty
@@ -226,12 +492,14 @@ class FileManager(object):
                                   "'. Details: One of the values of the file data is corrupted")
             raise InvalidFileData("One of the values of the file data is corrupted")
 
-        # Add the allowed materials and extruder types to the job information
-        self.db_manager.insert_job_allowed_materials(job, allowed_materials)
-        self.db_manager.insert_job_allowed_extruder_types(job, allowed_extruder_types)
-
-        # Set the job 'analyzed' flag to true
-        self.db_manager.update_job(job, analyzed=True)
+        # Add the allowed materials and extruder types to the job information and set the job 'analyzed' flag to
+        # true (the catalog index only has the ids of the materials and extruder types, not the ORM objects)
+        with self.unit_of_work() as unit_of_work:
+            unit_of_work.add_job_allowed_materials(
+                job, [(material.id, index) for material, index in allowed_materials])
+            unit_of_work.add_job_allowed_extruder_types(
+                job, [(extruder_type.id, index) for extruder_type, index in allowed_extruder_types])
+            unit_of_work.set_job_analyzed(job)
 
         return job
 
@@ -255,7 +523,11 @@ class FileManager(object):
             raise InvalidFileData("One of the values of the file data is corrupted")
 
         # Update the fields in the file object
-        self.db_manager.update_file(file, **fields_to_update)
+        unit_of_work = self.get_unit_of_work()
+        if unit_of_work is not None:
+            unit_of_work.update_file(file, **fields_to_update)
+        else:
+            self.db_manager.update_file(file, **fields_to_update)
 
         return file
 
@@ -278,6 +550,11 @@ class FileManager(object):
                                   + str(job) + "'. Details: One of the values of the file data is corrupted")
             raise InvalidFileData("One of the values of the file data is corrupted")
 
+        unit_of_work = self.get_unit_of_work()
+        if unit_of_work is not None:
+            unit_of_work.set_job_extruders_needed_material(job, extruders_estimated_needed_materials)
+            return job
+
         # Update the job extruders data
         for estimated_needed_material, index in extruders_estimated_needed_materials:
             # Get the job extruder data for this extruder index
@@ -294,6 +571,148 @@ class FileManager(object):
 
         return job
 
+    def set_job_information_from_file_moves(self, job: Job):
+        # Get the file information from the header comments (if any) and the file moves
+        header = self.read_file_header(job.file, read_file_data=False)
+        analysis = self.analyze_file_moves(job.file)
+        nozzle_diameters = dict(header.extruders_used)
+
+        # Without the slicer data the material is unknown, so all the materials are allowed. The extruder types are
+        # only limited when the header says the nozzle diameter of the extruder.
+        allowed_materials = []
+        allowed_extruder_types = []
+        extruders_estimated_needed_materials = []
+
+        for index, extruded_filament_distance in analysis.filament_used:
+            allowed_materials += [(material.id, index) for material in self.catalog_index.get_materials()]
+            if index in nozzle_diameters:
+                extruder_types = self.catalog_index.get_extruder_types_by_nozzle_diameter(nozzle_diameters[index])
+            else:
+                extruder_types = self.catalog_index.get_extruder_types()
+            allowed_extruder_types += [(extruder_type.id, index) for extruder_type in extruder_types]
+            extruders_estimated_needed_materials.append(
+                (self._calculate_weight_from_filament_distance(extruded_filament_distance), index))
+
+        with self.unit_of_work() as unit_of_work:
+            unit_of_work.update_file(job.file, **self._get_file_moves_fields(header, analysis))
+            unit_of_work.add_job_allowed_materials(job, allowed_materials)
+            unit_of_work.add_job_allowed_extruder_types(job, allowed_extruder_types)
+            unit_of_work.set_job_extruders_needed_material(job, extruders_estimated_needed_materials)
+            unit_of_work.set_job_analyzed(job)
+
+        return job
+
+    def _get_analysis_cache_key(self, file: File):
+        # Use the file content hash or, if it's unknown, the file data hash
+        content_hash = self.get_file_hash(file)
+        if content_hash is None:
+            if not file.fileData:
+                return None
+            content_hash = hashlib.sha256(json.dumps(file.fileData, sort_keys=True).encode()).hexdigest()
+        return "{}:{}".format(content_hash, self.catalog_index.get_digest())
+
+    @staticmethod
+    def _get_job_analysis_result(job: Job):
+        file = job.file
+        return {
+            "estimated_printing_time": file.estimatedPrintingTime.total_seconds()
+            if file.estimatedPrintingTime is not None else None,
+            "estimated_needed_material": file.estimatedNeededMaterial,
+            "allowed_materials": [(allowed_material.idMaterial, allowed_material.extruderIndex)
+                                  for allowed_material in job.allowed_materials],
+            "allowed_extruder_types": [(allowed_extruder.idExtruderType, allowed_extruder.extruderIndex)
+                                       for allowed_extruder in job.allowed_extruder_types],
+            "extruders_needed_material": [(job_extruder.estimatedNeededMaterial, job_extruder.extruderIndex)
+                                          for job_extruder in job.extruders_data]
+        }
+
+    def _stage_job_analysis_result(self, job: Job, result: dict):
+        unit_of_work = self.get_unit_of_work()
+
+        # Update the file information
+        fields_to_update = {"estimatedNeededMaterial": result["estimated_needed_material"]}
+        if result["estimated_printing_time"] is not None:
+            fields_to_update["estimatedPrintingTime"] = timedelta(seconds=result["estimated_printing_time"])
+        unit_of_work.update_file(job.file, **fields_to_update)
+
+        # Add the allowed configuration and the estimated needed material per extruder
+        unit_of_work.add_job_allowed_materials(job, result["allowed_materials"])
+        unit_of_work.add_job_allowed_extruder_types(job, result["allowed_extruder_types"])
+        unit_of_work.set_job_extruders_needed_material(job, result["extruders_needed_material"])
+        unit_of_work.set_job_analyzed(job)
+
+    def get_unit_of_work(self):
+        return getattr(self._local, "unit_of_work", None)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Stage all the analysis writes made inside the context and save them in a single transaction when the
+        context exits. If an exception is raised, the staged writes are discarded.
+        """
+        # Inside another unit of work, the writes are saved when the outer one exits
+        if self.get_unit_of_work() is not None:
+            yield self.get_unit_of_work()
+            return
+
+        self._local.unit_of_work = AnalysisUnitOfWork()
+        try:
+            yield self._local.unit_of_work
+            self._local.unit_of_work.flush(self.db_manager)
+        finally:
+            self._local.unit_of_work = None
+
+    def analyze_job(self, job: Job, build_layer_index: bool = False):
+        """
+        Analyze the job from the file data or, if the file doesn't have it, from the file moves. The layer index of
+        the files with file data is only built if 'build_layer_index' is True, because it needs the analysis of
+        all the file moves (too slow for the Socket.IO server, it should only be done by the analysis workers).
+        """
+        # Retrieve the file data if needed
+        if not job.file.fileData:
+            try:
+                self.retrieve_file_data(job.file)
+            except InvalidFileData:
+                self.app.logger.info("The file of the job '" + str(job) + "' will be analyzed from its moves")
+
+        cache_key = result = None
+        if self.analysis_cache is not None:
+            cache_key = self._get_analysis_cache_key(job.file)
+            if cache_key is not None:
+                result = self.analysis_cache.get(cache_key)
+
+        with self.unit_of_work():
+            if result is not None:
+                # The same file was already analyzed, apply the same result to this job
+                self._stage_job_analysis_result(job, result)
+                return job
+
+            if not job.file.fileData:
+                # Without the slicer data, get the job information from the file moves
+                self.set_job_information_from_file_moves(job)
+                return job
+
+            # Update the file information from the file data
+            self.set_file_information_from_file_data(job.file)
+            # Get the job allowed configuration from the file data
+            self.set_job_allowed_config_from_file_data(job)
+            # Get the job estimated needed material per extruder from the file data
+            self.set_job_estimated_needed_material_from_file_data(job)
+
+        if cache_key is not None:
+            self.analysis_cache.set(cache_key, self._get_job_analysis_result(job))
+
+        # The slicer data doesn't have the layers, so build the layer index from the file moves
+        if build_layer_index and self.get_layer_index(job.file) is None:
+            self.analyze_file_moves(job.file)
+
+        return job
+
+    def _remove_failed_file(self, file_obj: File, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+        self.db_manager.delete_file(file_obj)
+
     def save_file(self, file: FileDescriptor, user: User):
         # Check that the file is in gcode format
         if '.' in file.filename and file.filename.rsplit('.', 1)[1].lower() != 'gcode':
@@ -302,41 +721,432 @@ class FileManager(object):
         # Create the file object in the socketio_printer
         file_obj = self.db_manager.insert_file(user, file.filename)
 
-        # Set the file ID as the new filename and generate the destination path
-        filename = str(file_obj.id)
-        destination_path = os.path.join(self.app.config['FILE_MANAGER_UPLOAD_DIR'], secure_filename(filename))
+        # The file is saved with a temporary name until its content hash is known
+        tmp_path = os.path.join(self.upload_dir, secure_filename(str(file_obj.id)) + TMP_FILE_SUFFIX)
 
-        # Save the file to the filesystem
+        # Save the file to the filesystem, reading its header and hashing it at the same time
+        parser = GCodeHeaderParser(self.file_data_prefix, self.file_data_end)
+        content_hash = hashlib.sha256()
         try:
             if file.flask_file is not None:
-                self._save_flask_file(file.flask_file, destination_path)
+                self._save_flask_file(file.flask_file, tmp_path, (content_hash.update, parser.feed))
             else:
-                self._move_file_async(file.path, destination_path)
+                self._move_file_async(file.path, tmp_path)
+                tpool.execute(self._read_file_chunks, tmp_path, (content_hash.update, parser.feed))
+            header = parser.close()
+            file.content_hash = content_hash.hexdigest()
+            destination_path = self._store_file_content(tmp_path, file.content_hash)
         except FilesystemError as e:
-            self.db_manager.delete_file(file_obj)
+            self._remove_failed_file(file_obj, tmp_path)
             raise e
+        except OSError:
+            self._remove_failed_file(file_obj, tmp_path)
+            raise FilesystemError("Unable to read the saved file from the server storage")
+        except (ValueError, TypeError):
+            self._remove_failed_file(file_obj, tmp_path)
+            self.app.logger.error("Can't read the file '" + str(file_obj) + "' information.")
+            raise InvalidFileData("There was an error retrieving the file information")
 
-        # Update the file path
-        self.db_manager.update_file(file_obj, fullPath=destination_path)
+        # If the same content was already analyzed, take the file information from there
+        known_file = self._get_file_with_same_content(file_obj, destination_path)
+        if known_file is not None:
+            fields_to_update = {
+                "estimatedPrintingTime": known_file.estimatedPrintingTime,
+                "estimatedNeededMaterial": known_file.estimatedNeededMaterial,
+                "fileData": known_file.fileData
+            }
+        else:
+            self._check_file_data_error(file_obj, header)
+            fields_to_update = self._get_file_header_fields(header)
+
+        # Update the file path and the file information
+        self.db_manager.update_file(file_obj, fullPath=destination_path, **fields_to_update)
+        self._check_stored_content(tmp_path, destination_path, file.content_hash)
 
         return file_obj
 
-    def delete_file(self, file: File):
-        # Delete the file from the filesystem
-        if os.path.exists(file.fullPath):
-            os.remove(file.fullPath)
+    def _take_file_content(self, path: str, content_hash: str):
+        # Move the content out of its path, so nobody can read it while it's being deleted. If it isn't in the
+        # upload directory, a copy is taken from the cold storage or the storage backend.
+        trash_path = "{}.{}{}".format(path, uuid.uuid4().hex, TMP_FILE_SUFFIX)
+
+        if os.path.exists(path):
+            os.rename(path, trash_path)
+            # Keep the reconciler grace period away from the content meanwhile
+            os.utime(trash_path)
+        elif self.cold_storage is not None and content_hash is not None and self.cold_storage.contains(content_hash):
+            tpool.execute(self.cold_storage.restore, content_hash, trash_path)
+        elif not self.storage.is_local and content_hash is not None:
+            tpool.execute(self._download_content, content_hash, trash_path)
         else:
-            raise FilesystemError("File '{}' not found in the filesystem.".format(file.fullPath))
+            return None
+
+        return trash_path
+
+    def _put_back_file_content(self, path: str, content_hash: str, trash_path: str):
+        os.replace(trash_path, path)
+        if not self.storage.is_local and content_hash is not None and not self.storage.exists(content_hash):
+            with open(path, "rb") as f:
+                tpool.execute(self.storage.put_stream, content_hash, f)
+
+    def _restore_taken_file_content(self, path: str, content_hash: str, trash_path: str):
+        # Put the content back after a failed deletion, or remove it if that isn't possible either
+        try:
+            self._put_back_file_content(path, content_hash, trash_path)
+        except (OSError, StorageObjectNotFound, FilesystemError) as e:
+            self.app.logger.error("Unable to put back the content of the file '{}'. Details: {}".format(path, e))
+            if os.path.exists(trash_path):
+                os.remove(trash_path)
+
+    def delete_file(self, file: File):
+        full_path = file.fullPath
+        content_hash = self.get_file_hash(file)
+        path = self.get_file_path(file)
+
+        if not self.content_exists(file):
+            raise FilesystemError("File '{}' not found in the filesystem.".format(path))
 
         # Delete the file from the socketio_printer
         self.db_manager.delete_file(file)
 
+        # Delete the file content from the filesystem only if there isn't any other file referencing it
+        if self._count_file_references(full_path) > 0:
+            return
+
+        # A file with the same content can be saved at the same time (the content is stored before the file is
+        # saved in the database). So the content is taken out first, and the references are counted again once all
+        # its copies are removed: if there's a new one, the content is put back. Otherwise, the new file will store
+        # the content again when it checks it after saving (see _check_stored_content()).
+        try:
+            trash_path = self._take_file_content(path, content_hash)
+            try:
+                if self.cold_storage is not None and content_hash is not None:
+                    self.cold_storage.remove(content_hash)
+                if not self.storage.is_local and content_hash is not None:
+                    self.storage.delete(content_hash)
+            except (OSError, StorageObjectNotFound, FilesystemError):
+                # Keep the content where it was, the reconciler removes it later if nothing references it
+                if trash_path is not None:
+                    self._restore_taken_file_content(path, content_hash, trash_path)
+                raise
+
+            if trash_path is not None and self._count_file_references(full_path) > 0:
+                self._put_back_file_content(path, content_hash, trash_path)
+                return
+
+            if trash_path is not None:
+                os.remove(trash_path)
+            self._layer_indexes.pop(path + LAYER_INDEX_SUFFIX, None)
+            self._remove_compressed_files(path)
+            if os.path.exists(path + LAYER_INDEX_SUFFIX):
+                os.remove(path + LAYER_INDEX_SUFFIX)
+        except (OSError, StorageObjectNotFound, FilesystemError) as e:
+            self.app.logger.error("Unable to delete the content of the file '{}'. Details: {}".format(path, e))
+            raise FilesystemError("Unable to delete the file from the server storage")
+
+    @staticmethod
+    def _remove_compressed_files(path: str):
+        for extension in COMPRESSED_FILE_EXTENSIONS.values():
+            if os.path.exists(path + extension):
+                os.remove(path + extension)
+
+    def get_content_path(self, content_hash: str):
+        # The contents are distributed in nested directories named by the first characters of its hash
+        shards = [content_hash[i * SHARD_PREFIX_LENGTH:(i + 1) * SHARD_PREFIX_LENGTH]
+                  for i in range(self.shard_levels)]
+        return os.path.join(self.upload_dir, *shards, content_hash)
+
+    def get_file_path(self, file: File):
+        """
+        Return the path of the file content in the filesystem. If the content isn't in the saved path, but in the
+        sharded layout path, the file was migrated after it was loaded from the database.
+        """
+        path = file.fullPath
+        if os.path.exists(path):
+            return path
+
+        content_hash = self.get_file_hash(file)
+        if content_hash is not None and os.path.exists(self.get_content_path(content_hash)):
+            return self.get_content_path(content_hash)
+
+        return path
+
+    def content_exists(self, file: File):
+        """
+        Check if the file content is in the upload directory or in the cold storage.
+        """
+        if os.path.exists(self.get_file_path(file)):
+            return True
+
+        content_hash = self.get_file_hash(file)
+        if content_hash is None:
+            return False
+        if self.cold_storage is not None and self.cold_storage.contains(content_hash):
+            return True
+        return not self.storage.is_local and self.storage.exists(content_hash)
+
+    def move_file_to_cold_storage(self, file: File):
+        """
+        Save a compressed copy of the file content in the cold storage and remove it from the upload directory.
+        Without a cold storage, the content is only removed from the upload directory if it's in the remote storage
+        backend. Returns False if the file can't be moved.
+        """
+        content_hash = self.get_file_hash(file)
+        if content_hash is None:
+            return False
+        if self.cold_storage is None:
+            # The storage backend is the cold storage of the local copies
+            if not self.remove_local_copy(content_hash):
+                return False
+            self.app.logger.info("Local copy of the file '{}' removed".format(file))
+            return True
+
+        path = self.get_file_path(file)
+        self.cold_storage.store(path, content_hash)
+        os.remove(path)
+        self._remove_compressed_files(path)
+        self.app.logger.info("File '{}' moved to the cold storage".format(file))
+
+        return True
+
+    def _has_hot_copy(self, content_hash: str):
+        # The content is in the upload directory or in the storage backend, so its cold copy isn't the last one
+        if os.path.exists(self.get_content_path(content_hash)):
+            return True
+        return not self.storage.is_local and self.storage.exists(content_hash)
+
+    def evict_cold_storage(self):
+        """
+        Evict the least recently used copies of the cold storage that aren't the last copy of its content, and
+        return its paths. The cold storage can stay over its quota if all the copies are the last one.
+        """
+        if self.cold_storage is None:
+            return []
+        return self.cold_storage.evict(self._has_hot_copy)
+
+    def rehydrate_file(self, file: File):
+        """
+        Return the path of the file content, restoring it from the cold storage or downloading it from the storage
+        backend if it isn't in the upload directory. The content is copied in chunks from a native thread, so the
+        eventlet hub isn't blocked meanwhile.
+        """
+        path = self.get_file_path(file)
+        if os.path.exists(path):
+            return path
+
+        content_hash = self.get_file_hash(file)
+        if content_hash is None:
+            return path
+
+        if self.cold_storage is not None and self.cold_storage.contains(content_hash):
+            source, restore = "cold storage", self.cold_storage.restore
+        elif not self.storage.is_local:
+            source, restore = "storage backend", self._download_content
+        else:
+            return path
+
+        initial_time = time.time()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tpool.execute(restore, content_hash, path)
+        except StorageObjectNotFound:
+            return path
+        except OSError as e:
+            self.app.logger.error("Unable to restore the file '{}' from the {}. Details: {}".format(file, source, e))
+            raise FilesystemError("Can't retrieve the file from filesystem.")
+
+        self.app.logger.info("File '{}' restored from the {} in {:.3f} seconds".format(
+            file, source, time.time() - initial_time))
+
+        return path
+
+    def _download_content(self, content_hash: str, destination_path: str):
+        tmp_path = destination_path + TMP_FILE_SUFFIX
+        try:
+            with self.storage.get_stream(content_hash) as source, open(tmp_path, "wb") as destination:
+                self._copy_stream(source, destination)
+            os.replace(tmp_path, destination_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_file_stream(self, file: File, start: int = 0, end: int = None):
+        """
+        Open a binary stream of the file content from the byte 'start' until the byte 'end' (not included). If the
+        content isn't in the upload directory, it's read directly from the storage backend.
+        """
+        path = self.get_file_path(file)
+        content_hash = self.get_file_hash(file)
+
+        if not os.path.exists(path) and not self.storage.is_local and content_hash is not None:
+            if end is None:
+                end = self.storage.stat(content_hash).size
+            return self.storage.get_range(content_hash, start, end)
+
+        path = self.rehydrate_file(file)
+        try:
+            return open_file_range(path, start, end)
+        except OSError:
+            raise FilesystemError("Can't retrieve the file from filesystem.")
+
+    def get_compressed_file_path(self, file: File, encoding: str):
+        return self.get_file_path(file) + COMPRESSED_FILE_EXTENSIONS[encoding]
+
+    def get_compressed_file(self, file: File, encoding: str):
+        """
+        Return the path of the compressed copy of the file content with this encoding ('gzip' or 'zstd'). The copy
+        is saved next to the content the first time it's requested, compressing it from a native thread.
+        """
+        if encoding not in self.precompressed_encodings:
+            raise ValueError("The encoding '{}' isn't enabled".format(encoding))
+
+        path = self.rehydrate_file(file)
+        compressed_path = path + COMPRESSED_FILE_EXTENSIONS[encoding]
+        if os.path.exists(compressed_path):
+            return compressed_path
+
+        initial_time = time.time()
+        try:
+            tpool.execute(compress_file, path, compressed_path, encoding)
+        except OSError as e:
+            self.app.logger.error("Unable to compress the file '{}'. Details: {}".format(file, e))
+            raise FilesystemError("Can't retrieve the file from filesystem.")
+
+        self.app.logger.info("File '{}' compressed with {} in {:.3f} seconds".format(
+            file, encoding, time.time() - initial_time))
+
+        return compressed_path
+
+    def get_accel_redirect_path(self, file: File, encoding: str = None):
+        """
+        Return the URI of the file (or of its compressed copy with this encoding) for the nginx internal
+        redirection, relative to the upload directory.
+        """
+        if encoding is not None:
+            path = self.get_compressed_file(file, encoding)
+        else:
+            path = self.rehydrate_file(file)
+        path = os.path.relpath(path, self.upload_dir)
+        if path.startswith(os.pardir):
+            raise FilesystemError("File '{}' is outside the upload directory.".format(file.fullPath))
+
+        return self.accel_redirect_prefix + path.replace(os.sep, "/")
+
     @staticmethod
-    def get_file_d(file: File):
-        # Open the file from the full path
-        if os.path.exists(file.fullPath):
+    def _hash_file_content(path: str):
+        content_hash = hashlib.sha256()
+        FileManager._read_file_chunks(path, (content_hash.update,))
+        return content_hash.hexdigest()
+
+    def _migrate_file_content(self, path: str):
+        files = self.db_manager.get_files(fullPath=path)
+        if not files:
+            # Nothing references this content
+            return False
+
+        # The files saved before the content addressed storage are named by its id
+        content_hash = os.path.basename(path)
+        if not _CONTENT_HASH_REGEX.fullmatch(content_hash):
+            content_hash = self._hash_file_content(path)
+
+        destination_path = self.get_content_path(content_hash)
+        if destination_path == path:
+            return False
+
+        # Link the content to the new path first, so the file is always accessible during the migration
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        for suffix in ("",) + SIDECAR_SUFFIXES:
+            try:
+                os.link(path + suffix, destination_path + suffix)
+            except FileExistsError:
+                # The same content was already migrated
+                pass
+            except FileNotFoundError:
+                # The file doesn't have this sidecar
+                pass
+
+        for file in files:
+            self.db_manager.update_file(file, fullPath=destination_path)
+
+        for suffix in ("",) + SIDECAR_SUFFIXES:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        self._layer_indexes.pop(path + LAYER_INDEX_SUFFIX, None)
+
+        return True
+
+    def migrate_to_sharded_layout(self):
+        """
+        Move the files stored directly in the upload directory to the sharded layout and return how many of them
+        were moved. The migration can run while the server is running: each content is linked to its new path
+        before the database references are updated, and its old path is removed at the end, so the files can be
+        resolved with get_file_path() at any moment.
+        """
+        migrated_files = 0
+
+        for entry in os.scandir(self.upload_dir):
+            if not entry.is_file() or entry.name.endswith((TMP_FILE_SUFFIX,) + SIDECAR_SUFFIXES):
+                continue
+
+            path = os.path.join(self.upload_dir, entry.name)
+            try:
+                if self._migrate_file_content(path):
+                    migrated_files += 1
+                    self.app.logger.info("File '{}' moved to the sharded layout".format(path))
+            except OSError as e:
+                self.app.logger.error("Unable to move the file '{}' to the sharded layout. Details: {}".format(
+                    path, e))
+
+        return migrated_files
+
+    @staticmethod
+    def get_file_hash(file: File):
+        # The stored files are named by its content hash
+        filename = os.path.basename(file.fullPath or "")
+        if _CONTENT_HASH_REGEX.fullmatch(filename):
+            return filename
+        return None
+
+    def get_file_validators(self, file: File, encoding: str = None):
+        """
+        Return the HTTP validators of the file content: the entity tag, the last modification date and the size.
+        The content hash is used as entity tag, so it doesn't change when the same content is uploaded again. If an
+        encoding is given, the validators are the ones of the compressed copy of the content.
+        """
+        etag = self.get_file_hash(file)
+
+        if encoding is not None:
+            try:
+                stat = os.stat(self.get_compressed_file(file, encoding))
+            except OSError:
+                raise FilesystemError("File '{}' not found in the filesystem.".format(file.fullPath))
+            if etag is None:
+                etag = "{}-{}".format(int(stat.st_mtime), file.id)
+            return "{}-{}".format(etag, encoding), datetime.fromtimestamp(int(stat.st_mtime), timezone.utc), \
+                stat.st_size
+
+        # Don't download the content from the storage backend only for getting its validators
+        if etag is not None and not self.storage.is_local and not os.path.exists(self.get_file_path(file)):
+            stat = self.storage.stat(etag)
+            return etag, stat.last_modified, stat.size
+
+        try:
+            stat = os.stat(self.rehydrate_file(file))
+        except OSError:
+            raise FilesystemError("File '{}' not found in the filesystem.".format(file.fullPath))
+
+        if etag is None:
+            etag = "{}-{}-{}".format(int(stat.st_mtime), stat.st_size, file.id)
+
+        return etag, datetime.fromtimestamp(int(stat.st_mtime), timezone.utc), stat.st_size
+
+    def get_file_d(self, file: File, binary: bool = False):
+        # This isn't a static method since the file path depends on the storage layout and the content can be in
+        # the cold storage, so it's resolved by the instance before opening the file
+        path = self.rehydrate_file(file)
+        if os.path.exists(path):
             try:
-                fd = open(file.fullPath, "r")
+                fd = open(path, "rb" if binary else "r")
                 return fd
             except (OSError, IOError):
                 raise FilesystemError("Can't retrieve the file from filesystem.".format(file.fullPath))
@@ -0,0 +1,87 @@
+"""
+This module implements the functions for moving the uploaded files to the server storage.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+import shutil
+
+# Maximum amount of bytes copied by each zero-copy system call
+ZERO_COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def _rename(origin, destination):
+    os.rename(origin, destination)
+
+
+def _link(origin, destination):
+    os.link(origin, destination)
+
+
+def _zero_copy(copy_function, origin, destination):
+    with open(origin, "rb") as f_in, open(destination, "wb") as f_out:
+        remaining = os.fstat(f_in.fileno()).st_size
+        offset = 0
+        while remaining > 0:
+            copied = copy_function(f_in.fileno(), f_out.fileno(), offset, min(remaining, ZERO_COPY_CHUNK_SIZE))
+            if copied == 0:
+                # Some filesystems don't support the call and copy nothing, let the next strategy copy the file
+                raise OSError("Zero-copy stopped with {} bytes left".format(remaining))
+            offset += copied
+            remaining -= copied
+
+
+def _copy_file_range(origin, destination):
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("copy_file_range is not available")
+    _zero_copy(lambda fd_in, fd_out, offset, count: os.copy_file_range(fd_in, fd_out, count, offset, offset),
+               origin, destination)
+
+
+def _sendfile(origin, destination):
+    if not hasattr(os, "sendfile"):
+        raise OSError("sendfile is not available")
+    _zero_copy(lambda fd_in, fd_out, offset, count: os.sendfile(fd_out, fd_in, offset, count),
+               origin, destination)
+
+
+def _copy(origin, destination):
+    shutil.copyfile(origin, destination)
+
+
+# Strategies tried (in order) for moving a file
+MOVE_STRATEGIES = (
+    ("rename", _rename),
+    ("link", _link),
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+    ("copy", _copy),
+)
+
+
+def move_file(origin, destination, strategies=MOVE_STRATEGIES):
+    """
+    Move the file from the origin path to the destination path using the first strategy that works. The rename and
+    link strategies are instantaneous, but they only work when both paths are in the same filesystem. Returns the
+    name of the used strategy or raises OSError if all of them failed.
+    """
+    error = None
+
+    for name, strategy in strategies:
+        try:
+            strategy(origin, destination)
+            return name
+        except OSError as e:
+            error = e
+            # Don't leave a partial copy before trying the next strategy
+            if name not in ("rename", "link") and os.path.exists(destination):
+                os.remove(destination)
+
+    raise error
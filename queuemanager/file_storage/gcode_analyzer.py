@@ -0,0 +1,447 @@
+"""
+This module implements the analyzer of the G-code moves, used for the files without the slicer information.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import warnings
+from datetime import timedelta
+
+import numpy as np
+
+from .layer_index import LayerIndex
+
+# Size of the chunks of the file analyzed at once
+ANALYZER_CHUNK_SIZE = 8 * 1024 * 1024
+# Feed rate used until the file sets one (mm/min)
+DEFAULT_FEED_RATE = 3000.0
+# Decimals used for grouping the Z heights in layers
+LAYER_HEIGHT_DECIMALS = 3
+
+# Command kinds
+_OTHER = -1
+_MOVE = 0
+_SET_POSITION = 1
+_TOOL_CHANGE = 2
+_ABSOLUTE_EXTRUSION = 3
+_RELATIVE_EXTRUSION = 4
+_ABSOLUTE_POSITIONING = 5
+_RELATIVE_POSITIONING = 6
+
+# Comment written by the slicers at the beginning of each layer
+_LAYER_MARKER = b";LAYER:"
+
+# Parameters read from the commands (the column of each one in the positions array, F is read apart)
+_PARAMETERS = b"XYZEF"
+
+# Byte lookup tables
+_DELIMITERS = np.zeros(256, dtype=bool)
+_DELIMITERS[list(b" \t\r\n;")] = True
+_IS_PARAMETER = np.zeros(256, dtype=bool)
+_IS_PARAMETER[list(_PARAMETERS)] = True
+_PARAMETER_COLUMNS = np.zeros(256, dtype=np.int64)
+_PARAMETER_COLUMNS[list(_PARAMETERS)] = np.arange(len(_PARAMETERS))
+_IS_DIGIT = np.zeros(256, dtype=bool)
+_IS_DIGIT[list(b"0123456789")] = True
+_POWERS_OF_TEN = 10.0 ** np.arange(-30, 31)
+
+
+def _parse_numbers_by_digits(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """
+    Parse the decimal numbers between the start and the end positions of the buffer at once, adding the weighted
+    digits of each number. The numbers without any digit are returned as NaN.
+    """
+    count = len(starts)
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.full(count, np.nan)
+
+    # Position of each character inside its number and the number it belongs to
+    numbers = np.repeat(np.arange(count), lengths)
+    relative_positions = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    chars = buffer[np.repeat(starts, lengths) + relative_positions]
+
+    # Weight of each digit from the position of the decimal point
+    is_dot = chars == ord(".")
+    dot_positions = lengths.copy()
+    dot_positions[numbers[is_dot]] = relative_positions[is_dot]
+    dot_positions = dot_positions[numbers]
+    exponents = np.where(relative_positions < dot_positions, dot_positions - relative_positions - 1,
+                         dot_positions - relative_positions)
+    exponents = np.clip(exponents, -30, 30) + 30
+
+    is_digit = _IS_DIGIT[chars]
+    digits = np.where(is_digit, (chars.astype(np.float64) - ord("0")) * _POWERS_OF_TEN[exponents], 0.0)
+    values = np.bincount(numbers, weights=digits, minlength=count)
+
+    is_negative = (chars == ord("-")) & (relative_positions == 0)
+    values[numbers[is_negative]] *= -1
+    values[np.bincount(numbers, weights=is_digit, minlength=count) == 0] = np.nan
+
+    return values
+
+
+def _parse_numbers(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """
+    Parse the decimal numbers between the start and the end positions of the buffer at once. The numbers are
+    gathered in a single space separated string parsed by NumPy and, if any of them isn't a valid number, all of
+    them are parsed digit by digit. When only a few characters of the buffer are selected, they're gathered one by
+    one instead of scanning the whole buffer.
+    """
+    values = np.full(len(starts), np.nan)
+    not_empty = ends > starts
+    starts, ends = starts[not_empty], ends[not_empty]
+    if len(starts) == 0:
+        return values
+
+    lengths = ends - starts + 1
+    if lengths.sum() * 8 < len(buffer):
+        # Gather the characters of the numbers and the delimiter after each one (replaced by a space)
+        text_ends = np.cumsum(lengths)
+        text = buffer[np.arange(text_ends[-1]) + np.repeat(starts - text_ends + lengths, lengths)]
+        text[text_ends - 1] = ord(" ")
+    else:
+        # Most of the buffer is selected, mark the characters of the numbers and the delimiter after each one
+        marks = np.zeros(len(buffer) + 1, dtype=np.int8)
+        marks[starts] = 1
+        marks[ends] = -1
+        selected = np.cumsum(marks[:-1], dtype=np.int8).view(bool)
+        selected[ends] = True
+        text = buffer.copy()
+        text[ends] = ord(" ")
+        text = text[selected]
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            parsed = np.fromstring(text.tobytes(), sep=" ")
+    except ValueError:
+        parsed = None
+
+    if parsed is None or len(parsed) != len(starts):
+        parsed = _parse_numbers_by_digits(buffer, starts, ends)
+
+    values[not_empty] = parsed
+    return values
+
+
+def _forward_fill(values: np.ndarray, initial_value: float):
+    """
+    Replace the NaN values of the array with the last previous value that isn't NaN (or the initial value).
+    """
+    values = np.concatenate(([initial_value], values))
+    indexes = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(indexes, out=indexes)
+    return values[indexes][1:]
+
+
+def _accumulate_positions(set_values: np.ndarray, increments: np.ndarray, initial_value: float):
+    """
+    Compute the position after each command, where each command sets the position (the set values that aren't NaN)
+    or moves it relatively (the increments).
+    """
+    set_values = np.concatenate(([initial_value], set_values))
+    increments = np.cumsum(np.concatenate(([0.0], increments)))
+    indexes = np.where(np.isnan(set_values), 0, np.arange(len(set_values)))
+    np.maximum.accumulate(indexes, out=indexes)
+    return (set_values[indexes] + increments - increments[indexes])[1:]
+
+
+class GCodeAnalysis(object):
+    """
+    This class contains the results of the G-code moves analysis.
+    """
+    def __init__(self):
+        self.extruded_length = {}
+        self.bounding_box_min = None
+        self.bounding_box_max = None
+        self.layer_count = 0
+        self.estimated_printing_time = timedelta()
+        self.bytes_read = 0
+        self.layer_index = LayerIndex()
+
+    @property
+    def filament_used(self):
+        """
+        Extruded filament length (in meters) of each used tool, sorted by the tool index.
+        """
+        return [(index, length / 1000.0) for index, length in sorted(self.extruded_length.items()) if length > 0]
+
+    def __repr__(self):
+        return "<GCodeAnalysis time={} extruded_length={} bounding_box={} {} layer_count={}>".format(
+            self.estimated_printing_time, self.extruded_length, self.bounding_box_min, self.bounding_box_max,
+            self.layer_count)
+
+
+class GCodeAnalyzer(object):
+    """
+    This class implements a streaming analyzer of the G0/G1/G92/T commands of a G-code file. Each chunk is
+    tokenized and its parameters parsed with vectorized operations over the chunk bytes, and then the positions,
+    the extruded length and the moving time are computed with vectorized operations too. Both the absolute and
+    the relative positioning (G90/G91) and extrusion (M82/M83) modes are supported.
+
+    While analyzing, the layer index of the file is built from the layer comments of the slicer or, if the file
+    doesn't have them, from the first printing move at each new height.
+    """
+    def __init__(self, default_feed_rate: float = DEFAULT_FEED_RATE):
+        self.analysis = GCodeAnalysis()
+        self._pending = b""
+        self._layers = set()
+        self._extruded_length = np.zeros(0)
+        self._moving_time = 0.0
+        self._total_extrusion = 0.0
+        # Offset of the data being analyzed inside the file
+        self._offset = 0
+        # Layers found by the slicer comments and by the height changes (offset, extrusion and time of each one)
+        self._marker_layers = []
+        self._height_layers = []
+        self._max_printed_height = -np.inf
+        # Machine state between chunks
+        self._position = np.zeros(4)
+        self._feed_rate = default_feed_rate
+        self._tool = 0.0
+        self._relative_positioning = 0.0
+        self._relative_extrusion = 0.0
+
+    @staticmethod
+    def _tokenize(data: bytes):
+        # The data always ends with a new line, add some padding for reading the command names safely
+        buffer = np.frombuffer(data + b"\n" * len(_LAYER_MARKER), dtype=np.uint8)
+
+        # The buffer is only scanned once for the delimiters, the rest of the searches are made over them
+        delimiters = np.flatnonzero((buffer == ord(" ")) | (buffer == ord("\n")) | (buffer == ord(";")) |
+                                    (buffer == ord("\t")) | (buffer == ord("\r")))
+        delimiter_chars = buffer[delimiters]
+        is_line_end = delimiter_chars == ord("\n")
+        line_ends = delimiters[is_line_end][:-len(_LAYER_MARKER)]
+        if len(line_ends) == 0:
+            return None
+        line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+
+        # Find the layer comments and parse their layer numbers
+        c0 = buffer[line_starts]
+        marker_lines = np.flatnonzero(c0 == _LAYER_MARKER[0])
+        for i, char in enumerate(_LAYER_MARKER[1:], 1):
+            marker_lines = marker_lines[buffer[line_starts[marker_lines] + i] == char]
+        marker_starts = line_starts[marker_lines] + len(_LAYER_MARKER)
+        marker_numbers = _parse_numbers(buffer, marker_starts,
+                                        delimiters[np.searchsorted(delimiters, marker_starts)])
+        valid_markers = ~np.isnan(marker_numbers)
+        markers = (line_starts[marker_lines][valid_markers], marker_numbers[valid_markers].astype(np.int64))
+
+        # Identify the command of each line from its first characters
+        c1, c2, c3 = (buffer[line_starts + i] for i in range(1, 4))
+        kinds = np.full(len(line_starts), _OTHER, dtype=np.int8)
+        is_g = c0 == ord("G")
+        kinds[is_g & ((c1 == ord("0")) | (c1 == ord("1"))) & _DELIMITERS[c2]] = _MOVE
+        is_g9 = is_g & (c1 == ord("9")) & _DELIMITERS[c3]
+        kinds[is_g9 & (c2 == ord("0"))] = _ABSOLUTE_POSITIONING
+        kinds[is_g9 & (c2 == ord("1"))] = _RELATIVE_POSITIONING
+        kinds[is_g9 & (c2 == ord("2"))] = _SET_POSITION
+        is_m8 = (c0 == ord("M")) & (c1 == ord("8")) & _DELIMITERS[c3]
+        kinds[is_m8 & (c2 == ord("2"))] = _ABSOLUTE_EXTRUSION
+        kinds[is_m8 & (c2 == ord("3"))] = _RELATIVE_EXTRUSION
+        is_tool_change = (c0 == ord("T")) & _IS_DIGIT[c1]
+        kinds[is_tool_change] = _TOOL_CHANGE
+
+        lines = np.flatnonzero(kinds != _OTHER)
+        if len(lines) == 0:
+            return None, markers
+        kinds = kinds[lines]
+
+        # The tool number has one or two digits
+        tools = np.full(len(lines), np.nan)
+        tool_lines = lines[is_tool_change[lines]]
+        tools[is_tool_change[lines]] = _parse_numbers(
+            buffer, line_starts[tool_lines] + 1, line_starts[tool_lines] + 2 + _IS_DIGIT[c2[tool_lines]])
+
+        # Line of each delimiter and whether it's after a comment start of its line
+        indexes = np.arange(len(delimiters))
+        delimiter_lines = np.cumsum(is_line_end) - is_line_end
+        last_line_end = np.maximum.accumulate(np.where(is_line_end, indexes, -1))
+        last_comment = np.maximum.accumulate(np.where(delimiter_chars == ord(";"), indexes, -1))
+        in_comment = last_comment > last_line_end
+
+        # Find the parameters (a letter after a space) of the moves and position sets before any comment
+        separators = np.flatnonzero(((delimiter_chars == ord(" ")) | (delimiter_chars == ord("\t"))) & ~in_comment)
+        letters = buffer[delimiters[separators] + 1]
+        separators = separators[_IS_PARAMETER[letters]]
+        row_of_line = np.full(len(line_starts), -1)
+        row_of_line[lines] = np.arange(len(lines))
+        rows = row_of_line[delimiter_lines[separators]]
+        valid = rows >= 0
+        valid[valid] = (kinds[rows[valid]] == _MOVE) | (kinds[rows[valid]] == _SET_POSITION)
+        separators, rows = separators[valid], rows[valid]
+
+        # Parse all the parameter values at once (each one ends at the next delimiter)
+        values = _parse_numbers(buffer, delimiters[separators] + 2, delimiters[separators + 1])
+
+        columns = np.full((len(lines), len(_PARAMETERS)), np.nan)
+        columns.ravel()[rows * len(_PARAMETERS) + _PARAMETER_COLUMNS[buffer[delimiters[separators] + 1]]] = values
+
+        return (kinds, tools, columns[:, 4], columns[:, :4], line_starts[lines]), markers
+
+    @staticmethod
+    def _get_totals_before(command_offsets: np.ndarray, offsets: np.ndarray, totals: np.ndarray,
+                           initial_total: float):
+        # Total accumulated by the commands before each offset
+        totals = np.concatenate(([initial_total], totals))
+        return totals[np.searchsorted(command_offsets, offsets)]
+
+    def _analyze(self, data: bytes):
+        tokenized = self._tokenize(data)
+        if tokenized is None:
+            return
+        tokens, (marker_offsets, marker_numbers) = tokenized
+        if tokens is None:
+            # Without any command, all the layers start with the totals of the previous chunks
+            self._marker_layers.append((marker_numbers, marker_offsets + self._offset,
+                                        np.full(len(marker_offsets), self._total_extrusion),
+                                        np.full(len(marker_offsets), self._moving_time)))
+            return
+        kinds, tools, feed_rates, positions, command_offsets = tokens
+
+        moves = kinds == _MOVE
+        set_positions = kinds == _SET_POSITION
+
+        # Positioning and extrusion modes (G91 makes the extrusion relative too) and active tool of each command
+        positioning_modes = np.where(kinds == _RELATIVE_POSITIONING, 1.0,
+                                     np.where(kinds == _ABSOLUTE_POSITIONING, 0.0, np.nan))
+        relative_positioning = _forward_fill(positioning_modes, self._relative_positioning) == 1.0
+        extrusion_modes = np.where(kinds == _RELATIVE_EXTRUSION, 1.0,
+                                   np.where(kinds == _ABSOLUTE_EXTRUSION, 0.0, np.nan))
+        relative_extrusion = _forward_fill(extrusion_modes, self._relative_extrusion) == 1.0
+        tools = _forward_fill(tools, self._tool)
+        feed_rates = _forward_fill(np.where(moves, feed_rates, np.nan), self._feed_rate)
+
+        # The absolute moves and the position sets set the position, the relative moves increment it
+        relative = np.column_stack((relative_positioning, relative_positioning, relative_positioning,
+                                    relative_positioning | relative_extrusion))
+        setting = (moves[:, np.newaxis] & ~relative) | set_positions[:, np.newaxis]
+        incrementing = moves[:, np.newaxis] & relative
+        set_values = np.where(setting, positions, np.nan)
+        increments = np.where(incrementing & ~np.isnan(positions), positions, 0.0)
+        filled_positions = np.column_stack(
+            [_accumulate_positions(set_values[:, i], increments[:, i], self._position[i]) for i in range(4)]
+        )
+        previous_positions = np.vstack((self._position, filled_positions[:-1]))
+        deltas = filled_positions - previous_positions
+
+        # Extruded length of each move
+        extrusions = np.where(moves, deltas[:, 3], 0.0)
+
+        tool_indexes = tools.astype(np.int64)
+        extruded_length = np.bincount(tool_indexes, weights=extrusions)
+        if len(extruded_length) > len(self._extruded_length):
+            extruded_length[:len(self._extruded_length)] += self._extruded_length
+            self._extruded_length = extruded_length
+        else:
+            self._extruded_length[:len(extruded_length)] += extruded_length
+
+        # Moving time from the travelled distance (or the extruded length for the extruder only moves)
+        distances = np.sqrt(np.sum(deltas[:, :3] ** 2, axis=1))
+        distances = np.where(distances > 0, distances, np.abs(extrusions))
+        valid_feed_rates = moves & (feed_rates > 0)
+        moving_times = np.zeros(len(kinds))
+        moving_times[valid_feed_rates] = distances[valid_feed_rates] / feed_rates[valid_feed_rates] * 60.0
+
+        # Totals after each command, for the layer index
+        total_extrusions = self._total_extrusion + np.cumsum(extrusions)
+        total_times = self._moving_time + np.cumsum(moving_times)
+        self._marker_layers.append((
+            marker_numbers, marker_offsets + self._offset,
+            self._get_totals_before(command_offsets, marker_offsets, total_extrusions, self._total_extrusion),
+            self._get_totals_before(command_offsets, marker_offsets, total_times, self._moving_time)
+        ))
+
+        # Bounding box and layers of the printing moves
+        printing = moves & (extrusions > 0) & (np.sum(deltas[:, :2] ** 2, axis=1) > 0)
+        if np.any(printing):
+            printed_positions = filled_positions[printing, :3]
+            chunk_min = np.min(printed_positions, axis=0)
+            chunk_max = np.max(printed_positions, axis=0)
+            if self.analysis.bounding_box_min is None:
+                self.analysis.bounding_box_min, self.analysis.bounding_box_max = chunk_min, chunk_max
+            else:
+                self.analysis.bounding_box_min = np.minimum(self.analysis.bounding_box_min, chunk_min)
+                self.analysis.bounding_box_max = np.maximum(self.analysis.bounding_box_max, chunk_max)
+            printed_heights = np.round(printed_positions[:, 2], LAYER_HEIGHT_DECIMALS)
+            self._layers.update(np.unique(printed_heights).tolist())
+
+            # A new layer starts with the first printing move above all the previous ones
+            max_heights = np.maximum.accumulate(np.concatenate(([self._max_printed_height], printed_heights)))
+            new_layers = np.flatnonzero(printed_heights > max_heights[:-1])
+            rows = np.flatnonzero(printing)[new_layers]
+            self._height_layers.append((
+                np.arange(len(rows)) + sum(len(layers[0]) for layers in self._height_layers),
+                command_offsets[rows] + self._offset,
+                total_extrusions[rows] - extrusions[rows],
+                total_times[rows] - moving_times[rows]
+            ))
+            self._max_printed_height = max_heights[-1]
+
+        self._total_extrusion = float(total_extrusions[-1])
+        self._moving_time = float(total_times[-1])
+
+        # Keep the machine state for the next chunk
+        self._position = filled_positions[-1]
+        self._feed_rate = feed_rates[-1]
+        self._tool = tools[-1]
+        self._relative_positioning = 1.0 if relative_positioning[-1] else 0.0
+        self._relative_extrusion = 1.0 if relative_extrusion[-1] else 0.0
+
+    def feed(self, chunk: bytes):
+        """
+        Analyze the next chunk of the file. Only the complete lines are analyzed, the rest is kept for the next one.
+        """
+        self.analysis.bytes_read += len(chunk)
+        data = self._pending + chunk
+        end = data.rfind(b"\n") + 1
+        self._pending = data[end:]
+        self._analyze(data[:end])
+        self._offset += end
+
+    def close(self):
+        """
+        Analyze the last line of the file (if it isn't finished) and return the analysis results.
+        """
+        if self._pending:
+            self._analyze(self._pending + b"\n")
+            self._offset += len(self._pending)
+            self._pending = b""
+
+        self.analysis.extruded_length = {
+            index: float(length) for index, length in enumerate(self._extruded_length) if length != 0
+        }
+        if self.analysis.bounding_box_min is not None:
+            self.analysis.bounding_box_min = tuple(float(v) for v in self.analysis.bounding_box_min)
+            self.analysis.bounding_box_max = tuple(float(v) for v in self.analysis.bounding_box_max)
+        self.analysis.layer_count = len(self._layers)
+        self.analysis.estimated_printing_time = timedelta(seconds=self._moving_time)
+
+        # Prefer the layers of the slicer comments
+        if any(len(chunk_layers[0]) for chunk_layers in self._marker_layers):
+            layers = self._marker_layers
+        else:
+            layers = self._height_layers
+        columns = [np.concatenate([chunk_layers[i] for chunk_layers in layers]) if layers else np.zeros(0)
+                   for i in range(4)]
+        self.analysis.layer_index = LayerIndex.from_arrays(
+            *columns, file_size=self._offset, total_extrusion=self._total_extrusion, total_time=self._moving_time)
+
+        return self.analysis
+
+    def analyze_file(self, fd, chunk_size: int = ANALYZER_CHUNK_SIZE):
+        """
+        Analyze the whole file (opened in binary mode).
+        """
+        for chunk in iter(lambda: fd.read(chunk_size), b""):
+            self.feed(chunk)
+        return self.close()
@@ -0,0 +1,265 @@
+"""
+This module implements the functions for reading the slicer information embedded in the G-code files.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import json
+import mmap
+import os
+import re
+from datetime import timedelta
+
+# Size of each backwards search window when looking for the file data at the end of the file
+TAIL_CHUNK_SIZE = 64 * 1024
+# Maximum amount of bytes (counting from the end of the file) searched backwards before falling back to a forward scan
+TAIL_SCAN_LIMIT = 8 * 1024 * 1024
+# Maximum amount of bytes read from the beginning of the file when looking for the header comments
+HEAD_SCAN_LIMIT = 1024 * 1024
+# Maximum length of the file data line kept in memory while streaming a file
+FILE_DATA_MAX_LENGTH = 16 * 1024 * 1024
+
+_EXTRUDERS_USED_REGEX = re.compile(r"T(\d+)\s+([0-9.]+)")
+
+
+def _normalize_newline(line: bytes):
+    # The files are read in binary mode, so the CRLF line endings are converted here like the text mode did
+    if line.endswith(b"\r\n"):
+        return line[:-2] + b"\n"
+    return line
+
+
+def find_line_data_from_tail(fd, prefix: bytes, suffix: bytes, chunk_size: int = TAIL_CHUNK_SIZE,
+                             scan_limit: int = TAIL_SCAN_LIMIT):
+    """
+    Search backwards from the end of the file (opened in binary mode) for the last line that starts with the prefix
+    and ends with the suffix. The search is made in windows of 'chunk_size' bytes and never goes further than
+    'scan_limit' bytes from the end of the file. Returns the data between the prefix and the suffix or None if
+    there isn't any matching line in the scanned tail.
+    """
+    size = os.fstat(fd.fileno()).st_size
+    if size == 0:
+        return None
+
+    with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lower_limit = max(0, size - scan_limit)
+        window_end = size
+
+        while window_end > lower_limit:
+            window_start = max(lower_limit, window_end - chunk_size)
+            # Extend the window to the previous one, so a prefix split between two windows is found too
+            search_end = min(size, window_end + len(prefix) - 1)
+
+            pos = mm.rfind(prefix, window_start, search_end)
+            while pos != -1:
+                # The prefix is only valid at the beginning of a line
+                if pos == 0 or mm[pos - 1:pos] == b"\n":
+                    line_end = mm.find(b"\n", pos)
+                    line = _normalize_newline(mm[pos:] if line_end == -1 else mm[pos:line_end + 1])
+                    if line.endswith(suffix):
+                        return line[len(prefix):line.find(suffix)]
+                pos = mm.rfind(prefix, window_start, pos + len(prefix) - 1)
+
+            window_end = window_start
+
+    return None
+
+
+def find_line_data_forward(fd, prefix: bytes, suffix: bytes):
+    """
+    Read the whole file (opened in binary mode) searching for the last line that starts with the prefix and ends
+    with the suffix. Returns the data between the prefix and the suffix or None if there isn't any matching line.
+    """
+    line_data = None
+
+    for line in fd:
+        line = _normalize_newline(line)
+        if line.startswith(prefix) and line.endswith(suffix):
+            line_data = line[len(prefix):line.find(suffix)]
+
+    return line_data
+
+
+def find_line_data(fd, prefix: bytes, suffix: bytes, chunk_size: int = TAIL_CHUNK_SIZE,
+                   scan_limit: int = TAIL_SCAN_LIMIT):
+    """
+    Search for the last line that starts with the prefix and ends with the suffix. The end of the file is searched
+    first and the whole file is only read when the line isn't found there.
+    """
+    line_data = find_line_data_from_tail(fd, prefix, suffix, chunk_size, scan_limit)
+
+    if line_data is None and os.fstat(fd.fileno()).st_size > scan_limit:
+        fd.seek(0)
+        line_data = find_line_data_forward(fd, prefix, suffix)
+
+    return line_data
+
+
+class GCodeHeader(object):
+    """
+    This class contains the slicer information read from the comments of a G-code file.
+    """
+    def __init__(self):
+        self.estimated_printing_time = None
+        self.filament_used = None
+        self.layer_height = None
+        self.extruders_used = []
+        self.layer_count = None
+        self.file_data = None
+        self.file_data_error = None
+
+    @property
+    def total_filament_used(self):
+        if self.filament_used is None:
+            return None
+        return sum(self.filament_used)
+
+    def __repr__(self):
+        return "<GCodeHeader time={} filament_used={} layer_height={} extruders_used={} layer_count={} " \
+               "file_data={}>".format(self.estimated_printing_time, self.filament_used, self.layer_height,
+                                      self.extruders_used, self.layer_count, self.file_data is not None)
+
+
+class GCodeHeaderParser(object):
+    """
+    This class implements a streaming parser of the G-code slicer comments. The data is fed in chunks of bytes, the
+    header comments are only parsed until the first layer starts (or 'head_limit' bytes are read) and after that
+    the parser only looks for the file data line.
+    """
+    def __init__(self, file_data_prefix: str = ";PrintInfo/", file_data_end: str = "/PrintInfo\n",
+                 head_limit: int = HEAD_SCAN_LIMIT, file_data_max_length: int = FILE_DATA_MAX_LENGTH):
+        self.file_data_prefix = file_data_prefix.encode()
+        self.file_data_end = file_data_end.encode()
+        self.head_limit = head_limit
+        self.file_data_max_length = file_data_max_length
+        self.header = GCodeHeader()
+        self.head_done = False
+        self.bytes_read = 0
+        self._pending = b""
+        self._file_data_str = None
+
+    def _parse_head_line(self, line: bytes):
+        if line.startswith(b";LAYER:"):
+            self.head_done = True
+            return
+
+        if not line.startswith(b";"):
+            return
+
+        key, separator, value = line[1:].decode(errors="replace").partition(":")
+        if not separator:
+            return
+
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key == "time" and self.header.estimated_printing_time is None:
+            self.header.estimated_printing_time = timedelta(seconds=float(value))
+        elif key == "filament used" and self.header.filament_used is None:
+            self.header.filament_used = [float(v.strip()[:-1]) for v in value.split(",")]
+        elif key == "layer height" and self.header.layer_height is None:
+            self.header.layer_height = float(value)
+        elif key == "extruders used" and not self.header.extruders_used:
+            self.header.extruders_used = [(int(i), float(d)) for i, d in _EXTRUDERS_USED_REGEX.findall(value)]
+        elif key == "layer_count" and self.header.layer_count is None:
+            self.header.layer_count = int(value)
+
+    def _parse_head(self, data: bytes):
+        start = 0
+        while not self.head_done:
+            end = data.find(b"\n", start)
+            if end == -1:
+                break
+            line = data[start:end + 1]
+            self._parse_head_line(line)
+            self._check_file_data_line(line)
+            start = end + 1
+            if self.bytes_read - len(data) + start >= self.head_limit:
+                self.head_done = True
+        return data[start:]
+
+    def _check_file_data_line(self, line: bytes):
+        line = _normalize_newline(line)
+        if line.startswith(self.file_data_prefix) and line.endswith(self.file_data_end):
+            self._file_data_str = line[len(self.file_data_prefix):line.find(self.file_data_end)]
+
+    def _parse_body(self, data: bytes):
+        candidate = self.file_data_prefix
+        # Look for every file data line start inside the data (the data always starts at the beginning of a line)
+        start = 0 if data.startswith(candidate) else data.find(b"\n" + candidate)
+        while start != -1:
+            if data[start:start + 1] == b"\n":
+                start += 1
+            end = data.find(b"\n", start)
+            if end == -1:
+                # The line continues in the next chunk, keep it while it's not too long
+                if len(data) - start <= self.file_data_max_length:
+                    return data[start:]
+                return b""
+            self._check_file_data_line(data[start:end + 1])
+            start = data.find(b"\n" + candidate, end)
+
+        # Only keep the last incomplete line
+        return data[data.rfind(b"\n") + 1:]
+
+    def feed(self, chunk: bytes):
+        """
+        Parse the next chunk of the file. Raises ValueError if one of the header values is corrupted.
+        """
+        self.bytes_read += len(chunk)
+        data = self._pending + chunk
+
+        if not self.head_done:
+            data = self._parse_head(data)
+
+        if self.head_done:
+            data = self._parse_body(data)
+        elif len(data) > self.head_limit:
+            self.head_done = True
+            data = b""
+
+        self._pending = data
+
+    def close(self):
+        """
+        Parse the last line of the file (if it isn't finished) and return the parsed header. Raises ValueError if
+        one of the header values is corrupted. If the file data is corrupted, the error is saved in the header.
+        """
+        if self._pending:
+            if not self.head_done:
+                self._parse_head_line(self._pending)
+            self._check_file_data_line(self._pending)
+            self._pending = b""
+
+        self.head_done = True
+
+        if self._file_data_str is not None:
+            try:
+                self.header.file_data = json.loads(self._file_data_str.decode())
+            except ValueError as e:
+                self.header.file_data_error = str(e)
+
+        return self.header
+
+    def parse_file(self, fd, chunk_size: int = TAIL_CHUNK_SIZE, read_file_data: bool = True):
+        """
+        Parse the header comments from the beginning of the file (opened in binary mode) and the file data from
+        the end of it, without reading the rest of the file.
+        """
+        while not self.head_done:
+            chunk = fd.read(chunk_size)
+            if not chunk:
+                break
+            self.feed(chunk)
+
+        if read_file_data and self._file_data_str is None:
+            self._file_data_str = find_line_data(fd, self.file_data_prefix, self.file_data_end)
+
+        self._pending = b""
+        return self.close()
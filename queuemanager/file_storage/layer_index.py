@@ -0,0 +1,137 @@
+"""
+This module implements the index of the layers of a G-code file.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import numpy as np
+
+# Record of each layer in the index
+LAYER_INDEX_DTYPE = np.dtype([
+    ("layer", "<i4"),
+    ("offset", "<u8"),
+    ("extrusion", "<f8"),
+    ("time", "<f8")
+])
+
+
+class LayerIndex(object):
+    """
+    This class implements a compact index of the layers of a G-code file. For each layer it keeps the byte offset
+    where the layer starts, and the extruded length (mm) and the estimated moving time (seconds) accumulated before
+    it. The last record of the index isn't a layer, it contains the file size and the totals of the whole file.
+
+    All the lookups are binary searches over the sorted offsets, so the printing progress can be mapped to the
+    current layer and time left in O(log n).
+    """
+    def __init__(self, records: np.ndarray = None):
+        if records is None:
+            records = np.zeros(0, dtype=LAYER_INDEX_DTYPE)
+        self.records = records
+
+    @classmethod
+    def from_arrays(cls, layers, offsets, extrusions, times, file_size: int, total_extrusion: float,
+                    total_time: float):
+        records = np.zeros(len(layers) + 1, dtype=LAYER_INDEX_DTYPE)
+        records["layer"][:-1] = layers
+        records["offset"][:-1] = offsets
+        records["extrusion"][:-1] = extrusions
+        records["time"][:-1] = times
+        records[-1] = (-1, file_size, total_extrusion, total_time)
+        return cls(records)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "rb") as f:
+            records = np.load(f, allow_pickle=False)
+        if records.dtype != LAYER_INDEX_DTYPE:
+            raise ValueError("Invalid layer index file '{}'".format(path))
+        return cls(records)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.save(f, self.records, allow_pickle=False)
+
+    @property
+    def layers(self):
+        return self.records["layer"][:-1]
+
+    @property
+    def offsets(self):
+        return self.records["offset"][:-1]
+
+    @property
+    def file_size(self):
+        return int(self.records["offset"][-1]) if len(self.records) else 0
+
+    @property
+    def total_extrusion(self):
+        return float(self.records["extrusion"][-1]) if len(self.records) else 0.0
+
+    @property
+    def total_time(self):
+        return float(self.records["time"][-1]) if len(self.records) else 0.0
+
+    def __len__(self):
+        return max(len(self.records) - 1, 0)
+
+    def get_layer_at_offset(self, offset: int):
+        """
+        Return the number of the layer printed at this byte offset (or None if it's before the first layer).
+        """
+        position = int(np.searchsorted(self.offsets, offset, side="right")) - 1
+        if position < 0:
+            return None
+        return int(self.layers[position])
+
+    def get_layer_offset(self, layer: int):
+        """
+        Return the byte offset where the layer starts (or None if the layer isn't in the index).
+        """
+        # The layers are numbered in the same order they appear in the file
+        position = int(np.searchsorted(self.layers, layer))
+        if position >= len(self) or self.layers[position] != layer:
+            return None
+        return int(self.offsets[position])
+
+    def get_layer_byte_range(self, layer: int):
+        """
+        Return the (start, end) byte offsets of the file from the beginning of the layer until the end of the file,
+        used for resuming a print at this layer (or None if the layer isn't in the index).
+        """
+        offset = self.get_layer_offset(layer)
+        if offset is None:
+            return None
+        return offset, self.file_size
+
+    def get_time_at_offset(self, offset: int):
+        """
+        Return the estimated moving time (seconds) until this byte offset, interpolating inside the layer.
+        """
+        offsets = np.concatenate(([0], self.records["offset"])).astype(np.float64)
+        times = np.concatenate(([0.0], self.records["time"]))
+        return float(np.interp(offset, offsets, times))
+
+    def get_progress_info(self, progress: float, total_time: float = None):
+        """
+        Map the printing progress (the percentage of the file bytes printed) to the current layer and the estimated
+        time left in seconds. The time left is computed from the fraction of the moving time that is still pending,
+        so if a total time is given (e.g. the slicer estimation), it's scaled to it.
+        """
+        offset = min(max(progress, 0.0), 100.0) / 100.0 * self.file_size
+        layer = self.get_layer_at_offset(offset)
+
+        if self.total_time <= 0:
+            return layer, None
+
+        pending_fraction = 1.0 - self.get_time_at_offset(offset) / self.total_time
+        if total_time is None:
+            total_time = self.total_time
+
+        return layer, max(pending_fraction, 0.0) * total_time
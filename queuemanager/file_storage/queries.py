@@ -0,0 +1,75 @@
+"""
+This module implements the queries of the files table used by the file storage background tasks, which need to
+walk the table in batches or check many paths at once (the DBManager only gets the files by its fields). As in the
+DBManager, the database errors roll the session back and are raised as a DBManagerError.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from datetime import datetime
+from functools import wraps
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..database import DBManagerError, File, Job
+from ..database import db
+
+
+def _database_query(query_function):
+    @wraps(query_function)
+    def wrapper(*args, **kwargs):
+        try:
+            return query_function(*args, **kwargs)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DBManagerError("Can't read the files table. Details: {}".format(str(e)))
+    return wrapper
+
+
+@_database_query
+def get_referenced_paths(paths: list):
+    """
+    Return the set of the given paths that are the full path of any file.
+    """
+    if not paths:
+        return set()
+    return {path for path, in db.session.query(File.fullPath).filter(File.fullPath.in_(paths))}
+
+
+@_database_query
+def get_files_batch(after_id: int, batch_size: int):
+    """
+    Return the next 'batch_size' files with an ID greater than 'after_id', sorted by its ID.
+    """
+    return db.session.query(File).filter(File.id > after_id).order_by(File.id).limit(batch_size).all()
+
+
+def _get_old_done_job_filter(limit_date: datetime):
+    return Job.state.has(stateString="Done") & (Job.finishedAt < limit_date)
+
+
+@_database_query
+def get_old_done_files_batch(after_id: int, batch_size: int, limit_date: datetime):
+    """
+    Return the next 'batch_size' files with an ID greater than 'after_id' whose jobs are all done before the limit
+    date, sorted by its ID.
+    """
+    return db.session.query(File).filter(
+        File.id > after_id, File.jobs.any(), ~File.jobs.any(~_get_old_done_job_filter(limit_date))
+    ).order_by(File.id).limit(batch_size).all()
+
+
+@_database_query
+def are_all_jobs_done_before(path: str, limit_date: datetime):
+    """
+    Check if all the jobs of all the files with this full path are done before the limit date.
+    """
+    return db.session.query(File).filter(
+        File.fullPath == path, ~File.jobs.any() | File.jobs.any(~_get_old_done_job_filter(limit_date))
+    ).count() == 0
@@ -0,0 +1,241 @@
+"""
+This module implements the reconciler of the file storage and the files table.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import json
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from .file_manager import FileManager, SIDECAR_SUFFIXES, TMP_FILE_SUFFIX
+from .queries import get_files_batch, get_referenced_paths
+from ..database import DBManagerError, File
+
+
+class StorageReconciler(object):
+    """
+    This class walks the upload directory and the files table in small batches, looking for the stored contents
+    without any file referencing them (orphans) and for the files whose content doesn't exist.
+
+    The orphans older than the grace period (so the files that are being saved aren't touched) are moved to the
+    quarantine directory or, if it isn't set, removed. The files without content are restored from the quarantine
+    if possible, or reported otherwise. The position of both walks is saved in the cursor file after each batch, so
+    the reconciler continues where it was after a restart, and the filesystem operations are limited to a maximum
+    rate, so it can run continuously without disturbing the server.
+    """
+    def __init__(self, app, file_manager: FileManager = None, cursor_path: str = None, quarantine_dir: str = None,
+                 batch_size: int = None, max_operations_per_second: float = None, grace_period: float = None):
+        self.app = app
+        self.cursor_path = cursor_path or app.config.get('FILE_MANAGER_RECONCILER_CURSOR_PATH')
+        self.quarantine_dir = quarantine_dir or app.config.get('FILE_MANAGER_RECONCILER_QUARANTINE_DIR')
+        self.batch_size = batch_size or app.config.get('FILE_MANAGER_RECONCILER_BATCH_SIZE', 100)
+        self.max_operations_per_second = max_operations_per_second or \
+            app.config.get('FILE_MANAGER_RECONCILER_RATE')
+        self.grace_period = grace_period if grace_period is not None else \
+            app.config.get('FILE_MANAGER_RECONCILER_GRACE_PERIOD', 3600)
+        self.counters = Counter()
+        self.store_cursor = None
+        self.files_cursor = 0
+        self._next_operation_time = 0.0
+        self._stopped = False
+
+        # Set the FileManager object
+        if file_manager is None:
+            from . import file_mgr
+            self.file_manager = file_mgr
+        else:
+            self.file_manager = file_manager
+
+        self._load_cursor()
+
+    def _load_cursor(self):
+        if self.cursor_path is None or not os.path.exists(self.cursor_path):
+            return
+
+        try:
+            with open(self.cursor_path, "r") as f:
+                cursor = json.load(f)
+            self.store_cursor = tuple(cursor["store"]) if cursor["store"] is not None else None
+            self.files_cursor = int(cursor["files"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.app.logger.warning("The reconciler cursor can't be loaded, starting from the beginning. "
+                                    "Details: " + str(e))
+
+    def _save_cursor(self):
+        if self.cursor_path is None:
+            return
+
+        # Replace the cursor file at once, so it's never left half written
+        tmp_path = self.cursor_path + TMP_FILE_SUFFIX
+        with open(tmp_path, "w") as f:
+            json.dump({"store": self.store_cursor, "files": self.files_cursor}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def _throttle(self):
+        # Wait until the next filesystem operation is allowed
+        if not self.max_operations_per_second:
+            return
+
+        now = time.monotonic()
+        if now < self._next_operation_time:
+            time.sleep(self._next_operation_time - now)
+        self._next_operation_time = max(now, self._next_operation_time) + 1.0 / self.max_operations_per_second
+
+    def _iter_store(self, directory: str, parts: tuple = ()):
+        # Walk the directory tree in order, skipping the entries before the cursor
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+
+        for entry in entries:
+            entry_parts = parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                if self.store_cursor is not None and entry_parts < self.store_cursor[:len(entry_parts)]:
+                    continue
+                if self.quarantine_dir is not None and \
+                        os.path.abspath(entry.path) == os.path.abspath(self.quarantine_dir):
+                    continue
+                yield from self._iter_store(entry.path, entry_parts)
+            elif self.store_cursor is None or entry_parts > self.store_cursor:
+                yield entry_parts
+
+    def _is_orphan(self, path: str, referenced_paths: set):
+        for suffix in SIDECAR_SUFFIXES:
+            if path.endswith(suffix):
+                # The layer indexes and the compressed copies are orphans when its content doesn't exist (the local
+                # copies of the contents in a remote storage backend are removed after uploading them)
+                content_path = path[:-len(suffix)]
+                if os.path.exists(content_path):
+                    return False
+                storage = self.file_manager.storage
+                return storage.is_local or not storage.exists(os.path.basename(content_path))
+        return path not in referenced_paths
+
+    def _get_quarantine_path(self, relative_path: str):
+        return os.path.join(self.quarantine_dir, relative_path)
+
+    def _remove_orphan(self, path: str, relative_path: str):
+        self._throttle()
+        if self.quarantine_dir is None:
+            os.remove(path)
+            self.counters["orphans_removed"] += 1
+            self.app.logger.info("Orphan file '{}' removed".format(path))
+        else:
+            quarantine_path = self._get_quarantine_path(relative_path)
+            os.makedirs(os.path.dirname(quarantine_path), exist_ok=True)
+            os.replace(path, quarantine_path)
+            self.counters["orphans_quarantined"] += 1
+            self.app.logger.info("Orphan file '{}' moved to '{}'".format(path, quarantine_path))
+
+    def reconcile_store_batch(self):
+        """
+        Check the next batch of the stored files and remove or quarantine the orphans. Returns False when the
+        whole upload directory was walked.
+        """
+        upload_dir = self.file_manager.upload_dir
+        batch = list(islice(self._iter_store(upload_dir), self.batch_size))
+        paths = [os.path.join(upload_dir, *parts) for parts in batch]
+        referenced_paths = get_referenced_paths(paths)
+        now = time.time()
+
+        for parts, path in zip(batch, paths):
+            self.counters["stored_files_checked"] += 1
+            try:
+                self._throttle()
+                if not self._is_orphan(path, referenced_paths) or now - os.stat(path).st_mtime < self.grace_period:
+                    continue
+                self._remove_orphan(path, os.path.join(*parts))
+            except OSError as e:
+                # The file was removed while checking it
+                self.counters["errors"] += 1
+                self.app.logger.warning("Unable to reconcile the file '{}'. Details: {}".format(path, e))
+
+        if len(batch) < self.batch_size:
+            self.store_cursor = None
+            self.counters["store_passes"] += 1
+        else:
+            self.store_cursor = batch[-1]
+
+        return self.store_cursor is not None
+
+    def _restore_content(self, file: File):
+        if self.quarantine_dir is None:
+            return False
+
+        relative_path = os.path.relpath(file.fullPath, self.file_manager.upload_dir)
+        quarantine_path = self._get_quarantine_path(relative_path)
+        if relative_path.startswith(os.pardir) or not os.path.exists(quarantine_path):
+            return False
+
+        self._throttle()
+        os.makedirs(os.path.dirname(file.fullPath), exist_ok=True)
+        os.replace(quarantine_path, file.fullPath)
+
+        return True
+
+    def reconcile_files_batch(self):
+        """
+        Check the next batch of the files table and restore or report the files without content. Returns False when
+        the whole table was walked.
+        """
+        files = get_files_batch(self.files_cursor, self.batch_size)
+
+        for file in files:
+            self.counters["files_checked"] += 1
+            if file.fullPath is None:
+                # The file is being saved
+                continue
+
+            self._throttle()
+            if self.file_manager.content_exists(file):
+                continue
+
+            try:
+                if self._restore_content(file):
+                    self.counters["contents_restored"] += 1
+                    self.app.logger.info("The content of the file '{}' was restored from the quarantine".format(file))
+                    continue
+            except OSError as e:
+                self.counters["errors"] += 1
+                self.app.logger.warning("Unable to restore the content of the file '{}'. Details: {}".format(file, e))
+
+            self.counters["missing_contents"] += 1
+            self.app.logger.error("The content of the file '{}' doesn't exist".format(file))
+
+        if len(files) < self.batch_size:
+            self.files_cursor = 0
+            self.counters["files_passes"] += 1
+        else:
+            self.files_cursor = files[-1].id
+
+        return self.files_cursor != 0
+
+    def reconcile_batch(self):
+        """
+        Check the next batch of the stored files and the files table, and save the cursor.
+        """
+        self.reconcile_store_batch()
+        self.reconcile_files_batch()
+        self._save_cursor()
+
+    def run(self, interval: float = 1.0):
+        while not self._stopped:
+            with self.app.app_context():
+                try:
+                    self.reconcile_batch()
+                except DBManagerError as e:
+                    self.app.logger.error("Unable to read the files table, retrying later. Details: {}".format(e))
+                except Exception as e:
+                    self.app.logger.exception("Unexpected error reconciling the file storage: {}".format(e))
+            time.sleep(interval)
+
+    def stop(self):
+        self._stopped = True
@@ -0,0 +1,1549 @@
+;FLAVOR:Marlin
+;TIME:100
+;Filament used: 0.0354645m
+;Layer height: 0.15
+;Extruders used: T0 0.6
+;BCN3D_FIXES
+;Generated with Cura_SteamEngine 0.0.0-ber
+T0
+M190 S60
+M104 S195
+M109 S195
+M82 ;absolute extrusion mode
+;Sigma ProGen 2.2.0 (Build 14CJ1301)
+;BCN3D Fixes applied
+; - Fix Acceleration/Jerk commands
+; - Z Hop At Layer Change
+
+G21          ;metric values
+G90          ;absolute positioning
+M204 S600 ;set default acceleration
+M205 X12.5 Y12.5 ;set default jerk
+M107         ;start with the fan off
+G28 X0 Y0    ;move X/Y to min endstops
+G28 Z0       ;move Z to min endstops
+G1 Z5 F200   ;safety Z axis movement
+T1           ;switch to the right extruder
+G92 E0       ;zero the extruded length
+
+G92 E0       
+G4 P2000     ;stabilize hotend's pressure
+T0           ;switch to the left extruder
+G92 E0       ;zero the extruded length
+G1 F106.2 E15 ;extrude 15mm of feed stock
+G92 E0
+G4 P2000     ;stabilize hotend's pressure
+
+
+M92 E510.9
+M500
+G4 P1
+G4 P2
+G4 P3
+
+;LAYER_COUNT:6
+;LAYER:0
+M107
+M204 S1545
+M205 X9.38 Y9.38
+G0 F4002 X109.991 Y161.171 Z0.3
+M204 S618
+;TYPE:SKIRT
+G1 F900 X100.009 Y161.171 E0.33798
+G1 X99.226 Y161.131 E0.36453
+G1 X98.452 Y161.012 E0.39104
+G1 X97.694 Y160.814 E0.41757
+G1 X96.96 Y160.54 E0.4441
+G1 X96.257 Y160.192 E0.47066
+G1 X95.594 Y159.775 E0.49717
+G1 X94.977 Y159.293 E0.52368
+G1 X94.412 Y158.75 E0.55022
+G1 X93.905 Y158.152 E0.57676
+G1 X93.462 Y157.506 E0.60328
+G1 X93.087 Y156.818 E0.62982
+G1 X92.784 Y156.095 E0.65636
+G1 X92.556 Y155.345 E0.6829
+G1 X92.406 Y154.576 E0.70943
+G1 X92.329 Y153.491 E0.74626
+G1 X92.329 Y143.509 E1.08424
+G1 X92.369 Y142.726 E1.11078
+G1 X92.488 Y141.952 E1.1373
+G1 X92.686 Y141.194 E1.16383
+G1 X92.96 Y140.46 E1.19035
+G1 X93.308 Y139.757 E1.21691
+G1 X93.725 Y139.094 E1.24343
+G1 X94.207 Y138.477 E1.26994
+G1 X94.75 Y137.912 E1.29648
+G1 X95.348 Y137.405 E1.32302
+G1 X95.994 Y136.962 E1.34954
+G1 X96.682 Y136.587 E1.37607
+G1 X97.405 Y136.284 E1.40262
+G1 X98.155 Y136.056 E1.42916
+G1 X98.924 Y135.906 E1.45569
+G1 X100.01 Y135.829 E1.49255
+G1 X109.992 Y135.83 E1.83053
+G1 X110.774 Y135.87 E1.85704
+G1 X111.549 Y135.99 E1.8836
+G1 X112.307 Y136.188 E1.91012
+G1 X113.041 Y136.462 E1.93665
+G1 X113.743 Y136.809 E1.96316
+G1 X114.407 Y137.226 E1.98971
+G1 X115.024 Y137.709 E2.01624
+G1 X115.589 Y138.252 E2.04278
+G1 X116.095 Y138.85 E2.0693
+G1 X116.539 Y139.496 E2.09584
+G1 X116.913 Y140.184 E2.12235
+G1 X117.216 Y140.907 E2.1489
+G1 X117.444 Y141.657 E2.17544
+G1 X117.594 Y142.426 E2.20197
+G1 X117.671 Y143.51 E2.23876
+G1 X117.671 Y153.491 E2.57671
+G1 X117.631 Y154.274 E2.60326
+G1 X117.512 Y155.048 E2.62977
+G1 X117.314 Y155.806 E2.6563
+G1 X117.04 Y156.54 E2.68282
+G1 X116.692 Y157.243 E2.70938
+G1 X116.275 Y157.906 E2.7359
+G1 X115.793 Y158.523 E2.76241
+G1 X115.25 Y159.088 E2.78895
+G1 X114.652 Y159.595 E2.81549
+G1 X114.006 Y160.038 E2.84201
+G1 X113.318 Y160.413 E2.86854
+G1 X112.595 Y160.716 E2.89509
+G1 X111.845 Y160.944 E2.92163
+G1 X111.076 Y161.094 E2.94816
+G1 X110.544 Y161.132 E2.96622
+G0 F810 X109.991 Y161.171
+M204 S1545
+G0 F4002 X109.991 Y160.451
+M204 S618
+G1 F1050 E2.98501
+G1 F900 X100.009 Y160.451 E3.32299
+G1 X99.264 Y160.411 E3.34825
+G1 X98.528 Y160.292 E3.37349
+G1 X97.809 Y160.094 E3.39875
+G1 X97.115 Y159.821 E3.424
+G1 X96.454 Y159.474 E3.44927
+G1 X95.834 Y159.06 E3.47452
+G1 X95.262 Y158.581 E3.49978
+G1 X94.744 Y158.044 E3.52504
+G1 X94.287 Y157.454 E3.55031
+G1 X93.896 Y156.819 E3.57556
+G1 X93.575 Y156.146 E3.6008
+G1 X93.328 Y155.442 E3.62607
+G1 X93.158 Y154.716 E3.65131
+G1 X93.066 Y153.975 E3.67659
+G1 X93.049 Y153.491 E3.69299
+G1 X93.049 Y143.509 E4.03097
+G1 X93.089 Y142.764 E4.05623
+G1 X93.208 Y142.028 E4.08148
+G1 X93.406 Y141.309 E4.10673
+G1 X93.679 Y140.615 E4.13198
+G1 X94.026 Y139.954 E4.15726
+G1 X94.44 Y139.334 E4.1825
+G1 X94.919 Y138.762 E4.20776
+G1 X95.456 Y138.244 E4.23302
+G1 X96.046 Y137.787 E4.25829
+G1 X96.681 Y137.396 E4.28354
+G1 X97.354 Y137.075 E4.30879
+G1 X98.058 Y136.828 E4.33405
+G1 X98.784 Y136.658 E4.3593
+G1 X99.525 Y136.566 E4.38458
+G1 X100.01 Y136.549 E4.40101
+G1 X109.992 Y136.55 E4.73899
+G1 X110.737 Y136.59 E4.76425
+G1 X111.473 Y136.71 E4.7895
+G1 X112.192 Y136.907 E4.81474
+G1 X112.886 Y137.181 E4.84001
+G1 X113.547 Y137.527 E4.86527
+G1 X114.167 Y137.942 E4.89053
+G1 X114.739 Y138.421 E4.91579
+G1 X115.256 Y138.958 E4.94103
+G1 X115.713 Y139.548 E4.9663
+G1 X116.104 Y140.183 E4.99155
+G1 X116.425 Y140.856 E5.01679
+G1 X116.672 Y141.56 E5.04206
+G1 X116.843 Y142.286 E5.06731
+G1 X116.934 Y143.026 E5.09255
+G1 X116.951 Y143.51 E5.10895
+G1 X116.951 Y153.491 E5.4469
+G1 X116.911 Y154.236 E5.47216
+G1 X116.792 Y154.972 E5.4974
+G1 X116.594 Y155.691 E5.52265
+G1 X116.321 Y156.385 E5.54791
+G1 X115.974 Y157.046 E5.57318
+G1 X115.56 Y157.666 E5.59843
+G1 X115.081 Y158.238 E5.62369
+G1 X114.544 Y158.756 E5.64895
+G1 X113.954 Y159.213 E5.67422
+G1 X113.319 Y159.604 E5.69947
+G1 X112.646 Y159.925 E5.72471
+G1 X111.942 Y160.172 E5.74998
+G1 X111.216 Y160.342 E5.77522
+G1 X110.545 Y160.426 E5.79812
+G0 F810 X110.475 Y160.434
+G0 X109.991 Y160.451
+M204 S1545
+G0 F4002 X109.991 Y159.731
+M204 S618
+G1 F1050 E5.81691
+G1 F900 X100.009 Y159.731 E6.15489
+G1 X99.304 Y159.691 E6.1788
+G1 X98.608 Y159.572 E6.20271
+G1 X97.93 Y159.374 E6.22662
+G1 X97.278 Y159.102 E6.25054
+G1 X96.662 Y158.757 E6.27445
+G1 X96.088 Y158.345 E6.29837
+G1 X95.565 Y157.871 E6.32227
+G1 X95.098 Y157.341 E6.34619
+G1 X94.695 Y156.761 E6.3701
+G1 X94.359 Y156.14 E6.39401
+G1 X94.096 Y155.484 E6.41794
+G1 X93.909 Y154.803 E6.44185
+G1 X93.799 Y154.106 E6.46574
+G1 X93.769 Y153.491 E6.48659
+G1 X93.769 Y143.509 E6.82457
+G1 X93.809 Y142.804 E6.84848
+G1 X93.928 Y142.108 E6.87239
+G1 X94.126 Y141.43 E6.8963
+G1 X94.398 Y140.778 E6.92022
+G1 X94.743 Y140.162 E6.94413
+G1 X95.155 Y139.588 E6.96805
+G1 X95.629 Y139.065 E6.99195
+G1 X96.159 Y138.598 E7.01587
+G1 X96.739 Y138.195 E7.03978
+G1 X97.36 Y137.859 E7.06369
+G1 X98.016 Y137.596 E7.08762
+G1 X98.697 Y137.409 E7.11153
+G1 X99.394 Y137.299 E7.13542
+G1 X100.01 Y137.269 E7.1563
+G1 X109.992 Y137.27 E7.49428
+G1 X110.697 Y137.31 E7.51819
+G1 X111.393 Y137.43 E7.54211
+G1 X112.071 Y137.627 E7.56601
+G1 X112.722 Y137.9 E7.58991
+G1 X113.339 Y138.244 E7.61383
+G1 X113.913 Y138.656 E7.63776
+G1 X114.436 Y139.13 E7.66166
+G1 X114.902 Y139.661 E7.68558
+G1 X115.306 Y140.24 E7.70948
+G1 X115.641 Y140.862 E7.7334
+G1 X115.904 Y141.517 E7.7573
+G1 X116.092 Y142.198 E7.78122
+G1 X116.201 Y142.896 E7.80514
+G1 X116.231 Y143.51 E7.82596
+G1 X116.231 Y153.491 E8.1639
+G1 X116.191 Y154.196 E8.18781
+G1 X116.072 Y154.892 E8.21172
+G1 X115.874 Y155.57 E8.23563
+G1 X115.602 Y156.222 E8.25955
+G1 X115.257 Y156.838 E8.28346
+G1 X114.845 Y157.412 E8.30738
+G1 X114.371 Y157.935 E8.33128
+G1 X113.841 Y158.402 E8.3552
+G1 X113.261 Y158.805 E8.37911
+G1 X112.64 Y159.141 E8.40302
+G1 X111.984 Y159.404 E8.42695
+G1 X111.303 Y159.591 E8.45086
+G1 X110.606 Y159.701 E8.47475
+G1 X110.546 Y159.704 E8.47679
+G0 F810 X109.991 Y159.731
+M204 S1545
+G0 F4002 X109.991 Y159.011
+M204 S618
+G1 F1050 E8.49558
+G1 F900 X100.009 Y159.011 E8.83356
+G1 X99.346 Y158.971 E8.85605
+G1 X98.693 Y158.852 E8.87852
+G1 X98.058 Y158.655 E8.90103
+G1 X97.452 Y158.383 E8.92352
+G1 X96.883 Y158.041 E8.946
+G1 X96.359 Y157.632 E8.96851
+G1 X95.888 Y157.164 E8.99099
+G1 X95.477 Y156.642 E9.01349
+G1 X95.131 Y156.075 E9.03598
+G1 X94.856 Y155.47 E9.05848
+G1 X94.656 Y154.837 E9.08096
+G1 X94.533 Y154.184 E9.10345
+G1 X94.489 Y153.491 E9.12697
+G1 X94.489 Y143.509 E9.46495
+G1 X94.529 Y142.846 E9.48744
+G1 X94.648 Y142.193 E9.50991
+G1 X94.845 Y141.558 E9.53242
+G1 X95.117 Y140.952 E9.55491
+G1 X95.459 Y140.383 E9.57739
+G1 X95.868 Y139.859 E9.5999
+G1 X96.336 Y139.388 E9.62238
+G1 X96.858 Y138.977 E9.64487
+G1 X97.425 Y138.631 E9.66736
+G1 X98.03 Y138.356 E9.68987
+G1 X98.663 Y138.156 E9.71234
+G1 X99.316 Y138.033 E9.73484
+G1 X100.01 Y137.989 E9.75839
+G1 X109.992 Y137.99 E10.09637
+G1 X110.655 Y138.03 E10.11886
+G1 X111.308 Y138.149 E10.14133
+G1 X111.942 Y138.346 E10.16381
+G1 X112.548 Y138.618 E10.1863
+G1 X113.117 Y138.961 E10.2088
+G1 X113.641 Y139.369 E10.23128
+G1 X114.112 Y139.838 E10.25379
+G1 X114.523 Y140.359 E10.27626
+G1 X114.869 Y140.926 E10.29875
+G1 X115.144 Y141.531 E10.32125
+G1 X115.344 Y142.164 E10.34372
+G1 X115.467 Y142.817 E10.36622
+G1 X115.511 Y143.51 E10.38974
+G1 X115.511 Y153.491 E10.72768
+G1 X115.471 Y154.154 E10.75017
+G1 X115.352 Y154.807 E10.77265
+G1 X115.155 Y155.442 E10.79516
+G1 X114.883 Y156.048 E10.81765
+G1 X114.541 Y156.617 E10.84013
+G1 X114.132 Y157.141 E10.86263
+G1 X113.664 Y157.612 E10.88511
+G1 X113.142 Y158.023 E10.90761
+G1 X112.575 Y158.369 E10.9301
+G1 X111.97 Y158.644 E10.9526
+G1 X111.337 Y158.844 E10.97508
+G1 X110.684 Y158.967 E10.99758
+G1 X110.545 Y158.976 E11.00229
+G0 F810 X109.991 Y159.011
+M204 S1545
+G0 F4002 X109.991 Y158.291
+M204 S618
+G1 F1050 E11.02108
+G1 F900 X100.009 Y158.291 E11.35907
+G1 X99.391 Y158.251 E11.38003
+G1 X98.783 Y158.132 E11.40101
+G1 X98.196 Y157.935 E11.42198
+G1 X97.639 Y157.665 E11.44293
+G1 X97.121 Y157.325 E11.46391
+G1 X96.651 Y156.921 E11.4849
+G1 X96.238 Y156.46 E11.50586
+G1 X95.887 Y155.95 E11.52682
+G1 X95.604 Y155.399 E11.54779
+G1 X95.395 Y154.816 E11.56876
+G1 X95.263 Y154.21 E11.58976
+G1 X95.209 Y153.491 E11.61417
+G1 X95.209 Y143.509 E11.95215
+G1 X95.249 Y142.891 E11.97312
+G1 X95.368 Y142.283 E11.9941
+G1 X95.565 Y141.696 E12.01506
+G1 X95.835 Y141.139 E12.03602
+G1 X96.175 Y140.621 E12.057
+G1 X96.579 Y140.151 E12.07799
+G1 X97.04 Y139.738 E12.09894
+G1 X97.55 Y139.387 E12.11991
+G1 X98.101 Y139.104 E12.14088
+G1 X98.684 Y138.895 E12.16185
+G1 X99.29 Y138.763 E12.18285
+G1 X100.009 Y138.709 E12.20726
+G1 X109.991 Y138.71 E12.54524
+G1 X110.61 Y138.75 E12.56625
+G1 X111.217 Y138.869 E12.58719
+G1 X111.805 Y139.066 E12.60819
+G1 X112.362 Y139.336 E12.62914
+G1 X112.879 Y139.676 E12.6501
+G1 X113.349 Y140.08 E12.67108
+G1 X113.763 Y140.541 E12.69206
+G1 X114.114 Y141.052 E12.71305
+G1 X114.396 Y141.603 E12.73401
+G1 X114.605 Y142.186 E12.75498
+G1 X114.737 Y142.791 E12.77594
+G1 X114.791 Y143.51 E12.80036
+G1 X114.791 Y153.491 E13.1383
+G1 X114.751 Y154.109 E13.15927
+G1 X114.632 Y154.717 E13.18025
+G1 X114.435 Y155.304 E13.20121
+G1 X114.165 Y155.861 E13.22217
+G1 X113.825 Y156.379 E13.24315
+G1 X113.421 Y156.849 E13.26414
+G1 X112.96 Y157.262 E13.28509
+G1 X112.45 Y157.613 E13.30606
+G1 X111.899 Y157.896 E13.32703
+G1 X111.316 Y158.105 E13.348
+G1 X110.71 Y158.237 E13.369
+G1 X110.544 Y158.25 E13.37464
+G0 F810 X109.991 Y158.291
+M204 S1545
+G0 F4002 X109.991 Y157.571
+M204 S618
+G1 F1050 E13.39343
+G1 F900 X100.009 Y157.571 E13.73141
+G1 X99.439 Y157.531 E13.75076
+G1 X98.881 Y157.412 E13.77007
+G1 X98.345 Y157.216 E13.7894
+G1 X97.841 Y156.947 E13.80874
+G1 X97.38 Y156.611 E13.82806
+G1 X96.97 Y156.213 E13.8474
+G1 X96.62 Y155.762 E13.86673
+G1 X96.336 Y155.267 E13.88606
+G1 X96.124 Y154.737 E13.90538
+G1 X95.988 Y154.182 E13.92473
+G1 X95.929 Y153.491 E13.94821
+G1 X95.929 Y143.509 E14.28619
+G1 X95.969 Y142.939 E14.30554
+G1 X96.088 Y142.381 E14.32486
+G1 X96.284 Y141.845 E14.34418
+G1 X96.553 Y141.341 E14.36353
+G1 X96.889 Y140.88 E14.38284
+G1 X97.287 Y140.47 E14.40219
+G1 X97.738 Y140.12 E14.42152
+G1 X98.233 Y139.836 E14.44084
+G1 X98.763 Y139.624 E14.46017
+G1 X99.318 Y139.488 E14.47952
+G1 X100.009 Y139.429 E14.503
+G1 X109.991 Y139.43 E14.84098
+G1 X110.561 Y139.47 E14.86033
+G1 X111.119 Y139.589 E14.87964
+G1 X111.656 Y139.785 E14.899
+G1 X112.159 Y140.054 E14.91831
+G1 X112.621 Y140.39 E14.93766
+G1 X113.03 Y140.788 E14.95698
+G1 X113.381 Y141.239 E14.97633
+G1 X113.664 Y141.734 E14.99563
+G1 X113.876 Y142.265 E15.01499
+G1 X114.012 Y142.819 E15.03431
+G1 X114.071 Y143.51 E15.05779
+G1 X114.071 Y153.491 E15.39574
+G1 X114.031 Y154.061 E15.41508
+G1 X113.912 Y154.619 E15.4344
+G1 X113.716 Y155.155 E15.45373
+G1 X113.447 Y155.659 E15.47307
+G1 X113.111 Y156.12 E15.49238
+G1 X112.713 Y156.53 E15.51173
+G1 X112.262 Y156.88 E15.53106
+G1 X111.767 Y157.164 E15.55038
+G1 X111.237 Y157.376 E15.56971
+G1 X110.682 Y157.512 E15.58906
+G1 X110.544 Y157.524 E15.59375
+G0 F810 X109.991 Y157.571
+M204 S1545
+G0 F4002 X109.991 Y156.851
+M204 S618
+G1 F1050 E15.61254
+G1 F900 X100.009 Y156.851 E15.95052
+G1 X99.492 Y156.811 E15.96808
+G1 X98.988 Y156.692 E15.98561
+G1 X98.508 Y156.497 E16.00316
+G1 X98.064 Y156.231 E16.02068
+G1 X97.666 Y155.899 E16.03823
+G1 X97.324 Y155.51 E16.05577
+G1 X97.045 Y155.074 E16.07329
+G1 X96.837 Y154.599 E16.09085
+G1 X96.704 Y154.098 E16.1084
+G1 X96.649 Y153.491 E16.12904
+G1 X96.649 Y143.509 E16.46702
+G1 X96.689 Y142.992 E16.48458
+G1 X96.808 Y142.488 E16.50211
+G1 X97.003 Y142.008 E16.51965
+G1 X97.269 Y141.564 E16.53718
+G1 X97.601 Y141.166 E16.55473
+G1 X97.99 Y140.824 E16.57226
+G1 X98.426 Y140.545 E16.58979
+G1 X98.901 Y140.337 E16.60735
+G1 X99.402 Y140.204 E16.6249
+G1 X100.009 Y140.149 E16.64553
+G1 X109.991 Y140.15 E16.98352
+G1 X110.508 Y140.19 E17.00107
+G1 X111.012 Y140.309 E17.01861
+G1 X111.492 Y140.504 E17.03615
+G1 X111.936 Y140.77 E17.05367
+G1 X112.334 Y141.102 E17.07122
+G1 X112.677 Y141.491 E17.08878
+G1 X112.955 Y141.928 E17.10632
+G1 X113.163 Y142.402 E17.12385
+G1 X113.296 Y142.903 E17.1414
+G1 X113.351 Y143.51 E17.16203
+G1 X113.351 Y153.491 E17.49998
+G1 X113.311 Y154.008 E17.51754
+G1 X113.192 Y154.512 E17.53507
+G1 X112.997 Y154.992 E17.55261
+G1 X112.731 Y155.436 E17.57014
+G1 X112.399 Y155.834 E17.58769
+G1 X112.01 Y156.176 E17.60523
+G1 X111.574 Y156.455 E17.62275
+G1 X111.099 Y156.663 E17.64031
+G1 X110.598 Y156.796 E17.65786
+G1 X110.544 Y156.801 E17.6597
+G0 F810 X109.991 Y156.851
+M204 S1545
+G1 F2100 E11.1597
+G0 F4002 X108.937 Y152.437
+G0 X108.881 Y152.381
+G0 X109.64 Y153.14
+M204 S618
+;TYPE:WALL-OUTER
+G1 F1050 E17.67849
+G1 F900 X100.36 Y153.14 E17.9927
+G1 X100.36 Y143.86 E18.30691
+G1 X109.64 Y143.86 E18.62112
+G1 X109.64 Y152.585 E18.91654
+G0 F810 X109.64 Y153.14
+M204 S1545
+G0 F4002 X109.34 Y153.14
+G0 X108.951 Y152.451
+M204 S618
+;TYPE:WALL-INNER
+G1 F1050 E18.93533
+G1 F900 X108.293 Y152.451 E18.95569
+G1 X101.707 Y152.451 E19.15949
+G1 X101.049 Y152.451 E19.17985
+G1 X101.049 Y151.793 E19.20021
+G1 X101.049 Y145.207 E19.404
+G1 X101.049 Y144.549 E19.42436
+G1 X101.707 Y144.549 E19.44472
+G1 X108.293 Y144.549 E19.64852
+G1 X108.951 Y144.549 E19.66888
+G1 X108.951 Y145.207 E19.68924
+G1 X108.951 Y151.793 E19.89303
+G1 X108.951 Y151.844 E19.89461
+G0 F810 X108.951 Y152.451
+M204 S1545
+G0 F4002 X108.293 Y151.793
+M204 S618
+G1 F1050 E19.91339
+G1 F900 X107.635 Y151.793 E19.93375
+G1 X102.365 Y151.793 E20.09682
+G1 X101.707 Y151.793 E20.11719
+G1 X101.707 Y151.135 E20.13755
+G1 X101.707 Y145.865 E20.30062
+G1 X101.707 Y145.207 E20.32098
+G1 X102.365 Y145.207 E20.34134
+G1 X107.635 Y145.207 E20.50441
+G1 X108.293 Y145.207 E20.52477
+G1 X108.293 Y145.865 E20.54513
+G1 X108.293 Y151.135 E20.7082
+G1 X108.293 Y151.186 E20.70978
+G0 F810 X108.293 Y151.793
+M204 S1545
+G0 F4002 X107.635 Y151.135
+M204 S618
+G1 F1050 E20.72856
+G1 F900 X102.365 Y151.135 E20.89164
+G1 X102.365 Y145.865 E21.05471
+G1 X107.635 Y145.865 E21.21778
+G1 X107.635 Y150.528 E21.36207
+G0 F810 X107.635 Y151.135
+M204 S1545
+G0 F4002 X106.956 Y150.456
+M204 S618
+;TYPE:SKIN
+G1 F1050 E21.38085
+G1 F900 X103.044 Y150.456 E21.51331
+G1 X103.044 Y146.544 E21.64576
+G1 X106.956 Y146.544 E21.77822
+G1 X106.956 Y149.901 E21.89188
+G0 F810 X106.956 Y150.456
+M204 S1545
+G0 F4002 X106.379 Y147.119
+M204 S618
+G1 F1050 E21.91068
+G1 F900 X105.373 Y147.12 E21.94474
+G1 X106.379 Y148.126 E21.99291
+M204 S1545
+G0 F4002 X105.373 Y147.12
+M204 S618
+G1 F900 X104.354 Y147.12 E22.02741
+G1 X106.379 Y149.145 E22.12438
+G1 X106.378 Y149.878 E22.1492
+G1 X106.094 Y149.878 E22.15881
+G1 X103.62 Y147.404 E22.27728
+G1 X103.62 Y148.423 E22.31178
+G1 X105.076 Y149.878 E22.38147
+G1 X104.057 Y149.878 E22.41598
+G1 X103.62 Y149.441 E22.4369
+M204 S1545
+G0 F4002 X103.62 Y149.878
+M204 S618
+G1 F900 X104.057 Y149.878 E22.4517
+M204 S1545
+G0 F4002 X104.133 Y150.802
+G1 F900 X104.557 Y150.802 E22.45752
+G1 X104.981 Y150.802 E22.46334
+G1 X105.405 Y150.802 E22.46916
+G1 X105.83 Y150.802 E22.475
+G1 X106.254 Y150.802 E22.48082
+G1 X106.678 Y150.802 E22.48664
+G1 X107.103 Y150.802 E22.49248
+G1 X107.303 Y150.578 E22.4983
+G1 X107.303 Y150.153 E22.50413
+G1 X107.303 Y149.729 E22.50996
+G1 X107.303 Y149.305 E22.51578
+G1 X107.303 Y148.88 E22.52161
+G1 X107.303 Y148.456 E22.52744
+G1 X107.303 Y148.032 E22.53326
+G1 X107.303 Y147.608 E22.53908
+G1 X107.303 Y147.183 E22.54492
+G1 X107.303 Y146.759 E22.55074
+G1 X107.233 Y146.265 E22.55794
+G1 X106.739 Y146.196 E22.56517
+G1 X106.315 Y146.196 E22.57099
+G1 X105.891 Y146.196 E22.57681
+G1 X105.466 Y146.196 E22.58265
+G1 X105.042 Y146.196 E22.58847
+G1 X104.618 Y146.196 E22.59429
+G1 X104.193 Y146.196 E22.60013
+G1 X103.769 Y146.196 E22.60595
+G1 X103.345 Y146.196 E22.61177
+G1 X102.921 Y146.196 E22.6176
+G1 X102.696 Y146.396 E22.62343
+G1 X102.696 Y146.82 E22.62927
+G1 X102.696 Y147.244 E22.63511
+G1 X102.696 Y147.668 E22.64095
+G1 X102.696 Y148.093 E22.64681
+G1 X102.696 Y148.517 E22.65265
+G1 X102.696 Y148.941 E22.65849
+G1 X102.696 Y149.366 E22.66435
+G1 X102.696 Y149.79 E22.67019
+G1 X102.696 Y150.214 E22.67603
+G1 X102.778 Y150.72 E22.68348
+G1 X103.284 Y150.802 E22.69093
+G1 X103.708 Y150.802 E22.69675
+G0 F4002 X103.854 Y150.948
+G0 X108.881 Y152.381
+G0 X109.7 Y153.2
+;TIME_ELAPSED:50.644773
+;LAYER:1
+G91
+G1 F2100 E-6.5
+G1 F12000 Z0.45 ;z hop at layer change
+G90
+M140 S60
+M106 S63.8
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X109.7 Y153.2 Z0.45
+M204 S626
+M205 X7.03 Y7.03
+;TYPE:WALL-OUTER
+G91
+G1 F2100 E6.5
+G90
+G1 F900 X100.3 Y153.2 E22.82937
+G1 X100.3 Y143.8 E22.96198
+G1 X109.7 Y143.8 E23.0946
+G1 X109.7 Y151.867 E23.20841
+G0 F810 X109.7 Y153.2
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X109.4 Y153.2
+G0 X109.126 Y152.626
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:WALL-INNER
+G1 F1050 E23.22721
+G1 F1350 X108.577 Y152.626 E23.2343
+G1 X101.423 Y152.626 E23.32665
+G1 X100.874 Y152.626 E23.33374
+G1 X100.874 Y152.077 E23.34082
+G1 X100.874 Y144.923 E23.43317
+G1 X100.874 Y144.374 E23.44026
+G1 X101.423 Y144.374 E23.44735
+G1 X108.577 Y144.374 E23.53969
+G1 X109.126 Y144.374 E23.54678
+G1 X109.126 Y144.923 E23.55387
+G1 X109.126 Y151.169 E23.6345
+G0 F1215 X109.126 Y152.077
+G0 X109.126 Y152.626
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X108.577 Y152.077
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E23.6533
+G1 F1350 X108.028 Y152.077 E23.66039
+G1 X101.972 Y152.077 E23.73857
+G1 X101.423 Y152.077 E23.74565
+G1 X101.423 Y151.528 E23.75274
+G1 X101.423 Y145.472 E23.83092
+G1 X101.423 Y144.923 E23.838
+G1 X101.972 Y144.923 E23.84509
+G1 X108.028 Y144.923 E23.92326
+G1 X108.577 Y144.923 E23.93035
+G1 X108.577 Y145.472 E23.93744
+G1 X108.577 Y150.62 E24.00389
+G0 F1215 X108.577 Y151.528
+G0 X108.577 Y152.077
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X108.028 Y151.528
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E24.0227
+G1 F1350 X101.972 Y151.528 E24.10088
+G1 X101.972 Y145.472 E24.17905
+G1 X108.028 Y145.472 E24.25723
+G1 X108.028 Y150.071 E24.31659
+G0 F1215 X108.028 Y151.528
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X107.464 Y150.964
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1050 E24.3354
+G1 F1350 X102.536 Y150.964 E24.40493
+G1 X102.536 Y146.036 E24.47445
+G1 X107.464 Y146.036 E24.54397
+G1 X107.464 Y149.631 E24.59469
+G0 F1215 X107.464 Y150.964
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X107.006 Y150.506
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E24.6135
+G1 F1350 X107.006 Y150.097 E24.61927
+G1 X106.597 Y150.506 E24.62743
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X107.006 Y150.097
+M204 S618
+M205 X9.38 Y9.38
+G1 F1350 X107.006 Y149.249 E24.63939
+G1 X105.749 Y150.506 E24.66447
+G1 X104.9 Y150.506 E24.67645
+G1 X107.006 Y148.4 E24.71847
+G1 X107.006 Y147.551 E24.73044
+G1 X104.052 Y150.506 E24.78939
+G1 X103.203 Y150.506 E24.80137
+G1 X107.006 Y146.703 E24.87724
+G1 X107.007 Y146.492 E24.88022
+G1 X106.369 Y146.492 E24.88922
+G1 X102.992 Y149.868 E24.95659
+G1 X102.992 Y149.019 E24.96857
+G1 X105.52 Y146.492 E25.01899
+G1 X104.672 Y146.492 E25.03096
+G1 X102.992 Y148.171 E25.06447
+G1 X102.992 Y147.322 E25.07644
+G1 X103.823 Y146.492 E25.09301
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X102.992 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1350 X102.992 Y147.322 E25.10472
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X102.245 Y147.644
+G1 F1350 X102.245 Y148.069 E25.10759
+G1 X102.245 Y148.493 E25.11045
+G1 X102.245 Y148.917 E25.11331
+G1 X102.245 Y149.341 E25.11618
+G1 X102.245 Y149.766 E25.11904
+G1 X102.245 Y150.19 E25.1219
+G1 X102.245 Y150.614 E25.12477
+G1 X102.245 Y151.038 E25.12763
+G1 X102.456 Y151.252 E25.1305
+G1 X102.88 Y151.252 E25.13336
+G1 X103.305 Y151.252 E25.13623
+G1 X103.729 Y151.252 E25.13909
+G1 X104.153 Y151.252 E25.14195
+G1 X104.577 Y151.252 E25.14481
+G1 X105.002 Y151.252 E25.14768
+G1 X105.426 Y151.252 E25.15054
+G1 X105.85 Y151.252 E25.1534
+G1 X106.274 Y151.252 E25.15626
+G1 X106.699 Y151.252 E25.15913
+G1 X107.123 Y151.252 E25.16199
+G1 X107.65 Y151.15 E25.16588
+G1 X107.752 Y150.623 E25.16976
+G1 X107.752 Y150.198 E25.17263
+G1 X107.752 Y149.774 E25.17549
+G1 X107.752 Y149.35 E25.17836
+G1 X107.752 Y148.926 E25.18122
+G1 X107.752 Y148.501 E25.18408
+G1 X107.752 Y148.077 E25.18695
+G1 X107.752 Y147.653 E25.18981
+G1 X107.752 Y147.229 E25.19267
+G1 X107.752 Y146.804 E25.19554
+G1 X107.752 Y146.38 E25.1984
+G1 X107.752 Y145.956 E25.20126
+G1 X107.539 Y145.745 E25.20412
+G1 X107.114 Y145.745 E25.20699
+G1 X106.69 Y145.745 E25.20985
+G1 X106.266 Y145.745 E25.21271
+G1 X105.842 Y145.745 E25.21557
+G1 X105.417 Y145.745 E25.21844
+G1 X104.993 Y145.745 E25.2213
+G1 X104.569 Y145.745 E25.22416
+G1 X104.145 Y145.745 E25.22702
+G1 X103.72 Y145.745 E25.22989
+G1 X103.296 Y145.745 E25.23275
+G1 X102.872 Y145.745 E25.23562
+G1 X102.347 Y145.846 E25.23949
+G1 X102.245 Y146.372 E25.24336
+G1 X102.245 Y146.796 E25.24622
+G1 X102.245 Y147.22 E25.24908
+G0 F8001 X102.102 Y145.667
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1350 X102.167 Y145.602 E25.24973
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X107.896 Y151.328
+M204 S618
+M205 X9.38 Y9.38
+G1 F1350 X107.828 Y151.396 E25.2504
+M204 S1522
+M205 X10.94 Y10.94
+G0 F8001 X109.056 Y152.556
+G0 X109.7 Y153.2
+;TIME_ELAPSED:61.734069
+;LAYER:2
+G91
+G1 F2100 E-6.5
+G1 F12000 Z0.45 ;z hop at layer change
+G90
+M106 S127.5
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.7 Y153.2 Z0.6
+M204 S635
+M205 X4.69 Y4.69
+;TYPE:WALL-OUTER
+G91
+G1 F2100 E6.5
+G90
+G1 F900 X100.3 Y153.2 E25.38302
+G1 X100.3 Y143.8 E25.51563
+G1 X109.7 Y143.8 E25.64825
+G1 X109.7 Y151.867 E25.76206
+G0 F810 X109.7 Y153.2
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.4 Y153.2
+G0 X109.126 Y152.626
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:WALL-INNER
+G1 F1050 E25.78086
+G1 F1800 X108.577 Y152.626 E25.78795
+G1 X101.423 Y152.626 E25.8803
+G1 X100.874 Y152.626 E25.88739
+G1 X100.874 Y152.077 E25.89447
+G1 X100.874 Y144.923 E25.98682
+G1 X100.874 Y144.374 E25.99391
+G1 X101.423 Y144.374 E26.00099
+G1 X108.577 Y144.374 E26.09334
+G1 X109.126 Y144.374 E26.10043
+G1 X109.126 Y144.923 E26.10752
+G1 X109.126 Y151.169 E26.18815
+G0 F1620 X109.126 Y152.077
+G0 X109.126 Y152.626
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.577 Y152.077
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E26.20695
+G1 F1800 X108.028 Y152.077 E26.21404
+G1 X101.972 Y152.077 E26.29222
+G1 X101.423 Y152.077 E26.2993
+G1 X101.423 Y151.528 E26.30639
+G1 X101.423 Y145.472 E26.38457
+G1 X101.423 Y144.923 E26.39165
+G1 X101.972 Y144.923 E26.39874
+G1 X108.028 Y144.923 E26.47691
+G1 X108.577 Y144.923 E26.484
+G1 X108.577 Y145.472 E26.49109
+G1 X108.577 Y150.62 E26.55754
+G0 F1620 X108.577 Y151.528
+G0 X108.577 Y152.077
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.028 Y151.528
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E26.57635
+G1 F1800 X101.972 Y151.528 E26.65453
+G1 X101.972 Y145.472 E26.7327
+G1 X108.028 Y145.472 E26.81088
+G1 X108.028 Y150.071 E26.87024
+G0 F1620 X108.028 Y151.528
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.464 Y150.964
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1050 E26.88905
+G1 F1800 X102.536 Y150.964 E26.95858
+G1 X102.536 Y146.036 E27.0281
+G1 X107.464 Y146.036 E27.09762
+G1 X107.464 Y149.631 E27.14834
+G0 F1620 X107.464 Y150.964
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.007 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E27.16715
+G1 F1800 X106.611 Y146.492 E27.17273
+G1 X107.007 Y146.887 E27.18062
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X106.611 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X105.763 Y146.492 E27.19259
+G1 X107.007 Y147.736 E27.21741
+G1 X107.007 Y148.585 E27.22939
+G1 X104.914 Y146.492 E27.27114
+G1 X104.066 Y146.492 E27.28311
+G1 X107.007 Y149.433 E27.34179
+G1 X107.007 Y150.282 E27.35376
+G1 X103.217 Y146.492 E27.42938
+G1 X102.992 Y146.492 E27.43255
+G1 X102.992 Y147.116 E27.44136
+G1 X106.382 Y150.506 E27.50899
+G1 X105.534 Y150.506 E27.52096
+G1 X102.992 Y147.964 E27.57167
+G1 X102.992 Y148.813 E27.58365
+G1 X104.685 Y150.506 E27.61743
+G1 X103.837 Y150.506 E27.62939
+G1 X102.992 Y149.661 E27.64625
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.992 Y150.506
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X103.837 Y150.506 E27.65817
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X104.159 Y151.252
+G1 F1800 X104.583 Y151.252 E27.66103
+G1 X105.007 Y151.252 E27.6639
+G1 X105.431 Y151.252 E27.66676
+G1 X105.856 Y151.252 E27.66963
+G1 X106.28 Y151.252 E27.67249
+G1 X106.704 Y151.252 E27.67535
+G1 X107.129 Y151.252 E27.67822
+G1 X107.553 Y151.252 E27.68108
+G1 X107.752 Y151.027 E27.68394
+G1 X107.752 Y150.603 E27.6868
+G1 X107.752 Y150.179 E27.68966
+G1 X107.752 Y149.754 E27.69253
+G1 X107.752 Y149.33 E27.69539
+G1 X107.752 Y148.906 E27.69825
+G1 X107.752 Y148.482 E27.70111
+G1 X107.752 Y148.057 E27.70398
+G1 X107.752 Y147.633 E27.70684
+G1 X107.752 Y147.209 E27.7097
+G1 X107.752 Y146.785 E27.71256
+G1 X107.752 Y146.36 E27.71543
+G1 X107.657 Y145.841 E27.71924
+G1 X107.137 Y145.745 E27.72305
+G1 X106.713 Y145.745 E27.72591
+G1 X106.289 Y145.745 E27.72877
+G1 X105.864 Y145.745 E27.73164
+G1 X105.44 Y145.745 E27.7345
+G1 X105.016 Y145.745 E27.73736
+G1 X104.591 Y145.745 E27.74023
+G1 X104.167 Y145.745 E27.74309
+G1 X103.743 Y145.745 E27.74595
+G1 X103.319 Y145.745 E27.74881
+G1 X102.894 Y145.745 E27.75168
+G1 X102.47 Y145.745 E27.75454
+G1 X102.245 Y145.944 E27.7574
+G1 X102.245 Y146.369 E27.76027
+G1 X102.245 Y146.793 E27.76313
+G1 X102.245 Y147.217 E27.76599
+G1 X102.245 Y147.642 E27.76886
+G1 X102.245 Y148.066 E27.77172
+G1 X102.245 Y148.49 E27.77458
+G1 X102.245 Y148.914 E27.77744
+G1 X102.245 Y149.339 E27.78031
+G1 X102.245 Y149.763 E27.78317
+G1 X102.245 Y150.187 E27.78603
+G1 X102.245 Y150.611 E27.78889
+G1 X102.354 Y151.144 E27.79282
+G1 X102.886 Y151.252 E27.79677
+G1 X103.31 Y151.252 E27.79963
+G1 X103.734 Y151.252 E27.80249
+G0 F12000 X102.181 Y151.396
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1800 X102.102 Y151.317 E27.80328
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.842 Y145.602
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.896 Y145.656 E27.80381
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.056 Y152.556
+G0 X109.7 Y153.2
+;TIME_ELAPSED:71.545958
+;LAYER:3
+G91
+G1 F2100 E-6.5
+G1 F12000 Z0.45 ;z hop at layer change
+G90
+M106 S191.3
+G0 X109.7 Y153.2 Z0.75
+M204 S635
+M205 X4.69 Y4.69
+;TYPE:WALL-OUTER
+G91
+G1 F2100 E6.5
+G90
+G1 F900 X100.3 Y153.2 E27.93643
+G1 X100.3 Y143.8 E28.06904
+G1 X109.7 Y143.8 E28.20166
+G1 X109.7 Y151.867 E28.31547
+G0 F810 X109.7 Y153.2
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.4 Y153.2
+G0 X109.126 Y152.626
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:WALL-INNER
+G1 F1050 E28.33427
+G1 F1800 X108.577 Y152.626 E28.34136
+G1 X101.423 Y152.626 E28.43371
+G1 X100.874 Y152.626 E28.4408
+G1 X100.874 Y152.077 E28.44788
+G1 X100.874 Y144.923 E28.54023
+G1 X100.874 Y144.374 E28.54732
+G1 X101.423 Y144.374 E28.55441
+G1 X108.577 Y144.374 E28.64675
+G1 X109.126 Y144.374 E28.65384
+G1 X109.126 Y144.923 E28.66093
+G1 X109.126 Y151.169 E28.74156
+G0 F1620 X109.126 Y152.077
+G0 X109.126 Y152.626
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.577 Y152.077
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E28.76036
+G1 F1800 X108.028 Y152.077 E28.76745
+G1 X101.972 Y152.077 E28.84563
+G1 X101.423 Y152.077 E28.85271
+G1 X101.423 Y151.528 E28.8598
+G1 X101.423 Y145.472 E28.93798
+G1 X101.423 Y144.923 E28.94506
+G1 X101.972 Y144.923 E28.95215
+G1 X108.028 Y144.923 E29.03032
+G1 X108.577 Y144.923 E29.03741
+G1 X108.577 Y145.472 E29.0445
+G1 X108.577 Y150.62 E29.11095
+G0 F1620 X108.577 Y151.528
+G0 X108.577 Y152.077
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.028 Y151.528
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E29.12976
+G1 F1800 X101.972 Y151.528 E29.20794
+G1 X101.972 Y145.472 E29.28611
+G1 X108.028 Y145.472 E29.36429
+G1 X108.028 Y150.071 E29.42365
+G0 F1620 X108.028 Y151.528
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.464 Y150.964
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1050 E29.44246
+G1 F1800 X102.536 Y150.964 E29.51199
+G1 X102.536 Y146.036 E29.58151
+G1 X107.464 Y146.036 E29.65103
+G1 X107.464 Y149.631 E29.70175
+G0 F1620 X107.464 Y150.964
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.006 Y150.506
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E29.72056
+G1 F1800 X107.006 Y150.097 E29.72633
+G1 X106.597 Y150.506 E29.73449
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.006 Y150.097
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.006 Y149.249 E29.74645
+G1 X105.749 Y150.506 E29.77153
+G1 X104.9 Y150.506 E29.78351
+G1 X107.006 Y148.4 E29.82553
+G1 X107.006 Y147.551 E29.8375
+G1 X104.052 Y150.506 E29.89645
+G1 X103.203 Y150.506 E29.90843
+G1 X107.006 Y146.703 E29.9843
+G1 X107.007 Y146.492 E29.98728
+G1 X106.369 Y146.492 E29.99628
+G1 X102.992 Y149.868 E30.06365
+G1 X102.992 Y149.019 E30.07563
+G1 X105.52 Y146.492 E30.12605
+G1 X104.672 Y146.492 E30.13802
+G1 X102.992 Y148.171 E30.17153
+G1 X102.992 Y147.322 E30.1835
+G1 X103.823 Y146.492 E30.20007
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.992 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X102.992 Y147.322 E30.21178
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.245 Y147.644
+G1 F1800 X102.245 Y148.069 E30.21465
+G1 X102.245 Y148.493 E30.21751
+G1 X102.245 Y148.917 E30.22037
+G1 X102.245 Y149.341 E30.22324
+G1 X102.245 Y149.766 E30.2261
+G1 X102.245 Y150.19 E30.22896
+G1 X102.245 Y150.614 E30.23183
+G1 X102.245 Y151.038 E30.23469
+G1 X102.456 Y151.252 E30.23756
+G1 X102.88 Y151.252 E30.24042
+G1 X103.305 Y151.252 E30.24329
+G1 X103.729 Y151.252 E30.24615
+G1 X104.153 Y151.252 E30.24901
+G1 X104.577 Y151.252 E30.25187
+G1 X105.002 Y151.252 E30.25474
+G1 X105.426 Y151.252 E30.2576
+G1 X105.85 Y151.252 E30.26046
+G1 X106.274 Y151.252 E30.26332
+G1 X106.699 Y151.252 E30.26619
+G1 X107.123 Y151.252 E30.26905
+G1 X107.65 Y151.15 E30.27294
+G1 X107.752 Y150.623 E30.27683
+G1 X107.752 Y150.198 E30.27969
+G1 X107.752 Y149.774 E30.28255
+G1 X107.752 Y149.35 E30.28542
+G1 X107.752 Y148.926 E30.28828
+G1 X107.752 Y148.501 E30.29114
+G1 X107.752 Y148.077 E30.29401
+G1 X107.752 Y147.653 E30.29687
+G1 X107.752 Y147.229 E30.29973
+G1 X107.752 Y146.804 E30.3026
+G1 X107.752 Y146.38 E30.30546
+G1 X107.752 Y145.956 E30.30832
+G1 X107.539 Y145.745 E30.31118
+G1 X107.114 Y145.745 E30.31405
+G1 X106.69 Y145.745 E30.31691
+G1 X106.266 Y145.745 E30.31977
+G1 X105.842 Y145.745 E30.32263
+G1 X105.417 Y145.745 E30.3255
+G1 X104.993 Y145.745 E30.32836
+G1 X104.569 Y145.745 E30.33122
+G1 X104.145 Y145.745 E30.33409
+G1 X103.72 Y145.745 E30.33695
+G1 X103.296 Y145.745 E30.33981
+G1 X102.872 Y145.745 E30.34268
+G1 X102.347 Y145.846 E30.34655
+G1 X102.245 Y146.372 E30.35042
+G1 X102.245 Y146.796 E30.35328
+G1 X102.245 Y147.22 E30.35614
+G0 F12000 X102.102 Y145.667
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1800 X102.167 Y145.602 E30.35679
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.896 Y151.328
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.828 Y151.396 E30.35746
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.056 Y152.556
+G0 X109.7 Y153.2
+;TIME_ELAPSED:81.211359
+;LAYER:4
+G91
+G1 F2100 E-6.5
+G1 F12000 Z0.45 ;z hop at layer change
+G90
+M106 S255
+G0 X109.7 Y153.2 Z0.9
+M204 S635
+M205 X4.69 Y4.69
+;TYPE:WALL-OUTER
+G91
+G1 F2100 E6.5
+G90
+G1 F900 X100.3 Y153.2 E30.49008
+G1 X100.3 Y143.8 E30.62269
+G1 X109.7 Y143.8 E30.75531
+G1 X109.7 Y151.867 E30.86912
+G0 F810 X109.7 Y153.2
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.4 Y153.2
+G0 X109.126 Y152.626
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:WALL-INNER
+G1 F1050 E30.88792
+G1 F1800 X108.577 Y152.626 E30.89501
+G1 X101.423 Y152.626 E30.98736
+G1 X100.874 Y152.626 E30.99445
+G1 X100.874 Y152.077 E31.00153
+G1 X100.874 Y144.923 E31.09388
+G1 X100.874 Y144.374 E31.10097
+G1 X101.423 Y144.374 E31.10806
+G1 X108.577 Y144.374 E31.2004
+G1 X109.126 Y144.374 E31.20749
+G1 X109.126 Y144.923 E31.21458
+G1 X109.126 Y151.169 E31.29521
+G0 F1620 X109.126 Y152.077
+G0 X109.126 Y152.626
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.577 Y152.077
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E31.31401
+G1 F1800 X108.028 Y152.077 E31.3211
+G1 X101.972 Y152.077 E31.39928
+G1 X101.423 Y152.077 E31.40636
+G1 X101.423 Y151.528 E31.41345
+G1 X101.423 Y145.472 E31.49163
+G1 X101.423 Y144.923 E31.49871
+G1 X101.972 Y144.923 E31.5058
+G1 X108.028 Y144.923 E31.58397
+G1 X108.577 Y144.923 E31.59106
+G1 X108.577 Y145.472 E31.59815
+G1 X108.577 Y150.62 E31.6646
+G0 F1620 X108.577 Y151.528
+G0 X108.577 Y152.077
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.028 Y151.528
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E31.68341
+G1 F1800 X101.972 Y151.528 E31.76159
+G1 X101.972 Y145.472 E31.83976
+G1 X108.028 Y145.472 E31.91794
+G1 X108.028 Y150.071 E31.9773
+G0 F1620 X108.028 Y151.528
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.464 Y150.964
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1050 E31.99611
+G1 F1800 X102.536 Y150.964 E32.06564
+G1 X102.536 Y146.036 E32.13516
+G1 X107.464 Y146.036 E32.20468
+G1 X107.464 Y149.631 E32.2554
+G0 F1620 X107.464 Y150.964
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.007 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E32.27421
+G1 F1800 X106.611 Y146.492 E32.27979
+G1 X107.007 Y146.887 E32.28768
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X106.611 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X105.763 Y146.492 E32.29965
+G1 X107.007 Y147.736 E32.32447
+G1 X107.007 Y148.585 E32.33645
+G1 X104.914 Y146.492 E32.3782
+G1 X104.066 Y146.492 E32.39017
+G1 X107.007 Y149.433 E32.44885
+G1 X107.007 Y150.282 E32.46082
+G1 X103.217 Y146.492 E32.53644
+G1 X102.992 Y146.492 E32.53961
+G1 X102.992 Y147.116 E32.54842
+G1 X106.382 Y150.506 E32.61605
+G1 X105.534 Y150.506 E32.62802
+G1 X102.992 Y147.964 E32.67873
+G1 X102.992 Y148.813 E32.69071
+G1 X104.685 Y150.506 E32.72449
+G1 X103.837 Y150.506 E32.73645
+G1 X102.992 Y149.661 E32.75331
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.992 Y150.506
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X103.837 Y150.506 E32.76523
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X104.159 Y151.252
+G1 F1800 X104.583 Y151.252 E32.76809
+G1 X105.007 Y151.252 E32.77096
+G1 X105.431 Y151.252 E32.77382
+G1 X105.856 Y151.252 E32.77669
+G1 X106.28 Y151.252 E32.77955
+G1 X106.704 Y151.252 E32.78241
+G1 X107.129 Y151.252 E32.78528
+G1 X107.553 Y151.252 E32.78814
+G1 X107.752 Y151.027 E32.791
+G1 X107.752 Y150.603 E32.79386
+G1 X107.752 Y150.179 E32.79672
+G1 X107.752 Y149.754 E32.79959
+G1 X107.752 Y149.33 E32.80245
+G1 X107.752 Y148.906 E32.80531
+G1 X107.752 Y148.482 E32.80817
+G1 X107.752 Y148.057 E32.81104
+G1 X107.752 Y147.633 E32.8139
+G1 X107.752 Y147.209 E32.81676
+G1 X107.752 Y146.785 E32.81962
+G1 X107.752 Y146.36 E32.82249
+G1 X107.657 Y145.841 E32.8263
+G1 X107.137 Y145.745 E32.83011
+G1 X106.713 Y145.745 E32.83297
+G1 X106.289 Y145.745 E32.83583
+G1 X105.864 Y145.745 E32.8387
+G1 X105.44 Y145.745 E32.84156
+G1 X105.016 Y145.745 E32.84442
+G1 X104.591 Y145.745 E32.84729
+G1 X104.167 Y145.745 E32.85015
+G1 X103.743 Y145.745 E32.85301
+G1 X103.319 Y145.745 E32.85587
+G1 X102.894 Y145.745 E32.85874
+G1 X102.47 Y145.745 E32.8616
+G1 X102.245 Y145.944 E32.86446
+G1 X102.245 Y146.369 E32.86733
+G1 X102.245 Y146.793 E32.87019
+G1 X102.245 Y147.217 E32.87305
+G1 X102.245 Y147.642 E32.87592
+G1 X102.245 Y148.066 E32.87878
+G1 X102.245 Y148.49 E32.88164
+G1 X102.245 Y148.914 E32.8845
+G1 X102.245 Y149.339 E32.88737
+G1 X102.245 Y149.763 E32.89023
+G1 X102.245 Y150.187 E32.89309
+G1 X102.245 Y150.611 E32.89595
+G1 X102.354 Y151.144 E32.89988
+G1 X102.886 Y151.252 E32.90383
+G1 X103.31 Y151.252 E32.90669
+G1 X103.734 Y151.252 E32.90955
+G0 F12000 X102.181 Y151.396
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1800 X102.102 Y151.317 E32.91034
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.842 Y145.602
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.896 Y145.656 E32.91087
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.056 Y152.556
+G0 X109.7 Y153.2
+;TIME_ELAPSED:91.023247
+;LAYER:5
+G91
+G1 F2100 E-6.5
+G1 F12000 Z0.45 ;z hop at layer change
+G90
+G0 X109.7 Y153.2 Z1.05
+M204 S635
+M205 X4.69 Y4.69
+;TYPE:WALL-OUTER
+G91
+G1 F2100 E6.5
+G90
+G1 F900 X100.3 Y153.2 E33.04349
+G1 X100.3 Y143.8 E33.1761
+G1 X109.7 Y143.8 E33.30872
+G1 X109.7 Y151.867 E33.42253
+G0 F810 X109.7 Y153.2
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X109.4 Y153.2
+G0 X109.126 Y152.626
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:WALL-INNER
+G1 F1050 E33.44133
+G1 F1800 X108.577 Y152.626 E33.44842
+G1 X101.423 Y152.626 E33.54077
+G1 X100.874 Y152.626 E33.54786
+G1 X100.874 Y152.077 E33.55494
+G1 X100.874 Y144.923 E33.64729
+G1 X100.874 Y144.374 E33.65438
+G1 X101.423 Y144.374 E33.66147
+G1 X108.577 Y144.374 E33.75381
+G1 X109.126 Y144.374 E33.7609
+G1 X109.126 Y144.923 E33.76799
+G1 X109.126 Y151.169 E33.84862
+G0 F1620 X109.126 Y152.077
+G0 X109.126 Y152.626
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.577 Y152.077
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E33.86742
+G1 F1800 X108.028 Y152.077 E33.87451
+G1 X101.972 Y152.077 E33.95269
+G1 X101.423 Y152.077 E33.95977
+G1 X101.423 Y151.528 E33.96686
+G1 X101.423 Y145.472 E34.04504
+G1 X101.423 Y144.923 E34.05212
+G1 X101.972 Y144.923 E34.05921
+G1 X108.028 Y144.923 E34.13738
+G1 X108.577 Y144.923 E34.14447
+G1 X108.577 Y145.472 E34.15156
+G1 X108.577 Y150.62 E34.21801
+G0 F1620 X108.577 Y151.528
+G0 X108.577 Y152.077
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X108.028 Y151.528
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E34.23682
+G1 F1800 X101.972 Y151.528 E34.315
+G1 X101.972 Y145.472 E34.39317
+G1 X108.028 Y145.472 E34.47135
+G1 X108.028 Y150.071 E34.53071
+G0 F1620 X108.028 Y151.528
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.464 Y150.964
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1050 E34.54952
+G1 F1800 X102.536 Y150.964 E34.61905
+G1 X102.536 Y146.036 E34.68857
+G1 X107.464 Y146.036 E34.75809
+G1 X107.464 Y149.631 E34.80881
+G0 F1620 X107.464 Y150.964
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.006 Y150.506
+M204 S618
+M205 X9.38 Y9.38
+G1 F1050 E34.82762
+G1 F1800 X107.006 Y150.097 E34.83339
+G1 X106.597 Y150.506 E34.84155
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.006 Y150.097
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.006 Y149.249 E34.85351
+G1 X105.749 Y150.506 E34.87859
+G1 X104.9 Y150.506 E34.89057
+G1 X107.006 Y148.4 E34.93259
+G1 X107.006 Y147.551 E34.94456
+G1 X104.052 Y150.506 E35.00351
+G1 X103.203 Y150.506 E35.01549
+G1 X107.006 Y146.703 E35.09136
+G1 X107.007 Y146.492 E35.09434
+G1 X106.369 Y146.492 E35.10334
+G1 X102.992 Y149.868 E35.17071
+G1 X102.992 Y149.019 E35.18269
+G1 X105.52 Y146.492 E35.23311
+G1 X104.672 Y146.492 E35.24508
+G1 X102.992 Y148.171 E35.27859
+G1 X102.992 Y147.322 E35.29056
+G1 X103.823 Y146.492 E35.30713
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.992 Y146.492
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X102.992 Y147.322 E35.31884
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X102.245 Y147.644
+G1 F1800 X102.245 Y148.069 E35.32171
+G1 X102.245 Y148.493 E35.32457
+G1 X102.245 Y148.917 E35.32743
+G1 X102.245 Y149.341 E35.3303
+G1 X102.245 Y149.766 E35.33316
+G1 X102.245 Y150.19 E35.33602
+G1 X102.245 Y150.614 E35.33889
+G1 X102.245 Y151.038 E35.34175
+G1 X102.456 Y151.252 E35.34462
+G1 X102.88 Y151.252 E35.34748
+G1 X103.305 Y151.252 E35.35035
+G1 X103.729 Y151.252 E35.35321
+G1 X104.153 Y151.252 E35.35607
+G1 X104.577 Y151.252 E35.35893
+G1 X105.002 Y151.252 E35.3618
+G1 X105.426 Y151.252 E35.36466
+G1 X105.85 Y151.252 E35.36752
+G1 X106.274 Y151.252 E35.37038
+G1 X106.699 Y151.252 E35.37325
+G1 X107.123 Y151.252 E35.37611
+G1 X107.65 Y151.15 E35.38
+G1 X107.752 Y150.623 E35.38389
+G1 X107.752 Y150.198 E35.38675
+G1 X107.752 Y149.774 E35.38961
+G1 X107.752 Y149.35 E35.39248
+G1 X107.752 Y148.926 E35.39534
+G1 X107.752 Y148.501 E35.39821
+G1 X107.752 Y148.077 E35.40107
+G1 X107.752 Y147.653 E35.40393
+G1 X107.752 Y147.229 E35.40679
+G1 X107.752 Y146.804 E35.40966
+G1 X107.752 Y146.38 E35.41252
+G1 X107.752 Y145.956 E35.41538
+G1 X107.539 Y145.745 E35.41824
+G1 X107.114 Y145.745 E35.42111
+G1 X106.69 Y145.745 E35.42397
+G1 X106.266 Y145.745 E35.42683
+G1 X105.842 Y145.745 E35.42969
+G1 X105.417 Y145.745 E35.43256
+G1 X104.993 Y145.745 E35.43542
+G1 X104.569 Y145.745 E35.43828
+G1 X104.145 Y145.745 E35.44115
+G1 X103.72 Y145.745 E35.44401
+G1 X103.296 Y145.745 E35.44687
+G1 X102.872 Y145.745 E35.44974
+G1 X102.347 Y145.846 E35.45361
+G1 X102.245 Y146.372 E35.45748
+G1 X102.245 Y146.796 E35.46034
+G1 X102.245 Y147.22 E35.4632
+G0 F12000 X102.102 Y145.667
+M204 S618
+M205 X9.38 Y9.38
+;TYPE:SKIN
+G1 F1800 X102.167 Y145.602 E35.46385
+M204 S1500
+M205 X12.5 Y12.5
+G0 F12000 X107.896 Y151.328
+M204 S618
+M205 X9.38 Y9.38
+G1 F1800 X107.828 Y151.396 E35.46452
+;TIME_ELAPSED:100.619386
+G1 F2100 E28.96452
+M204 S600
+M107
+M104 S0 T0               ;left extruder heater off
+M104 S0 T1               ;right extruder heater off
+M140 S0                  ;heated bed heater off
+M204 S600 ;set default acceleration
+M205 X12.5 Y12.5 ;set default jerk
+G91                      ;relative positioning
+G1 Z+0.5 E-5 Y+10 F12000 ;move Z up a bit and retract filament
+G28 X0 Y0                ;move X/Y to min endstops so the head is out of the way
+M84                      ;steppers off
+G90                      ;absolute positioning
+
+M82 ;absolute extrusion mode
+M104 S0
+;End of Gcode
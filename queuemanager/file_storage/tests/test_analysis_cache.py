@@ -0,0 +1,40 @@
+"""
+This module implements the job analysis cache test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from ..analysis_cache import AnalysisCache
+
+
+def test_analysis_cache(tmp_path):
+    path = str(tmp_path / "cache" / "analysis_cache.sqlite3")
+    cache = AnalysisCache(path, max_size=2)
+
+    assert cache.get("a") is None
+    cache.set("a", {"allowed_materials": [[1, 0]]})
+    cache.set("b", {"allowed_materials": [[2, 0]]})
+    assert cache.get("a") == {"allowed_materials": [[1, 0]]}
+
+    # The least recently used entry is evicted
+    cache.set("c", {"allowed_materials": [[3, 0]]})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 2
+    cache.close()
+
+    # The entries are kept between instances
+    cache = AnalysisCache(path, max_size=2)
+    assert cache.get("a") == {"allowed_materials": [[1, 0]]}
+    assert cache.get("c") == {"allowed_materials": [[3, 0]]}
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
@@ -0,0 +1,150 @@
+"""
+This module implements the cold storage and the storage tiering test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+import time
+from datetime import datetime, timedelta
+from shutil import copyfile
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from ..cold_storage import ColdStorage
+from ..file_manager import FileDescriptor
+from ..tiering import StorageTiering
+from ...database import DBManagerError
+
+
+def test_cold_storage(tmp_path):
+    cold_storage = ColdStorage(str(tmp_path / "cold"), quota=None)
+
+    with open("./test-file.gcode", "rb") as f:
+        file_content = f.read()
+
+    # The contents are compressed and restored in chunks
+    path = cold_storage.store("./test-file.gcode", "a" * 64)
+    assert cold_storage.contains("a" * 64)
+    assert os.path.getsize(path) < len(file_content) / 2
+    with cold_storage.open("a" * 64) as f:
+        assert f.read() == file_content
+
+    cold_storage.restore("a" * 64, str(tmp_path / "restored"))
+    with open(str(tmp_path / "restored"), "rb") as f:
+        assert f.read() == file_content
+
+    # The least recently used contents are evicted when the quota is exceeded
+    cold_storage.store("./test-file-no-header.gcode", "b" * 64)
+    cold_storage.store("./test-file.gcode", "c" * 64)
+    old_time = time.time() - 60
+    os.utime(cold_storage.get_path("b" * 64), (old_time, old_time))
+    cold_storage.quota = cold_storage.get_usage() - 1
+
+    # The copies that can't be evicted are kept, even if the quota is still exceeded
+    assert cold_storage.evict(lambda content_hash: False) == []
+    assert cold_storage.is_full()
+
+    assert cold_storage.evict(lambda content_hash: content_hash == "b" * 64) == [cold_storage.get_path("b" * 64)]
+    assert not cold_storage.contains("b" * 64)
+    assert cold_storage.contains("a" * 64)
+    assert cold_storage.contains("c" * 64)
+    assert not cold_storage.is_full()
+
+
+def test_storage_tiering(app, db_manager, file_manager, tmp_path):
+    user = db_manager.get_users(id=1)
+    printer = db_manager.get_printers(id=1)
+    file_manager.cold_storage = ColdStorage(str(tmp_path / "cold"))
+
+    jobs = []
+    for name in ("done", "waiting"):
+        copyfile("./test-file-no-header.gcode" if name == "done" else "./test-file.gcode", "./test-file-tmp.gcode")
+        file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+        jobs.append(db_manager.insert_job(name, file_obj, user))
+        db_manager.enqueue_created_job(jobs[-1])
+
+    db_manager.update_job(jobs[0], canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, jobs[0])
+    db_manager.set_printing_job(jobs[0])
+    db_manager.set_finished_job(jobs[0])
+    db_manager.set_done_job(jobs[0], True)
+
+    # The job was done recently, so the file stays in the upload directory
+    tiering = StorageTiering(app, file_manager, days=30)
+    tiering.tier_batch()
+    assert tiering.counters["files_moved"] == 0
+
+    db_manager.update_job(jobs[0], finishedAt=datetime.now() - timedelta(days=31))
+    tiering.tier_batch()
+    assert tiering.counters["files_moved"] == 1
+
+    done_file, waiting_file = jobs[0].file, jobs[1].file
+    assert not os.path.exists(done_file.fullPath)
+    assert os.path.exists(waiting_file.fullPath)
+    assert file_manager.content_exists(done_file)
+
+    # The file is restored when it's needed again
+    with file_manager.get_file_d(done_file, binary=True) as f:
+        with open("./test-file-no-header.gcode", "rb") as test_file:
+            assert f.read() == test_file.read()
+    assert os.path.exists(done_file.fullPath)
+
+    # Once it's in the cold storage, moving it again only removes it from the upload directory
+    assert file_manager.move_file_to_cold_storage(done_file) is True
+    assert not os.path.exists(done_file.fullPath)
+    assert file_manager.cold_storage.contains(file_manager.get_file_hash(done_file))
+
+
+def test_storage_tiering_quota(app, db_manager, file_manager, tmp_path):
+    user = db_manager.get_users(id=1)
+    printer = db_manager.get_printers(id=1)
+    file_manager.cold_storage = ColdStorage(str(tmp_path / "cold"))
+
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    job = db_manager.insert_job("done", file_obj, user)
+    db_manager.enqueue_created_job(job)
+    db_manager.update_job(job, canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, job)
+    db_manager.set_printing_job(job)
+    db_manager.set_finished_job(job)
+    db_manager.set_done_job(job, True)
+    db_manager.update_job(job, finishedAt=datetime.now() - timedelta(days=31))
+
+    tiering = StorageTiering(app, file_manager, days=30)
+    tiering.tier_batch()
+    assert tiering.counters["files_moved"] == 1
+    content_hash = file_manager.get_file_hash(file_obj)
+
+    # The cold copy is the last copy of the content, so it isn't evicted and no more files are moved
+    file_manager.cold_storage.quota = 0
+    tiering.tier_batch()
+    assert tiering.counters["files_evicted"] == 0
+    assert tiering.counters["batches_refused"] == 1
+    assert file_manager.cold_storage.contains(content_hash)
+
+    # Once the file is restored, its cold copy can be evicted
+    file_manager.rehydrate_file(file_obj)
+    assert file_manager.evict_cold_storage() == [file_manager.cold_storage.get_path(content_hash)]
+    assert not file_manager.cold_storage.is_full()
+    assert os.path.exists(file_obj.fullPath)
+
+
+def test_storage_tiering_database_error(app, session, file_manager, monkeypatch):
+    storage_tiering = StorageTiering(app, file_manager)
+
+    def query(*_args, **_kwargs):
+        raise OperationalError("SELECT", {}, Exception("connection lost"))
+
+    # The database errors are raised as the DBManager ones, so the service keeps running
+    monkeypatch.setattr(session, "query", query)
+    with pytest.raises(DBManagerError):
+        storage_tiering.tier_batch()
@@ -10,36 +10,51 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+import gzip
+import hashlib
 import os
 import time
-from shutil import copyfile
+from datetime import timedelta
+from shutil import copyfile, rmtree
 
-from ..file_manager import FileDescriptor
+import pytest
+from werkzeug.datastructures import FileStorage
 
+from ..backends import LocalStorageBackend
+from ..exceptions import FilesystemError
+from ..file_manager import FileDescriptor, TMP_FILE_SUFFIX
+from ...database import DBManagerError
 
-def test_file_manager_class(db_manager, file_manager):
-    class FlaskFile(object):
-        def __init__(self, filename, full_path):
-            self.filename = filename
-            self.origin_full_path = full_path
-
-        def save(self, destination_path):
-            copyfile(self.origin_full_path, destination_path)
 
+def test_file_manager_class(app, db_manager, file_manager):
     user = db_manager.get_users(id=1)
-    file = FlaskFile("test-file.gcode", "./test-file.gcode")
+    file = FileStorage(stream=open("./test-file.gcode", "rb"), filename="test-file.gcode")
     file_descriptor = FileDescriptor(file.filename, flask_file_obj=file)
 
-    file_obj = file_manager.save_file(file_descriptor, user)
+    first_file_obj = file_obj = file_manager.save_file(file_descriptor, user)
+    file.close()
     assert file_obj.name == file.filename
     assert file_obj.user == user
     assert os.path.isfile(file_obj.fullPath)
+    assert file_obj.estimatedPrintingTime.total_seconds() == 100.0
+    assert round(file_obj.estimatedNeededMaterial, 2) == 0.28
+    assert file_obj.fileData["print_times"]["total"] == 101
+    with open("./test-file.gcode", "rb") as f:
+        assert file_descriptor.content_hash == hashlib.sha256(f.read()).hexdigest()
 
-    file_descriptor = FileDescriptor(file.filename, path="./test-file.gcode")
+    # The file is moved from the given path, so use a copy of the test file
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_descriptor = FileDescriptor(file.filename, path="./test-file-tmp.gcode")
     file_obj = file_manager.save_file(file_descriptor, user)
     assert file_obj.name == file.filename
     assert file_obj.user == user
     assert os.path.isfile(file_obj.fullPath)
+    assert file_obj.fileData["print_times"]["total"] == 101
+
+    # Both files have the same content, so only one copy is stored
+    assert file_obj.fullPath == first_file_obj.fullPath
+    assert file_manager.get_file_hash(file_obj) == file_descriptor.content_hash
+    assert len(os.listdir(app.config['FILE_MANAGER_UPLOAD_DIR'])) == 1
 
     initial_time = time.time()
 
@@ -84,6 +99,307 @@ def test_file_manager_class(db_manager, file_manager):
     assert file_obj.estimatedPrintingTime.total_seconds() == 100.0
     assert round(file_obj.estimatedNeededMaterial, 2) == 0.28
 
+    db_manager.update_file(file_obj, estimatedPrintingTime=None, estimatedNeededMaterial=None, fileData=None)
+
+    initial_time = time.time()
+
+    header = file_manager.retrieve_file_header(file_obj)
+
+    print("Total time for retrieve the header:", time.time() - initial_time)
+
+    assert header.layer_count == 6
+    assert file_obj.estimatedPrintingTime.total_seconds() == 100.0
+    assert round(file_obj.estimatedNeededMaterial, 2) == 0.28
+    assert file_obj.fileData["print_times"]["total"] == 101
+
+    # The content is only deleted when the last file referencing it is deleted
+    file_manager.delete_file(file_obj)
+
+    assert os.path.isfile(first_file_obj.fullPath)
+
+    file_manager.delete_file(first_file_obj)
+
+    assert not os.path.isfile(first_file_obj.fullPath)
+
+
+def test_delete_file_while_saving_same_content(app, db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+
+    def _save_test_file():
+        with open("./test-file.gcode", "rb") as f:
+            file = FileStorage(stream=f, filename="test-file.gcode")
+            return file_manager.save_file(FileDescriptor(file.filename, flask_file_obj=file), user)
+
+    file_obj = _save_test_file()
+    path = file_obj.fullPath
+    saved_files = []
+    take_file_content = file_manager._take_file_content
+
+    def _take_file_content_and_save(*args):
+        # Save a file with the same content while the content is being deleted
+        trash_path = take_file_content(*args)
+        saved_files.append(_save_test_file())
+        return trash_path
+
+    file_manager._take_file_content = _take_file_content_and_save
+    file_manager.delete_file(file_obj)
+    file_manager._take_file_content = take_file_content
+
+    # The new file references the content, so it isn't deleted
+    assert saved_files[0].fullPath == path
+    assert os.path.isfile(path)
+    assert os.listdir(app.config['FILE_MANAGER_UPLOAD_DIR']) == [os.path.basename(path)]
+
+    file_manager.delete_file(saved_files[0])
+
+    assert not os.path.isfile(path)
+    assert os.listdir(app.config['FILE_MANAGER_UPLOAD_DIR']) == []
+
+
+def test_analyze_job(db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+    file_manager.analysis_cache.clear()
+
+    jobs = []
+    for i in range(2):
+        copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+        file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+        jobs.append(db_manager.insert_job("test-job-{}".format(i), file_obj, user))
+
+    # The first job is analyzed from the file data and the second one takes the cached result
+    for job in jobs:
+        file_manager.analyze_job(job)
+
+        assert job.analyzed is True
+        assert len(job.allowed_materials) == 1
+        assert job.allowed_materials[0].material.type == "PLA"
+        assert job.allowed_materials[0].extruderIndex == 0
+        assert len(job.allowed_extruder_types) == 1
+        assert job.allowed_extruder_types[0].type.nozzleDiameter == 0.6
+        assert len(job.extruders_data) == 1
+        assert round(job.extruders_data[0].estimatedNeededMaterial, 2) == 0.32
+        assert job.file.estimatedPrintingTime.total_seconds() == 101.0
+
+    assert file_manager.analysis_cache.misses == 1
+    assert file_manager.analysis_cache.hits == 1
+    assert len(file_manager.analysis_cache) == 1
+
+    # The moves of the files with file data are only analyzed when the layer index is requested
+    assert file_manager.get_layer_index(jobs[0].file) is None
+    file_manager.analysis_cache.clear()
+    file_manager.analyze_job(jobs[0], build_layer_index=True)
+    assert file_manager.get_layer_index(jobs[0].file) is not None
+
+    # The catalog digest only changes when the materials or the extruder types change
+    catalog_digest = file_manager.catalog_index.get_digest()
+    file_manager.catalog_index.invalidate()
+    assert file_manager.catalog_index.get_digest() == catalog_digest
+
+
+def test_analysis_unit_of_work(session, db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    job = db_manager.insert_job("test-job", file_obj, user)
+
+    # The writes are staged until the unit of work ends
+    with file_manager.unit_of_work():
+        file_manager.set_file_information_from_file_data(file_obj)
+        file_manager.set_job_allowed_config_from_file_data(job)
+        file_manager.set_job_estimated_needed_material_from_file_data(job)
+
+        assert job.analyzed is False
+        assert len(job.allowed_materials) == 0
+        assert len(job.extruders_data) == 0
+
+    assert job.analyzed is True
+    assert len(job.allowed_materials) == 1
+    assert len(job.allowed_extruder_types) == 1
+    assert len(job.extruders_data) == 1
+    assert round(job.extruders_data[0].estimatedNeededMaterial, 2) == 0.32
+    assert file_obj.estimatedPrintingTime.total_seconds() == 101.0
+
+    # If the analysis fails, nothing is saved
+    other_job = db_manager.insert_job("test-job-2", file_obj, user)
+    try:
+        with file_manager.unit_of_work():
+            file_manager.set_job_allowed_config_from_file_data(other_job)
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+
+    assert other_job.analyzed is False
+    assert len(other_job.allowed_materials) == 0
+
+    # Analyzing the job again replaces its allowed configuration
+    with file_manager.unit_of_work():
+        file_manager.set_job_allowed_config_from_file_data(job)
+
+    assert len(job.allowed_materials) == 1
+    assert len(job.allowed_extruder_types) == 1
+
+    # If the commit fails, the session is rolled back and it can be used again
+    commit_changes = db_manager.commit_changes
+
+    def _failing_commit():
+        session.flush()
+        raise DBManagerError("Unable to commit the changes")
+
+    db_manager.commit_changes = _failing_commit
+    try:
+        with pytest.raises(DBManagerError):
+            with file_manager.unit_of_work():
+                file_manager.set_job_allowed_config_from_file_data(other_job)
+    finally:
+        db_manager.commit_changes = commit_changes
+
+    assert other_job.analyzed is False
+    assert len(other_job.allowed_materials) == 0
+    db_manager.update_job(other_job, name="test-job-3")
+    assert db_manager.get_jobs(id=other_job.id).name == "test-job-3"
+
+
+def test_analyze_job_from_file_moves(db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+    copyfile("./test-file-no-header.gcode", "./test-file-no-header-tmp.gcode")
+    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file-no-header-tmp.gcode")
+    file_obj = file_manager.save_file(file_descriptor, user)
+    job = db_manager.insert_job("test-job", file_obj, user)
+
+    file_manager.analyze_job(job)
+
+    assert job.analyzed is True
+    assert file_obj.fileData is None
+    # The material is unknown, so all of them are allowed
+    assert len(job.allowed_materials) == len(db_manager.get_printer_materials())
+    assert all(allowed_extruder.type.nozzleDiameter == 0.6 for allowed_extruder in job.allowed_extruder_types)
+    assert len(job.extruders_data) == 1
+    assert job.extruders_data[0].extruderIndex == 0
+    assert round(job.extruders_data[0].estimatedNeededMaterial, 2) == 0.31
+    assert file_obj.estimatedPrintingTime.total_seconds() == 100.0
+
+    # The layer index is built while analyzing the moves
+    assert os.path.exists(file_manager.get_layer_index_path(file_obj))
+    assert len(file_manager.get_layer_index(file_obj)) == 6
+    assert file_manager.get_job_progress_info(job, 0.0) == (None, timedelta(seconds=100.0))
+    assert file_manager.get_job_progress_info(job, 100.0) == (5, timedelta())
+
+
+def test_sharded_layout(app, db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+    upload_dir = app.config['FILE_MANAGER_UPLOAD_DIR']
+
+    # Save a file in the flat layout
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    content_hash = file_manager.get_file_hash(file_obj)
+    flat_path = file_obj.fullPath
+    assert flat_path == os.path.join(upload_dir, content_hash)
+    file_manager.analyze_file_moves(file_obj)
+
+    # Move it to the sharded layout
+    file_manager.shard_levels = 2
+    sharded_path = os.path.join(upload_dir, content_hash[:2], content_hash[2:4], content_hash)
+    assert file_manager.get_content_path(content_hash) == sharded_path
+    assert file_manager.migrate_to_sharded_layout() == 1
+    assert file_manager.migrate_to_sharded_layout() == 0
+
+    assert file_obj.fullPath == sharded_path
+    assert not os.path.exists(flat_path)
+    assert os.path.exists(sharded_path)
+    assert file_manager.get_layer_index(file_obj) is not None
+    assert file_manager.get_accel_redirect_path(file_obj) == "/files/{}/{}/{}".format(
+        content_hash[:2], content_hash[2:4], content_hash)
+
+    # The new files are saved in the sharded layout
+    copyfile("./test-file-no-header.gcode", "./test-file-tmp.gcode")
+    other_file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    assert other_file_obj.fullPath == file_manager.get_content_path(file_manager.get_file_hash(other_file_obj))
+    with file_manager.get_file_d(other_file_obj, binary=True) as f:
+        with open("./test-file-no-header.gcode", "rb") as test_file:
+            assert f.read() == test_file.read()
+
     file_manager.delete_file(file_obj)
+    file_manager.delete_file(other_file_obj)
+    assert not os.path.exists(sharded_path)
+
+    for entry in os.listdir(upload_dir):
+        if os.path.isdir(os.path.join(upload_dir, entry)):
+            rmtree(os.path.join(upload_dir, entry))
+
+
+def test_precompressed_file(db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+
+    # The compressed copy is saved next to the content the first time it's requested
+    compressed_path = file_manager.get_compressed_file(file_obj, "gzip")
+    assert compressed_path == file_obj.fullPath + ".gz"
+    assert file_manager.get_compressed_file(file_obj, "gzip") == compressed_path
+    with gzip.open(compressed_path, "rb") as f, open(file_obj.fullPath, "rb") as content:
+        assert f.read() == content.read()
+
+    etag, _, size = file_manager.get_file_validators(file_obj)
+    compressed_etag, _, compressed_size = file_manager.get_file_validators(file_obj, "gzip")
+    assert compressed_etag == etag + "-gzip"
+    assert compressed_size == os.path.getsize(compressed_path) < size
+
+    with pytest.raises(ValueError):
+        file_manager.get_compressed_file(file_obj, "zstd")
+
+    # The compressed copy is deleted together with the content
+    file_manager.delete_file(file_obj)
+    assert not os.path.exists(compressed_path)
+
+
+def test_remote_storage_local_copies(db_manager, file_manager, tmp_path):
+    user = db_manager.get_users(id=1)
+    # A local backend in another directory, used as if it was remote
+    file_manager.storage = LocalStorageBackend(str(tmp_path / "remote"))
+    file_manager.storage.is_local = False
+
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    content_hash = file_manager.get_file_hash(file_obj)
+
+    # The local copy is removed once the content is uploaded
+    assert file_manager.storage.exists(content_hash)
+    assert not os.path.exists(file_obj.fullPath)
+    assert file_manager.content_exists(file_obj)
+
+    # It's downloaded again when the file is read, and removed again by the tiering
+    with file_manager.get_file_d(file_obj, binary=True) as f:
+        with open("./test-file.gcode", "rb") as test_file:
+            assert f.read() == test_file.read()
+    assert os.path.exists(file_obj.fullPath)
+    assert file_manager.move_file_to_cold_storage(file_obj) is True
+    assert not os.path.exists(file_obj.fullPath)
+    assert file_manager.storage.exists(content_hash)
+
+
+class _FailingDeleteStorageBackend(LocalStorageBackend):
+    is_local = False
+
+    def delete(self, key: str):
+        raise FilesystemError("Unable to delete the object '{}'".format(key))
+
+
+def test_delete_file_backend_error(app, db_manager, file_manager, tmp_path):
+    user = db_manager.get_users(id=1)
+    file_manager.storage = _FailingDeleteStorageBackend(str(tmp_path / "remote"))
+
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    path = file_manager.get_file_path(file_obj)
+    content_hash = file_manager.get_file_hash(file_obj)
+
+    with pytest.raises(FilesystemError):
+        file_manager.delete_file(file_obj)
 
-    assert not os.path.isfile(file_obj.fullPath)
+    # The content is put back instead of being left in the trash
+    upload_dir = app.config['FILE_MANAGER_UPLOAD_DIR']
+    assert not [name for name in os.listdir(upload_dir) if name.endswith(TMP_FILE_SUFFIX)]
+    assert os.path.exists(path)
+    assert file_manager.storage.exists(content_hash)
@@ -0,0 +1,59 @@
+"""
+This module implements the file mover functions test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+from shutil import copyfile
+
+import pytest
+
+from ..file_mover import MOVE_STRATEGIES, _copy, _zero_copy, move_file
+
+
+def test_move_file(tmp_path):
+    with open("./test-file.gcode", "rb") as f:
+        file_content = f.read()
+
+    # Check all the strategies one by one
+    for name, strategy in MOVE_STRATEGIES:
+        origin = str(tmp_path / "origin-{}".format(name))
+        destination = str(tmp_path / "destination-{}".format(name))
+        copyfile("./test-file.gcode", origin)
+
+        assert move_file(origin, destination, strategies=((name, strategy),)) == name
+        with open(destination, "rb") as f:
+            assert f.read() == file_content
+
+    # Inside the same filesystem the file is renamed
+    origin = str(tmp_path / "origin")
+    copyfile("./test-file.gcode", origin)
+    assert move_file(origin, str(tmp_path / "destination")) == "rename"
+    assert not os.path.exists(origin)
+
+    with pytest.raises(OSError):
+        move_file(str(tmp_path / "missing"), str(tmp_path / "destination-missing"))
+
+
+def test_move_file_zero_copy_fallback(tmp_path):
+    with open("./test-file.gcode", "rb") as f:
+        file_content = f.read()
+
+    def _no_copy(origin, destination):
+        # Simulate a filesystem where the zero-copy calls don't copy anything
+        _zero_copy(lambda fd_in, fd_out, offset, count: 0, origin, destination)
+
+    origin = str(tmp_path / "origin")
+    destination = str(tmp_path / "destination")
+    copyfile("./test-file.gcode", origin)
+
+    assert move_file(origin, destination, strategies=(("sendfile", _no_copy), ("copy", _copy))) == "copy"
+    with open(destination, "rb") as f:
+        assert f.read() == file_content
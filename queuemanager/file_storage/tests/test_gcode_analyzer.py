@@ -0,0 +1,144 @@
+"""
+This module implements the G-code moves analyzer test suite and benchmarks.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from ..gcode_analyzer import GCodeAnalyzer, _parse_numbers, _parse_numbers_by_digits
+from ..layer_index import LayerIndex
+
+SYNTHETIC_FILE_SIZE = int(os.getenv("GCODE_BENCHMARK_FILE_SIZE", 64 * 1024 * 1024))
+
+
+@pytest.fixture(scope='module')
+def synthetic_file(tmp_path_factory):
+    with open("./test-file-no-header.gcode", "rb") as f:
+        body = f.read()
+    path = str(tmp_path_factory.mktemp("gcode") / "synthetic.gcode")
+
+    with open(path, "wb") as f:
+        written = 0
+        while written < SYNTHETIC_FILE_SIZE:
+            f.write(body)
+            written += len(body)
+
+    return path
+
+
+def _analyze_data(data: bytes, chunk_size: int):
+    analyzer = GCodeAnalyzer()
+    for i in range(0, len(data), chunk_size):
+        analyzer.feed(data[i:i + chunk_size])
+    return analyzer.close()
+
+
+def test_parse_numbers():
+    buffer = np.frombuffer(b"12.5 -3 .25 10 +2 0.0001 X ", dtype=np.uint8)
+    starts = np.array([0, 5, 8, 12, 15, 18, 26])
+    ends = np.array([4, 7, 11, 14, 17, 24, 26])
+    expected = [12.5, -3.0, 0.25, 10.0, 2.0, 0.0001, np.nan]
+
+    assert np.allclose(_parse_numbers(buffer, starts, ends), expected, equal_nan=True)
+    assert np.allclose(_parse_numbers_by_digits(buffer, starts, ends), expected, equal_nan=True)
+
+
+def test_gcode_analyzer():
+    with open("./test-file-no-header.gcode", "rb") as f:
+        data = f.read()
+
+    analysis = _analyze_data(data, len(data))
+
+    assert analysis.layer_count == 6
+    assert list(analysis.extruded_length.keys()) == [0]
+    assert round(analysis.extruded_length[0], 3) == 38.965
+    assert np.allclose(analysis.bounding_box_min, (92.329, 135.829, 0.3))
+    assert np.allclose(analysis.bounding_box_max, (117.671, 161.171, 1.05))
+    assert 90 < analysis.estimated_printing_time.total_seconds() < 120
+
+    # The results don't depend on the chunks size
+    for chunk_size in (1, 7, 1024):
+        chunked_analysis = _analyze_data(data, chunk_size)
+        assert chunked_analysis.layer_count == analysis.layer_count
+        assert round(chunked_analysis.extruded_length[0], 6) == round(analysis.extruded_length[0], 6)
+        assert chunked_analysis.estimated_printing_time == analysis.estimated_printing_time
+
+
+def test_gcode_analyzer_modes():
+    data = b"T1\nG92 E0\nG1 F600 X10 Y0 Z0.2 E2\nM83\nG1 X20 E1.5 ;relative extrusion\n" \
+           b"G91\nG1 Y10 E-1\nG90\nM82\nG92 E0\nT0\nG0 F1200 X0 Y0\nG1 X0 Y10 E3\n"
+
+    analysis = _analyze_data(data, len(data))
+
+    assert analysis.extruded_length == {0: 3.0, 1: 2.5}
+    assert analysis.bounding_box_min == (0.0, 0.0, 0.2)
+    assert analysis.bounding_box_max == (20.0, 10.0, 0.2)
+    assert analysis.layer_count == 1
+    assert analysis.filament_used == [(0, 0.003), (1, 0.0025)]
+
+
+def test_layer_index(tmp_path):
+    with open("./test-file.gcode", "rb") as f:
+        data = f.read()
+
+    layer_index = _analyze_data(data, len(data)).layer_index
+
+    # The layers start at the slicer layer comments
+    assert len(layer_index) == 6
+    assert layer_index.layers.tolist() == list(range(6))
+    assert all(data[offset:].startswith(";LAYER:{}".format(layer).encode())
+               for layer, offset in zip(layer_index.layers, layer_index.offsets))
+    assert layer_index.file_size == len(data)
+    assert np.all(np.diff(layer_index.records["time"]) > 0)
+
+    # The index doesn't depend on the chunks size
+    for chunk_size in (7, 1024):
+        chunked_index = _analyze_data(data, chunk_size).layer_index
+        assert chunked_index.records["offset"].tolist() == layer_index.records["offset"].tolist()
+        assert np.allclose(chunked_index.records["time"], layer_index.records["time"])
+
+    # Map the progress to the layers and the time left
+    assert layer_index.get_layer_at_offset(0) is None
+    assert layer_index.get_layer_at_offset(int(layer_index.offsets[3])) == 3
+    assert layer_index.get_progress_info(100.0) == (5, 0.0)
+    layer, seconds_left = layer_index.get_progress_info(20.0, total_time=200.0)
+    assert layer == 0
+    assert 0 < seconds_left < 200.0
+    assert layer_index.get_layer_byte_range(2) == (int(layer_index.offsets[2]), len(data))
+    assert layer_index.get_layer_byte_range(10) is None
+
+    # Save and load the index
+    path = str(tmp_path / "test-file.layers")
+    layer_index.save(path)
+    assert LayerIndex.load(path).records.tolist() == layer_index.records.tolist()
+
+    # Without the layer comments, the layers start at each new printing height
+    data = data.replace(b";LAYER:", b";")
+    layer_index = _analyze_data(data, len(data)).layer_index
+    assert layer_index.layers.tolist() == list(range(6))
+    assert all(data[offset:].startswith(b"G1 ") for offset in layer_index.offsets)
+
+
+def test_gcode_analyzer_benchmark(synthetic_file):
+    with open(synthetic_file, "rb") as f:
+        initial_time = time.time()
+        analysis = GCodeAnalyzer().analyze_file(f)
+        total_time = time.time() - initial_time
+
+    file_size = os.path.getsize(synthetic_file)
+    print("File size:", file_size, "bytes")
+    print("Total time for analyzing the moves:", total_time)
+    print("Analysis speed:", file_size / total_time / 1024 / 1024, "MB/s")
+
+    assert analysis.layer_count == 6
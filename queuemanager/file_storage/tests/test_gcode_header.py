@@ -0,0 +1,169 @@
+"""
+This module implements the G-code header reading functions test suite and benchmarks.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import json
+import os
+import time
+
+import pytest
+
+from ..gcode_header import (
+    GCodeHeaderParser, find_line_data, find_line_data_forward, find_line_data_from_tail
+)
+
+PREFIX = b";PrintInfo/"
+SUFFIX = b"/PrintInfo\n"
+SYNTHETIC_FILE_SIZE = int(os.getenv("GCODE_BENCHMARK_FILE_SIZE", 64 * 1024 * 1024))
+
+# The benchmarks write big files and only print the timings, so they are only run when asked for
+benchmark = pytest.mark.skipif(not os.getenv("GCODE_BENCHMARK"), reason="set GCODE_BENCHMARK=1 to run the benchmarks")
+
+
+def _split_test_file():
+    with open("./test-file.gcode", "rb") as f:
+        lines = f.readlines()
+    return b"".join(lines[:-1]), lines[-1]
+
+
+@pytest.fixture(scope='module')
+def synthetic_files(tmp_path_factory):
+    body, trailer = _split_test_file()
+    directory = tmp_path_factory.mktemp("gcode")
+    with_trailer = str(directory / "with-trailer.gcode")
+    without_trailer = str(directory / "without-trailer.gcode")
+
+    with open(with_trailer, "wb") as f_with, open(without_trailer, "wb") as f_without:
+        written = 0
+        while written < SYNTHETIC_FILE_SIZE:
+            f_with.write(body)
+            f_without.write(body)
+            written += len(body)
+        f_with.write(trailer)
+
+    return with_trailer, without_trailer
+
+
+def test_find_line_data():
+    body, trailer = _split_test_file()
+    expected = trailer[len(PREFIX):-len(SUFFIX)]
+
+    with open("./test-file.gcode", "rb") as f:
+        assert find_line_data_from_tail(f, PREFIX, SUFFIX) == expected
+        f.seek(0)
+        assert find_line_data_forward(f, PREFIX, SUFFIX) == expected
+        f.seek(0)
+        # Use windows smaller than the file data line to check the windows overlapping
+        assert find_line_data_from_tail(f, PREFIX, SUFFIX, chunk_size=7) == expected
+
+    json.loads(expected.decode())
+
+    with open("./test-file-no-header.gcode", "rb") as f:
+        assert find_line_data(f, PREFIX, SUFFIX) is None
+
+
+def test_find_line_data_crlf(tmp_path):
+    body, trailer = _split_test_file()
+    expected = trailer[len(PREFIX):-len(SUFFIX)]
+    path = str(tmp_path / "crlf.gcode")
+    with open(path, "wb") as f:
+        f.write((body + trailer).replace(b"\n", b"\r\n"))
+
+    with open(path, "rb") as f:
+        assert find_line_data_from_tail(f, PREFIX, SUFFIX) == expected
+        f.seek(0)
+        assert find_line_data_forward(f, PREFIX, SUFFIX) == expected
+        f.seek(0)
+        _check_test_file_header(GCodeHeaderParser().parse_file(f))
+
+    parser = GCodeHeaderParser()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(7), b""):
+            parser.feed(chunk)
+    _check_test_file_header(parser.close())
+
+
+def _check_test_file_header(header):
+    assert header.estimated_printing_time.total_seconds() == 100.0
+    assert header.filament_used == [0.0354645]
+    assert header.layer_height == 0.15
+    assert header.extruders_used == [(0, 0.6)]
+    assert header.layer_count == 6
+    assert header.file_data["print_times"]["total"] == 101
+
+
+def test_gcode_header_parser():
+    # Feed the whole file in chunks of different sizes
+    for chunk_size in (1, 7, 1024, 64 * 1024):
+        parser = GCodeHeaderParser()
+        with open("./test-file.gcode", "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                parser.feed(chunk)
+        _check_test_file_header(parser.close())
+
+    # Read only the file beginning and the file end
+    with open("./test-file.gcode", "rb") as f:
+        _check_test_file_header(GCodeHeaderParser().parse_file(f))
+        assert f.tell() < os.path.getsize("./test-file.gcode")
+
+    with open("./test-file-no-header.gcode", "rb") as f:
+        header = GCodeHeaderParser().parse_file(f)
+    assert header.estimated_printing_time.total_seconds() == 100.0
+    assert header.file_data is None
+
+
+@benchmark
+def test_find_line_data_benchmark(synthetic_files):
+    with_trailer, without_trailer = synthetic_files
+
+    with open(with_trailer, "rb") as f:
+        initial_time = time.time()
+        tail_data = find_line_data_from_tail(f, PREFIX, SUFFIX)
+        tail_time = time.time() - initial_time
+
+        f.seek(0)
+        initial_time = time.time()
+        forward_data = find_line_data_forward(f, PREFIX, SUFFIX)
+        forward_time = time.time() - initial_time
+
+    print("File size:", os.path.getsize(with_trailer), "bytes")
+    print("Total time for the tail search:", tail_time)
+    print("Total time for the forward search:", forward_time)
+
+    assert tail_data is not None
+    assert tail_data == forward_data
+
+    with open(without_trailer, "rb") as f:
+        initial_time = time.time()
+        assert find_line_data(f, PREFIX, SUFFIX) is None
+        print("Total time for the search without trailer:", time.time() - initial_time)
+
+
+@benchmark
+def test_gcode_header_parser_benchmark(synthetic_files):
+    with_trailer, _ = synthetic_files
+
+    with open(with_trailer, "rb") as f:
+        initial_time = time.time()
+        header = GCodeHeaderParser().parse_file(f)
+        print("Total time for parsing the header:", time.time() - initial_time)
+
+    assert header.file_data is not None
+
+    parser = GCodeHeaderParser()
+    with open(with_trailer, "rb") as f:
+        initial_time = time.time()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            parser.feed(chunk)
+        header = parser.close()
+        print("Total time for streaming the whole file:", time.time() - initial_time)
+
+    assert header.file_data is not None
@@ -0,0 +1,106 @@
+"""
+This module implements the file storage reconciler test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+import time
+from shutil import copyfile
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from ..file_manager import FileDescriptor
+from ..reconciler import StorageReconciler
+from ...database import DBManagerError
+
+
+def _create_old_file(path):
+    copyfile("./test-file-no-header.gcode", path)
+    old_time = time.time() - 7200
+    os.utime(path, (old_time, old_time))
+
+
+def test_storage_reconciler(app, db_manager, file_manager, tmp_path):
+    user = db_manager.get_users(id=1)
+    upload_dir = app.config['FILE_MANAGER_UPLOAD_DIR']
+    cursor_path = str(tmp_path / "cursor.json")
+    quarantine_dir = str(tmp_path / "quarantine")
+
+    # A referenced file, two orphans (one of them too recent to be touched) and a file without content
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_obj = file_manager.save_file(FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode"), user)
+    _create_old_file(os.path.join(upload_dir, "orphan"))
+    copyfile("./test-file.gcode", os.path.join(upload_dir, "recent"))
+    missing_file = db_manager.insert_file(user, "missing", os.path.join(upload_dir, "missing"))
+
+    reconciler = StorageReconciler(app, file_manager, cursor_path=cursor_path, quarantine_dir=quarantine_dir,
+                                   batch_size=1)
+
+    # Only one entry is checked in each batch and the position is saved between them
+    reconciler.reconcile_batch()
+    assert reconciler.counters["stored_files_checked"] == 1
+    assert reconciler.counters["files_checked"] == 1
+
+    reconciler = StorageReconciler(app, file_manager, cursor_path=cursor_path, quarantine_dir=quarantine_dir,
+                                   batch_size=1)
+    assert reconciler.store_cursor is not None
+    assert reconciler.files_cursor == file_obj.id
+
+    for _ in range(3):
+        reconciler.reconcile_batch()
+
+    assert reconciler.counters["store_passes"] == 1
+    assert reconciler.counters["files_passes"] == 1
+    assert reconciler.counters["orphans_quarantined"] == 1
+    assert reconciler.counters["missing_contents"] == 1
+    assert not os.path.exists(os.path.join(upload_dir, "orphan"))
+    assert os.path.exists(os.path.join(quarantine_dir, "orphan"))
+    assert os.path.exists(os.path.join(upload_dir, "recent"))
+    assert os.path.exists(file_obj.fullPath)
+
+    # The contents in the quarantine are restored if a file references them
+    db_manager.update_file(missing_file, fullPath=os.path.join(upload_dir, "orphan"))
+    reconciler = StorageReconciler(app, file_manager, quarantine_dir=quarantine_dir)
+    reconciler.reconcile_batch()
+
+    assert reconciler.counters["contents_restored"] == 1
+    assert reconciler.counters["orphans_quarantined"] == 0
+    assert os.path.exists(os.path.join(upload_dir, "orphan"))
+
+    # Without quarantine directory, the orphans are removed
+    _create_old_file(os.path.join(upload_dir, "other-orphan"))
+    reconciler = StorageReconciler(app, file_manager)
+    reconciler.reconcile_batch()
+
+    assert reconciler.counters["orphans_removed"] == 1
+    assert not os.path.exists(os.path.join(upload_dir, "other-orphan"))
+
+
+def test_storage_reconciler_rate(app, file_manager):
+    reconciler = StorageReconciler(app, file_manager, max_operations_per_second=100)
+
+    initial_time = time.time()
+    for _ in range(11):
+        reconciler._throttle()
+
+    assert time.time() - initial_time >= 0.1
+
+
+def test_storage_reconciler_database_error(app, session, file_manager, monkeypatch):
+    reconciler = StorageReconciler(app, file_manager)
+
+    def query(*_args, **_kwargs):
+        raise OperationalError("SELECT", {}, Exception("connection lost"))
+
+    # The database errors are raised as the DBManager ones, so the service keeps running
+    monkeypatch.setattr(session, "query", query)
+    with pytest.raises(DBManagerError):
+        reconciler.reconcile_files_batch()
@@ -0,0 +1,89 @@
+"""
+This module implements the storage backends test suite.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import io
+
+import pytest
+
+from ..backends import LocalStorageBackend, S3StorageBackend
+from ..exceptions import StorageObjectNotFound, FilesystemError
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage_backend(request, tmp_path):
+    if request.param == "local":
+        yield LocalStorageBackend(str(tmp_path), shard_levels=2)
+        return
+
+    boto3 = pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+
+    with moto.mock_s3():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="queuemanager-test")
+        yield S3StorageBackend("queuemanager-test", prefix="files/", client=client, multipart_chunk_size=5 * 1024 * 1024)
+
+
+def test_storage_backend(storage_backend):
+    with open("./test-file.gcode", "rb") as f:
+        file_content = f.read()
+
+    key = "a" * 64
+    assert not storage_backend.exists(key)
+
+    with open("./test-file.gcode", "rb") as f:
+        storage_backend.put_stream(key, f)
+
+    assert storage_backend.exists(key)
+    assert storage_backend.stat(key).size == len(file_content)
+
+    with storage_backend.get_stream(key) as f:
+        assert f.read() == file_content
+
+    # The ranges are read without getting the whole content
+    with storage_backend.get_range(key, 10, 110) as f:
+        assert f.read() == file_content[10:110]
+    with storage_backend.get_range(key, len(file_content) - 5, len(file_content)) as f:
+        assert f.read() == file_content[-5:]
+
+    # Replacing a content with the same key keeps only the last one
+    storage_backend.put_stream(key, io.BytesIO(b"new content"))
+    with storage_backend.get_stream(key) as f:
+        assert f.read() == b"new content"
+
+    storage_backend.delete(key)
+    assert not storage_backend.exists(key)
+    # Deleting a content that doesn't exist is allowed
+    storage_backend.delete(key)
+
+    with pytest.raises(StorageObjectNotFound):
+        storage_backend.get_stream(key)
+    with pytest.raises(StorageObjectNotFound):
+        storage_backend.stat(key)
+
+    if storage_backend.is_local:
+        assert storage_backend.get_local_path(key).endswith("/aa/aa/" + key)
+    else:
+        assert storage_backend.get_local_path(key) is None
+
+
+def test_s3_storage_backend_errors():
+    pytest.importorskip("boto3")
+    client_error = pytest.importorskip("botocore.exceptions").ClientError
+
+    class FailingClient(object):
+        def delete_object(self, **_kwargs):
+            raise client_error({"Error": {"Code": "AccessDenied"}}, "DeleteObject")
+
+    storage_backend = S3StorageBackend("queuemanager-test", client=FailingClient())
+    with pytest.raises(FilesystemError):
+        storage_backend.delete("a" * 64)
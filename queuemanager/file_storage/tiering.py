@@ -0,0 +1,102 @@
+"""
+This module implements the tiering policy that moves the files of the done jobs to the cold storage.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from .file_manager import FileManager
+from .queries import are_all_jobs_done_before, get_old_done_files_batch
+from ..database import DBManagerError
+
+
+class StorageTiering(object):
+    """
+    This class moves the files of the jobs that are done since more than 'days' days to the cold storage, in small
+    batches. A file is only moved when all the jobs that use its content are done. The files are restored to the
+    upload directory by the file manager when they're needed again.
+
+    Without a cold storage, the files stored in a remote storage backend are only removed from the upload directory.
+    The cold storage copy of a moved file is its only copy, so it's never evicted. If the cold storage is over its
+    quota and none of its copies can be evicted, no more files are moved to it and an error is logged.
+    """
+    def __init__(self, app, file_manager: FileManager = None, days: float = None, batch_size: int = None):
+        self.app = app
+        self.days = days if days is not None else app.config.get('FILE_MANAGER_COLD_STORAGE_AFTER_DAYS', 30)
+        self.batch_size = batch_size or app.config.get('FILE_MANAGER_RECONCILER_BATCH_SIZE', 100)
+        self.counters = Counter()
+        self.cursor = 0
+        self._stopped = False
+
+        # Set the FileManager object
+        if file_manager is None:
+            from . import file_mgr
+            self.file_manager = file_mgr
+        else:
+            self.file_manager = file_manager
+
+    def tier_batch(self):
+        """
+        Check the next batch of files and move the old ones to the cold storage. Returns False when the whole files
+        table was checked.
+        """
+        # Make room for the files of this batch, without removing the last copy of any content
+        evicted_files = self.file_manager.evict_cold_storage()
+        self.counters["files_evicted"] += len(evicted_files)
+        for path in evicted_files:
+            self.app.logger.warning("File '{}' evicted from the cold storage".format(path))
+
+        if self.file_manager.cold_storage is not None and self.file_manager.cold_storage.is_full():
+            self.counters["batches_refused"] += 1
+            self.app.logger.error("The cold storage is over its quota and all its files are the last copy of its "
+                                  "content. No more files will be moved to it until its quota is increased.")
+            return self.cursor != 0
+
+        limit_date = datetime.now() - timedelta(days=self.days)
+        files = get_old_done_files_batch(self.cursor, self.batch_size, limit_date)
+
+        for file in files:
+            path = self.file_manager.get_file_path(file)
+            # All the jobs of all the files with the same content must be done before the limit date
+            if not os.path.exists(path) or not are_all_jobs_done_before(file.fullPath, limit_date):
+                continue
+
+            try:
+                if self.file_manager.move_file_to_cold_storage(file):
+                    self.counters["files_moved"] += 1
+            except OSError as e:
+                self.counters["errors"] += 1
+                self.app.logger.warning("Unable to move the file '{}' to the cold storage. Details: {}".format(
+                    file, e))
+
+        if len(files) < self.batch_size:
+            self.cursor = 0
+            self.counters["passes"] += 1
+        else:
+            self.cursor = files[-1].id
+
+        return self.cursor != 0
+
+    def run(self, interval: float = 1.0):
+        while not self._stopped:
+            with self.app.app_context():
+                try:
+                    self.tier_batch()
+                except DBManagerError as e:
+                    self.app.logger.error("Unable to read the files table, retrying later. Details: {}".format(e))
+                except Exception as e:
+                    self.app.logger.exception("Unexpected error moving the files to the cold storage: {}".format(e))
+            time.sleep(interval)
+
+    def stop(self):
+        self._stopped = True
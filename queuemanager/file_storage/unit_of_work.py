@@ -0,0 +1,128 @@
+"""
+This module implements the unit of work used for saving all the job analysis results in a single transaction.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import object_session
+
+from ..database import DBManager, DBManagerError
+from ..database import (
+    File, Job, JobAllowedMaterial, JobAllowedExtruder, JobExtruder
+)
+
+
+class AnalysisUnitOfWork(object):
+    """
+    This class stages the database writes of the job analysis. Nothing is written until the unit of work is
+    flushed, then all the staged changes are applied to the objects in the session and committed at once, so the
+    SQLAlchemy flush batches the inserts of each table instead of committing every row on its own (the DBManager
+    insert methods commit each call). The staged allowed materials and extruder types replace the ones the job
+    had, so analyzing a job again doesn't duplicate them. If the commit fails, the session is rolled back.
+
+    The staged objects are loaded through the DBManager, so the rows are deleted and rolled back in its session
+    (the one the objects belong to).
+    """
+    def __init__(self):
+        self.file_fields = {}
+        self.jobs = {}
+
+    def _get_job_writes(self, job: Job):
+        if job not in self.jobs:
+            self.jobs[job] = {
+                "allowed_materials": [],
+                "allowed_extruder_types": [],
+                "extruders_needed_material": {},
+                "analyzed": False
+            }
+        return self.jobs[job]
+
+    def update_file(self, file: File, **fields):
+        self.file_fields.setdefault(file, {}).update(fields)
+
+    def add_job_allowed_materials(self, job: Job, allowed_materials: list):
+        """
+        Stage the allowed materials of the job as a list of (material id, extruder index) tuples.
+        """
+        self._get_job_writes(job)["allowed_materials"].extend(allowed_materials)
+
+    def add_job_allowed_extruder_types(self, job: Job, allowed_extruder_types: list):
+        """
+        Stage the allowed extruder types of the job as a list of (extruder type id, extruder index) tuples.
+        """
+        self._get_job_writes(job)["allowed_extruder_types"].extend(allowed_extruder_types)
+
+    def set_job_extruders_needed_material(self, job: Job, extruders_needed_material: list):
+        """
+        Stage the estimated needed material of the job extruders as a list of (needed material, extruder index)
+        tuples. The job extruder data is created if it doesn't exist yet.
+        """
+        for estimated_needed_material, index in extruders_needed_material:
+            self._get_job_writes(job)["extruders_needed_material"][index] = estimated_needed_material
+
+    def set_job_analyzed(self, job: Job):
+        self._get_job_writes(job)["analyzed"] = True
+
+    @staticmethod
+    def _replace_rows(collection, new_rows: list):
+        for row in list(collection):
+            session = object_session(row)
+            collection.remove(row)
+            if session is not None:
+                session.delete(row)
+        collection.extend(new_rows)
+
+    def _apply(self):
+        # Update the files information
+        for file, fields in self.file_fields.items():
+            for key, value in fields.items():
+                setattr(file, key, value)
+
+        for job, writes in self.jobs.items():
+            # Replace the allowed materials and extruder types of the job (without repeated rows)
+            if writes["allowed_materials"]:
+                self._replace_rows(job.allowed_materials, [
+                    JobAllowedMaterial(idMaterial=material_id, extruderIndex=index)
+                    for material_id, index in dict.fromkeys(writes["allowed_materials"])
+                ])
+            if writes["allowed_extruder_types"]:
+                self._replace_rows(job.allowed_extruder_types, [
+                    JobAllowedExtruder(idExtruderType=extruder_type_id, extruderIndex=index)
+                    for extruder_type_id, index in dict.fromkeys(writes["allowed_extruder_types"])
+                ])
+
+            # Update the job extruders data, creating the missing ones
+            job_extruders = {job_extruder.extruderIndex: job_extruder for job_extruder in job.extruders_data}
+            for index, estimated_needed_material in writes["extruders_needed_material"].items():
+                if index in job_extruders:
+                    job_extruders[index].estimatedNeededMaterial = estimated_needed_material
+                else:
+                    job.extruders_data.append(
+                        JobExtruder(extruderIndex=index, estimatedNeededMaterial=estimated_needed_material))
+
+            if writes["analyzed"]:
+                job.analyzed = True
+
+    def _get_sessions(self):
+        staged_objects = list(self.file_fields) + list(self.jobs)
+        return {session for session in map(object_session, staged_objects) if session is not None}
+
+    def flush(self, db_manager: DBManager):
+        # Save all the changes in a single transaction, or none of them
+        try:
+            self._apply()
+            db_manager.commit_changes()
+        except (DBManagerError, SQLAlchemyError):
+            for session in self._get_sessions():
+                session.rollback()
+            raise
+        finally:
+            self.file_fields = {}
+            self.jobs = {}
@@ -11,7 +11,8 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
-from .definitions import socketio, socketio_mgr, client_namespace, printer_namespace
+from .definitions import socketio, socketio_mgr, client_namespace, printer_namespace, job_changes
+from .job_changes import JobChangeTracker
 from .manager import SocketIOManager
 from .namespaces import ClientNamespace, PrinterNamespace
 
@@ -20,6 +21,9 @@ def init_app(app, *_args, external=False, **kwargs):
     socketio_mgr.set_client_namespace(client_namespace)
     socketio_mgr.set_printer_namespace(printer_namespace)
     socketio_mgr.init_app(app)
+    job_changes.init_app(app)
+    client_namespace.set_job_changes(job_changes)
+    socketio_mgr.set_job_changes(job_changes)
     client_namespace.init_app(app)
     printer_namespace.init_app(app)
     if external:
@@ -28,3 +32,4 @@ def init_app(app, *_args, external=False, **kwargs):
         socketio.on_namespace(client_namespace)
         socketio.on_namespace(printer_namespace)
         socketio.init_app(app, **kwargs)
+        socketio_mgr.start_job_progress_flush(socketio)
@@ -0,0 +1,68 @@
+"""
+This module implements the coalescing emitter of the Socket.IO events without payload.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+
+class EventCoalescer(object):
+    """
+    This class merges all the emissions of an event made within a time window in a single one, sent at the end of
+    the window. It's meant for the notification events without payload (like 'jobs_updated'), where the clients
+    only need to know that something changed since the last time.
+
+    When a Redis server is used as the Socket.IO message queue, the windows are shared between all the server
+    processes with a key that expires with the window (SET NX PX): only the process that opens the window emits the
+    event, and the others drop their emissions until it expires.
+    """
+    def __init__(self, socketio, emit_function, window: float = 0.0, message_queue: str = None, key: str = None):
+        self.socketio = socketio
+        self.emit_function = emit_function
+        self.window = window
+        self.key = key
+        self._pending = False
+        self._redis = None
+
+        if window > 0 and message_queue is not None and message_queue.startswith("redis://"):
+            import redis
+            self._redis = redis.StrictRedis.from_url(message_queue)
+
+    def _open_window(self):
+        if self._redis is None:
+            return True
+        return bool(self._redis.set(self.key, 1, nx=True, px=int(self.window * 1000)))
+
+    def _flush_after_window(self):
+        self.socketio.sleep(self.window)
+        self.flush()
+
+    def emit(self):
+        """
+        Emit the event at the end of the current window, opening a new one if there isn't any.
+        """
+        if self.window <= 0:
+            self.emit_function()
+            return
+
+        if self._pending or not self._open_window():
+            # The event will be emitted when the current window is closed (in this or in another process)
+            return
+
+        self._pending = True
+        self.socketio.start_background_task(self._flush_after_window)
+
+    def flush(self):
+        """
+        Emit the event now if there is any pending emission.
+        """
+        if not self._pending:
+            return
+
+        self._pending = False
+        self.emit_function()
@@ -15,6 +15,7 @@ from flask_socketio import SocketIO
 from .manager import SocketIOManager
 from .namespaces import ClientNamespace, PrinterNamespace
 from .auth import authorize_connection
+from .job_changes import JobChangeTracker
 
 
 ############################
@@ -23,6 +24,7 @@ from .auth import authorize_connection
 
 socketio = SocketIO()
 socketio_mgr = SocketIOManager()
+job_changes = JobChangeTracker()
 
 
 @socketio.on("connect")
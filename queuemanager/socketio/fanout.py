@@ -0,0 +1,100 @@
+"""
+This module implements the throttled fan-out of the printers telemetry to the clients.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import time
+
+# Events with the printers telemetry that the clients can subscribe to
+TELEMETRY_STREAMS = ("printer_temperatures_updated", "job_progress_updated")
+
+
+class TelemetryFanout(object):
+    """
+    This class sends the telemetry events to the clients at the maximum rate that each client subscribed to.
+
+    The subscribed rates are rounded down to the configured rates (the lowest one if it's lower than all of them),
+    and every client joins one room for each stream, named by the stream and the rate. Only the latest value of each
+    stream and printer is kept for every rate, and it's emitted to its room when the rate allows it, so the
+    superseded values are dropped instead of queued. This way the memory and the emissions only depend on the number
+    of printers and rates, and not on the number of connected clients.
+
+    The clients that didn't subscribe to a stream use the default rate, where None means every value as soon as it's
+    received. The rooms are shared between the server processes through the Socket.IO message queue, and the values
+    are throttled in the process where the printer is connected.
+    """
+    def __init__(self, socketio, emit_function):
+        self.socketio = socketio
+        self.emit_function = emit_function
+        self.rates = []
+        self.default_rate = None
+        self._pending = {}
+        self._scheduled = {}
+        self._last_flush = {}
+
+    def init_app(self, app):
+        self.rates = sorted(app.config.setdefault('SOCKETIO_TELEMETRY_RATES', [0.2, 1.0, 5.0]))
+        self.default_rate = app.config.setdefault('SOCKETIO_TELEMETRY_DEFAULT_RATE', 1.0)
+        if self.default_rate is not None:
+            self.default_rate = self.get_rate(self.default_rate)
+
+        self._pending = {rate: {} for rate in self.rates}
+        self._scheduled = {rate: False for rate in self.rates}
+        self._last_flush = {rate: 0.0 for rate in self.rates}
+
+    def get_rate(self, max_rate: float):
+        """
+        Return the configured rate used for a subscription with the given maximum rate.
+        """
+        usable_rates = [rate for rate in self.rates if rate <= max_rate]
+        return usable_rates[-1] if usable_rates else self.rates[0]
+
+    @staticmethod
+    def get_room(stream: str, rate: float = None):
+        return "telemetry:{}:{}".format(stream, "max" if rate is None else rate)
+
+    def get_rooms(self, stream: str):
+        return [self.get_room(stream, rate) for rate in [None] + self.rates]
+
+    def publish(self, stream: str, printer_id: int, data: dict):
+        """
+        Emit the new value of the stream to the clients without throttling (only the default rate can be None), and
+        save it as the latest value of the printer for the rest of the rates.
+        """
+        if self.default_rate is None:
+            self.emit_function(stream, data, self.get_room(stream))
+
+        for rate in self.rates:
+            self._pending[rate][(stream, printer_id)] = data
+            self._schedule(rate)
+
+    def _schedule(self, rate: float):
+        if self._scheduled[rate]:
+            # The latest value will be sent by the flush already scheduled
+            return
+
+        self._scheduled[rate] = True
+        delay = self._last_flush[rate] + 1.0 / rate - time.monotonic()
+        self.socketio.start_background_task(self._flush_after_delay, rate, max(delay, 0.0))
+
+    def _flush_after_delay(self, rate: float, delay: float):
+        self.socketio.sleep(delay)
+        self.flush(rate)
+
+    def flush(self, rate: float):
+        """
+        Emit the latest value of every stream and printer to the clients subscribed at this rate.
+        """
+        pending, self._pending[rate] = self._pending[rate], {}
+        self._scheduled[rate] = False
+        self._last_flush[rate] = time.monotonic()
+
+        for (stream, _printer_id), data in pending.items():
+            self.emit_function(stream, data, self.get_room(stream, rate))
@@ -0,0 +1,247 @@
+"""
+This module implements the tracker of the changes made to the jobs.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import File, Job, Printer
+
+# Key of the session info where the changes of the current transaction are kept
+_SESSION_INFO_KEY = "job_changes"
+
+# Give the next revision to the changed jobs (ARGV[1] is the number of changed jobs, followed by the changed and the
+# removed job IDs), so the other processes never see a revision without its changes
+_RECORD_CHANGES_SCRIPT = """
+local revision = redis.call('INCR', KEYS[1])
+local upserted_count = tonumber(ARGV[1])
+for i = 2, #ARGV do
+    if i <= upserted_count + 1 then
+        redis.call('ZADD', KEYS[2], revision, ARGV[i])
+        redis.call('ZREM', KEYS[3], ARGV[i])
+    else
+        redis.call('ZADD', KEYS[3], revision, ARGV[i])
+        redis.call('ZREM', KEYS[2], ARGV[i])
+    end
+end
+return revision
+"""
+
+# Give the next revision to a change that isn't known job by job, so the changes log starts again from it
+_RESET_HISTORY_SCRIPT = """
+local revision = redis.call('INCR', KEYS[1])
+redis.call('SET', KEYS[2], revision)
+return revision
+"""
+
+
+class JobChangeTracker(object):
+    """
+    This class collects the jobs inserted, updated and deleted by every database transaction (listening the flushes
+    of the session) and gives a new revision number to each committed transaction. The changes of the files and the
+    printers are tracked as changes of its jobs, because the jobs are serialized with them.
+
+    The last revision where each job was changed or removed is kept, so the clients can ask for the changes made
+    since the last revision they know. The bulk updates and deletes of the jobs (which don't load the changed rows)
+    reset the changes log instead, so everybody loads all the jobs again. When a message queue is configured, the revisions and the changes log are
+    shared between all the server processes through the same Redis server used by Socket.IO.
+    """
+    def __init__(self, app=None):
+        self.app = None
+        self.revision = 0
+        self.history_start = 0
+        self.history_size = None
+        self._upserted_revisions = {}
+        self._removed_revisions = {}
+        self._pending_upserted = set()
+        self._pending_removed = set()
+        self._pending_previous_revision = None
+        self._redis = None
+        self._record_changes_script = None
+        self._reset_history_script = None
+        self._key = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._key = app.config.setdefault('JOB_CHANGES_KEY', 'queuemanager:job_changes')
+        self.history_size = app.config.setdefault('JOB_CHANGES_HISTORY_SIZE', 10000)
+
+        message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+        if message_queue is not None and message_queue.startswith("redis://"):
+            import redis
+            self._redis = redis.StrictRedis.from_url(message_queue)
+            self._record_changes_script = self._redis.register_script(_RECORD_CHANGES_SCRIPT)
+            self._reset_history_script = self._redis.register_script(_RESET_HISTORY_SCRIPT)
+
+        # Listen all the sessions, the scoped session can be replaced (like the tests do)
+        if not event.contains(Session, "after_flush", self._after_flush):
+            event.listen(Session, "after_flush", self._after_flush)
+            event.listen(Session, "after_commit", self._after_commit)
+            event.listen(Session, "after_rollback", self._after_rollback)
+            event.listen(Session, "after_bulk_update", self._after_bulk_change)
+            event.listen(Session, "after_bulk_delete", self._after_bulk_change)
+
+    @staticmethod
+    def _get_session_changes(session):
+        return session.info.setdefault(_SESSION_INFO_KEY, (set(), set()))
+
+    @staticmethod
+    def _after_bulk_change(bulk_context):
+        entities = [description["entity"] for description in bulk_context.query.column_descriptions]
+        if Job in entities:
+            bulk_context.session.info[_SESSION_INFO_KEY + ":reset"] = True
+
+    def _after_flush(self, session, _flush_context):
+        upserted, removed = self._get_session_changes(session)
+
+        for obj in session.new | session.dirty:
+            if isinstance(obj, Job):
+                upserted.add(obj.id)
+            elif isinstance(obj, File):
+                upserted.update(job.id for job in obj.jobs)
+            elif isinstance(obj, Printer) and obj.idCurrentJob is not None:
+                upserted.add(obj.idCurrentJob)
+
+        for obj in session.deleted:
+            if isinstance(obj, Job):
+                removed.add(obj.id)
+
+    def _after_commit(self, session):
+        upserted, removed = session.info.pop(_SESSION_INFO_KEY, (set(), set()))
+        upserted -= removed
+        if upserted or removed:
+            self.record_changes(upserted, removed)
+        if session.info.pop(_SESSION_INFO_KEY + ":reset", False):
+            self.reset_history()
+
+    @staticmethod
+    def _after_rollback(session):
+        session.info.pop(_SESSION_INFO_KEY, None)
+        session.info.pop(_SESSION_INFO_KEY + ":reset", None)
+
+    def record_changes(self, upserted: set, removed: set):
+        """
+        Save the changes of a committed transaction with a new revision number and return it.
+        """
+        if self._redis is None:
+            self.revision += 1
+            revision = self.revision
+            for job_id in upserted:
+                self._upserted_revisions[job_id] = revision
+                self._removed_revisions.pop(job_id, None)
+            for job_id in removed:
+                self._removed_revisions[job_id] = revision
+                self._upserted_revisions.pop(job_id, None)
+            self._trim_history()
+        else:
+            revision = self._record_changes_script(
+                keys=[self._key + ":revision", self._key + ":upserted", self._key + ":removed"],
+                args=[len(upserted)] + list(upserted) + list(removed))
+            # The revisions between the last one of this process and this one were given to other processes
+            if revision != self.revision + 1:
+                self._pending_previous_revision = None
+            self.revision = revision
+            self._trim_shared_history()
+
+        if self._pending_previous_revision is None:
+            self._pending_previous_revision = revision - 1
+        self._pending_upserted.update(upserted)
+        self._pending_upserted.difference_update(removed)
+        self._pending_removed.difference_update(upserted)
+        self._pending_removed.update(removed)
+
+        return revision
+
+    def reset_history(self):
+        """
+        Give a new revision to a change of the jobs that isn't known job by job (like a reorder of the queue that
+        shifts the priority of many jobs at once). The changes made before it are forgotten, so the processes and
+        the clients that ask for them get all the jobs again. Returns the new revision.
+        """
+        if self._redis is None:
+            self.revision += 1
+            revision = self.history_start = self.revision
+            self._upserted_revisions.clear()
+            self._removed_revisions.clear()
+        else:
+            revision = self._reset_history_script(keys=[self._key + ":revision", self._key + ":history_start"])
+            self.revision = revision
+
+        # The clients that knew the previous revision have to catch up too
+        self._pending_previous_revision = revision
+        return revision
+
+    def _trim_history(self):
+        # Forget the oldest removed jobs, the clients that knew them have to fetch the whole list again
+        if self.history_size is None or len(self._removed_revisions) <= self.history_size:
+            return
+
+        removed_jobs = sorted(self._removed_revisions.items(), key=lambda item: item[1])
+        for job_id, revision in removed_jobs[:len(removed_jobs) - self.history_size]:
+            del self._removed_revisions[job_id]
+            self.history_start = max(self.history_start, revision)
+
+    def _trim_shared_history(self):
+        if self.history_size is None:
+            return
+
+        excess = self._redis.zcard(self._key + ":removed") - self.history_size
+        if excess <= 0:
+            return
+
+        trimmed = self._redis.zrange(self._key + ":removed", 0, excess - 1, withscores=True)
+        self._redis.zremrangebyrank(self._key + ":removed", 0, excess - 1)
+        history_start = int(trimmed[-1][1])
+        if history_start > int(self._redis.get(self._key + ":history_start") or 0):
+            self._redis.set(self._key + ":history_start", history_start)
+
+    def get_revision(self):
+        if self._redis is None:
+            return self.revision
+        return int(self._redis.get(self._key + ":revision") or 0)
+
+    def get_changes_since(self, revision: int):
+        """
+        Return the current revision and the IDs of the jobs changed and removed after the given revision. If the
+        changes log doesn't go back to that revision, None is returned instead of the IDs.
+        """
+        if self._redis is None:
+            current_revision, history_start = self.revision, self.history_start
+            upserted = [job_id for job_id, job_revision in self._upserted_revisions.items() if job_revision > revision]
+            removed = [job_id for job_id, job_revision in self._removed_revisions.items() if job_revision > revision]
+        else:
+            current_revision = self.get_revision()
+            history_start = int(self._redis.get(self._key + ":history_start") or 0)
+            upserted = [int(job_id) for job_id in
+                        self._redis.zrangebyscore(self._key + ":upserted", "({}".format(revision), "+inf")]
+            removed = [int(job_id) for job_id in
+                       self._redis.zrangebyscore(self._key + ":removed", "({}".format(revision), "+inf")]
+
+        if revision < history_start:
+            return current_revision, None, None
+
+        return current_revision, sorted(upserted), sorted(removed)
+
+    def pop_pending_changes(self):
+        """
+        Return the IDs of the jobs changed and removed by this process since the last call, the last revision and the
+        previous revision. All the changes made after the previous revision (and up to the last one) are included,
+        although the pending changes can start before it when another process made changes in between. The previous
+        revision is None if there aren't any pending changes.
+        """
+        upserted, removed = self._pending_upserted, self._pending_removed
+        previous_revision = self._pending_previous_revision
+        self._pending_upserted, self._pending_removed = set(), set()
+        self._pending_previous_revision = None
+        return previous_revision, self.revision, sorted(upserted), sorted(removed)
@@ -10,7 +10,19 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
-from ...database import DBManager, Job, Printer
+import atexit
+import os
+import signal
+import threading
+from datetime import timedelta
+
+from flask import has_app_context
+
+from ..prefetch_hints import PrefetchHints
+from ..progress_buffer import JobProgressBuffer
+from ..scheduler import JobScheduler, make_capability, make_requirement
+from ..telemetry import TemperatureTelemetry
+from ...database import DBManager, DBManagerError, Job, Printer
 from ...file_storage import FileManager
 
 
@@ -22,7 +34,17 @@ class SocketIOManagerBase(object):
     def __init__(self, db_manager: DBManager = None, file_manager: FileManager = None):
         self.client_namespace = None
         self.printer_namespace = None
+        self.analysis_queue = None
         self.app = None
+        self.prefetch_time_left = None
+        self.progress_flush_interval = None
+        self.prefetch_hints = PrefetchHints()
+        self.progress_buffer = JobProgressBuffer()
+        self.temperatures = TemperatureTelemetry()
+        self.job_changes = None
+        self.scheduler = JobScheduler()
+        self._scheduler_revision = None
+        self._job_requirements = {}
 
         # Set the DBManager object
         if db_manager is None:
@@ -40,6 +62,13 @@ class SocketIOManagerBase(object):
 
     def init_app(self, app):
         self.app = app
+        self.prefetch_time_left = timedelta(seconds=app.config.setdefault('SOCKETIO_PREFETCH_TIME_LEFT', 600))
+        self.progress_flush_interval = app.config.setdefault('SOCKETIO_PROGRESS_FLUSH_INTERVAL', 30)
+        self.prefetch_hints.init_app(app)
+        self.progress_buffer.init_app(app)
+        self.temperatures.init_app(app)
+        # Save the buffered job progress updates when the server is stopped
+        atexit.register(self.flush_job_progress)
 
     def set_client_namespace(self, client_namespace):
         self.client_namespace = client_namespace
@@ -49,28 +78,279 @@ class SocketIOManagerBase(object):
 
     def set_db_manager(self, db_manager):
         self.db_manager = db_manager
+        self._scheduler_revision = None
 
-    def assign_job_to_printer(self, job: Job, printer: Printer = None, send_after_assign: bool = True):
-        if printer is None:
-            # Get the printers that can print this job
-            usable_printers = self.db_manager.check_can_be_printed_job(job, return_usable_printers=True)
+    def set_job_changes(self, job_changes):
+        self.job_changes = job_changes
 
-            # If there is no usable printer for this job, return
-            if not usable_printers:
-                return
+    @staticmethod
+    def _get_printer_capability(printer: Printer):
+        return make_capability(
+            (extruder.index, extruder.material.id if extruder.material is not None else None,
+             extruder.type.id if extruder.type is not None else None)
+            for extruder in printer.extruders
+        )
+
+    def _get_job_requirement(self, job: Job):
+        requirement = self._job_requirements.get(job.id)
+        if requirement is None:
+            requirement = self._job_requirements[job.id] = make_requirement(
+                [(allowed_material.idMaterial, allowed_material.extruderIndex)
+                 for allowed_material in job.allowed_materials],
+                [(allowed_extruder_type.idExtruderType, allowed_extruder_type.extruderIndex)
+                 for allowed_extruder_type in job.allowed_extruder_types])
+        return requirement
+
+    def _is_printer_free(self, printer: Printer):
+        return printer.idCurrentJob is None and printer.idState == self.db_manager.printer_state_ids["Ready"]
+
+    def update_scheduler_printer(self, printer: Printer):
+        """
+        Index the printer in the scheduler if it's ready to print a new job (or remove it otherwise).
+        """
+        if self._is_printer_free(printer):
+            self.scheduler.set_printer(printer.id, self._get_printer_capability(printer), ready=True)
+        else:
+            self.scheduler.remove_printer(printer.id)
+
+    def _is_job_schedulable(self, job: Job):
+        return job.idState == self.db_manager.job_state_ids["Waiting"] and job.canBePrinted and \
+            job.assigned_printer is None
+
+    @staticmethod
+    def _get_job_rank(job: Job):
+        # The queue is sorted by descending priority (a job requeued with the max priority gets the highest one), as
+        # the DBManager does when the jobs are ordered by priority
+        return -job.priority_i
+
+    def _reload_scheduler(self):
+        self._job_requirements = {}
+
+        printers = self.db_manager.get_printers()
+        assigned_job_ids = {printer.idCurrentJob for printer in printers if printer.idCurrentJob is not None}
+        waiting_jobs = self.db_manager.get_jobs(True, idState=self.db_manager.job_state_ids["Waiting"],
+                                                canBePrinted=True)
+
+        self.scheduler = JobScheduler()
+        for job in waiting_jobs:
+            if job.id not in assigned_job_ids:
+                self.scheduler.add_job(job.id, self._get_job_requirement(job), self._get_job_rank(job))
+        for printer in printers:
+            self.update_scheduler_printer(printer)
+
+    def _update_scheduler_jobs(self, upserted: list, removed: list):
+        for job_id in removed:
+            self._job_requirements.pop(job_id, None)
+            self.scheduler.remove_job(job_id)
+
+        for job_id in upserted:
+            self._job_requirements.pop(job_id, None)
+            job = self.db_manager.get_jobs(id=job_id)
+            if job is not None and self._is_job_schedulable(job):
+                self.scheduler.add_job(job.id, self._get_job_requirement(job), self._get_job_rank(job))
+            else:
+                self.scheduler.remove_job(job_id)
+            # The printers that got or finished a job are changed with it
+            if job is not None and job.assigned_printer is not None:
+                self.update_scheduler_printer(job.assigned_printer)
+
+    def sync_scheduler(self):
+        """
+        Update the queue and the ready printers of the scheduler if any job changed since the last time (in this or
+        in another process). Only the changed jobs are read again, the whole queue is only loaded the first time and
+        when the changes log doesn't go back to the last revision seen (it's reset when the queue is reordered, see
+        :meth:`JobChangeTracker.reset_history`).
+
+        The printers that got ready in other processes are found when looking for a printer (see
+        :meth:`_find_printer_for_job`).
+        """
+        revision = self.job_changes.get_revision() if self.job_changes is not None else None
+        if revision is not None and revision == self._scheduler_revision:
+            return
+
+        if revision is not None and self._scheduler_revision is not None:
+            revision, upserted, removed = self.job_changes.get_changes_since(self._scheduler_revision)
+        else:
+            upserted = removed = None
+
+        if upserted is None:
+            self._reload_scheduler()
+        else:
+            self._update_scheduler_jobs(upserted, removed)
+
+        self._scheduler_revision = revision
+
+    def get_next_job_of_printer(self, printer: Printer):
+        """
+        Return the highest priority job in the queue that the printer can print (or None).
+        """
+        self.sync_scheduler()
+        job_id = self.scheduler.find_job(self._get_printer_capability(printer))
+        return self.db_manager.get_jobs(id=job_id) if job_id is not None else None
+
+    def _find_printer_for_job(self, job: Job):
+        self.sync_scheduler()
+        requirement = self._get_job_requirement(job)
+
+        # The printers state can be changed by other processes, so the indexed printer is checked before using it
+        printer_id = self.scheduler.find_printer(requirement)
+        while printer_id is not None:
+            printer = self.db_manager.get_printers(id=printer_id)
+            if printer is not None and self._is_printer_free(printer):
+                return printer
+            self.scheduler.remove_printer(printer_id)
+            printer_id = self.scheduler.find_printer(requirement)
 
-            # Take the first usable printer and assign it to the job
-            printer = None
-            for usable_printer in usable_printers:
-                if usable_printer.idCurrentJob is None and usable_printer.state.stateString == "Ready":
-                    printer = usable_printer
-                    break
+        # Look for the printers that got ready in other processes
+        for usable_printer in self.db_manager.check_can_be_printed_job(job, return_usable_printers=True) or []:
+            self.update_scheduler_printer(usable_printer)
+            if self._is_printer_free(usable_printer):
+                return usable_printer
 
-            # Check that there is at least one usable printer without an assigned print
+        return None
+
+    def assign_job_to_printer(self, job: Job, printer: Printer = None, send_after_assign: bool = True):
+        if printer is None:
+            # Get a ready printer that can print this job
+            printer = self._find_printer_for_job(job)
             if printer is None:
                 return
 
+            # A higher priority job could be waiting for the same printer
+            job = self.get_next_job_of_printer(printer) or job
+
         self.db_manager.assign_job_to_printer(printer, job)
+        self.scheduler.remove_job(job.id)
+        self.scheduler.remove_printer(printer.id)
 
         if send_after_assign:
             self.printer_namespace.emit_print_job(job, printer.sid)
+
+            # The 'print_job' event confirms the prefetch hint, so it's only cancelled if it was for another job
+            hinted_job_id = self.prefetch_hints.pop(printer.id)
+            if hinted_job_id is not None and hinted_job_id != job.id:
+                self.printer_namespace.emit_prefetch_job_cancelled(hinted_job_id, printer.sid)
+
+    def dispatch_job(self, job: Job):
+        """
+        Send a job that was just queued to a ready printer that can print it (the jobs before it are waiting for
+        other printers), and check the prefetch hints of the printers with the new queue.
+        """
+        self.assign_job_to_printer(job)
+
+        # The hints are only an optimization, so the job is queued anyway if they can't be updated
+        try:
+            self.update_prefetch_hints()
+        except DBManagerError as e:
+            self.app.logger.error("Unable to update the prefetch hints of the printers. Details: " + str(e))
+
+    def save_job_progress(self, job: Job, forget: bool = False):
+        """
+        Save the buffered progress of the job in the database (if it wasn't saved yet). If 'forget' is set, the job
+        is removed from the buffer, what is done before changing its state.
+        """
+        job_progress = self.progress_buffer.pop(job.id) if forget else self.progress_buffer.get(job.id)
+        if job_progress is None or not job_progress.dirty:
+            return
+
+        self.db_manager.update_job(job, progress=job_progress.progress,
+                                   estimatedTimeLeft=job_progress.estimated_time_left)
+        if not forget:
+            self.progress_buffer.mark_persisted(job.id)
+
+    def flush_job_progress(self):
+        """
+        Save all the buffered job progress updates in the database.
+        """
+        if self.app is None:
+            return
+
+        if not has_app_context():
+            with self.app.app_context():
+                return self.flush_job_progress()
+
+        for job_id in self.progress_buffer.get_dirty_job_ids():
+            try:
+                job = self.db_manager.get_jobs(id=job_id)
+                if job is not None:
+                    self.save_job_progress(job)
+            except DBManagerError as e:
+                self.app.logger.error("Unable to save the progress of the job with id={}. Details: {}".format(
+                    job_id, e))
+
+    def _flush_job_progress_periodically(self, socketio):
+        while True:
+            socketio.sleep(self.progress_flush_interval)
+            try:
+                self.flush_job_progress()
+            except Exception as e:
+                self.app.logger.exception("Unexpected error saving the buffered job progress: {}".format(e))
+
+    def _on_terminate(self, previous_handler, signum, frame):
+        self.flush_job_progress()
+
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        elif previous_handler != signal.SIG_IGN:
+            # Terminate the process as if the signal wasn't handled
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    def start_job_progress_flush(self, socketio):
+        """
+        Save the buffered job progress updates in the database every 'SOCKETIO_PROGRESS_FLUSH_INTERVAL' seconds (if
+        it's set) and when the process receives a SIGTERM signal (before calling the previous handler). It's only
+        needed in the process where the printers are connected.
+        """
+        if self.progress_flush_interval:
+            socketio.start_background_task(self._flush_job_progress_periodically, socketio)
+
+        # The signal handlers can only be set from the main thread
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.getsignal(signal.SIGTERM)
+            signal.signal(signal.SIGTERM, lambda signum, frame: self._on_terminate(previous_handler, signum, frame))
+
+    def _get_prefetch_job_of_printer(self, printer: Printer):
+        # Only the printers that are going to finish its current print soon get the next job in advance
+        current_job = printer.current_job
+        if printer.sid is None or printer.state.stateString != "Printing" or current_job is None:
+            return None
+
+        # The last progress received may not be saved in the database yet
+        job_progress = self.progress_buffer.get(current_job.id)
+        estimated_time_left = job_progress.estimated_time_left if job_progress is not None else \
+            current_job.estimatedTimeLeft
+        if estimated_time_left is None or estimated_time_left > self.prefetch_time_left:
+            return None
+
+        # The same job that will be sent to the printer when it's ready again
+        return self.get_next_job_of_printer(printer)
+
+    def update_prefetch_hint(self, printer: Printer):
+        """
+        Tell the printer which job it will most likely print next, so it can download its file while it's printing.
+        If the previous hint isn't valid anymore (the queue changed), it's cancelled first.
+        """
+        next_job = self._get_prefetch_job_of_printer(printer)
+        next_job_id = next_job.id if next_job is not None else None
+        hinted_job_id = self.prefetch_hints.get(printer.id)
+
+        # The hint can be changed by another process at the same time, only the one that changes it emits the events
+        if next_job_id == hinted_job_id or not self.prefetch_hints.replace(printer.id, hinted_job_id, next_job_id):
+            return
+
+        if hinted_job_id is not None:
+            self.printer_namespace.emit_prefetch_job_cancelled(hinted_job_id, printer.sid)
+            self.app.logger.info("Prefetch of the job with id={} cancelled for the printer '{}'".format(
+                hinted_job_id, printer))
+
+        if next_job is not None:
+            self.printer_namespace.emit_prefetch_job(next_job, printer.sid)
+            self.app.logger.info("Prefetch of the job '{}' sent to the printer '{}'".format(next_job, printer))
+
+    def update_prefetch_hints(self):
+        """
+        Check the prefetch hints of all the printers after the queue is changed.
+        """
+        for printer in self.db_manager.get_printers():
+            self.update_prefetch_hint(printer)
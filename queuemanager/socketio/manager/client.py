@@ -11,6 +11,7 @@ __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
 from .base_class import SocketIOManagerBase
+from ...analysis.queues import create_analysis_queue
 from ...database import Job, DBManagerError
 from ...file_storage.exceptions import (
     MissingFileDataKeys, InvalidFileData
@@ -21,37 +22,44 @@ class ClientNamespaceManager(SocketIOManagerBase):
     """
     This class defines the client namespace and the events that the server will be listening for.
     """
-    def analyze_job(self, job_id: int):
+    def init_app(self, app):
+        super().init_app(app)
+        # Without an analysis queue, the jobs are analyzed inline
+        self.analysis_queue = create_analysis_queue(app.config.get('ANALYSIS_QUEUE'),
+                                                    app.config.get('ANALYSIS_QUEUE_KEY', 'queuemanager:analysis'))
+
+    def analyze_job(self, job_id: int, room: str = None):
+        if self.analysis_queue is not None:
+            # Let the analysis workers analyze the job
+            self.analysis_queue.put(job_id, room)
+        else:
+            self.run_job_analysis(job_id, room)
+
+    def run_job_analysis(self, job_id: int, room: str = None):
         try:
             job = self.db_manager.get_jobs(id=job_id)
         except DBManagerError as e:
-            self.client_namespace.emit_job_analyze_error(Job(id=job_id), str(e))
+            self.client_namespace.emit_job_analyze_error(Job(id=job_id), str(e), room=room)
             return
 
         if job is None:
             self.client_namespace.emit_job_analyze_error(
-                Job(id=job_id), "There is no job with this ID in the socketio_printer")
+                Job(id=job_id), "There is no job with this ID in the socketio_printer", room=room)
             return
 
         try:
-            # Retrieve the file data if needed
-            if not job.file.fileData:
-                self.file_manager.retrieve_file_data(job.file)
-            # Update the file information from the file data
-            self.file_manager.set_file_information_from_file_data(job.file)
-            # Get the job allowed configuration from the file data
-            self.file_manager.set_job_allowed_config_from_file_data(job)
-            # Get the job estimated needed material per extruder from the file data
-            self.file_manager.set_job_estimated_needed_material_from_file_data(job)
+            # Analyze the job from the file data (or take the result of an identical file analyzed before). With an
+            # analysis queue this runs in the analysis workers, so the layer index can be built from the file moves.
+            self.file_manager.analyze_job(job, build_layer_index=self.analysis_queue is not None)
         except (MissingFileDataKeys, InvalidFileData) as e:
-            self.client_namespace.emit_job_analyze_error(job, str(e))
+            self.client_namespace.emit_job_analyze_error(job, str(e), room=room)
             return
         except DBManagerError:
             self.client_namespace.emit_job_analyze_error(
-                job, "Can't save the retrieved file header at the socketio_printer")
+                job, "Can't save the retrieved file header at the socketio_printer", room=room)
             return
 
-        self.client_namespace.emit_job_analyze_done(job)
+        self.client_namespace.emit_job_analyze_done(job, room=room)
         self.client_namespace.emit_jobs_updated(broadcast=True)
 
     def enqueue_job(self, job_id: int):
@@ -76,14 +84,6 @@ class ClientNamespaceManager(SocketIOManagerBase):
         self.client_namespace.emit_jobs_updated(broadcast=True)
 
         try:
-            jobs_in_queue = self.db_manager.count_jobs_in_queue(only_can_be_printed=True)
+            self.dispatch_job(job)
         except DBManagerError as e:
-            self.client_namespace.emit_job_enqueue_error(None, str(e))
-            return
-
-        if jobs_in_queue == 1:
-            try:
-                self.assign_job_to_printer(job)
-            except DBManagerError as e:
-                self.client_namespace.emit_job_enqueue_error(job, str(e))
-                return
+            self.client_namespace.emit_job_enqueue_error(job, str(e))
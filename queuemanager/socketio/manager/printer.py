@@ -24,8 +24,8 @@ class PrinterNamespaceManager(SocketIOManagerBase):
         if printer.current_job:
             return
 
-        # Check if there is any job in the queue and send it to the printer
-        job = self.db_manager.get_first_job_in_queue()
+        # Send the highest priority job of the queue that this printer can print (if any)
+        job = self.get_next_job_of_printer(printer)
 
         if job is not None:
             self.assign_job_to_printer(job, printer)
@@ -33,6 +33,7 @@ class PrinterNamespaceManager(SocketIOManagerBase):
     def _update_printer_state(self, printer, new_state_str):
         # Update the printer state in the socketio_printer
         self.db_manager.update_printer(printer, idState=self.db_manager.printer_state_ids[new_state_str])
+        self.update_scheduler_printer(printer)
         self.app.logger.info("Printer state changed. New state: {}".format(new_state_str))
 
     def _update_printer_extruders(self, printer, extruders_info):
@@ -42,15 +43,26 @@ class PrinterNamespaceManager(SocketIOManagerBase):
             # Get the extruder object from the socketio_printer
             extruder_obj = self.db_manager.get_printer_extruders(printer=printer, index=extruder["index"])[0]
 
+            # The catalog index gives the ids, so the objects are only loaded when the extruder changes
             if "material" in extruder.keys():
-                values_to_update["material"] = extruder["material"]
+                material = extruder["material"]
+                if material is None:
+                    values_to_update["material"] = None
+                elif extruder_obj.material is None or extruder_obj.material.id != material.id:
+                    values_to_update["material"] = self.db_manager.get_printer_materials(id=material.id)
             if "extruder_type" in extruder.keys():
-                values_to_update["type"] = extruder["extruder_type"]
+                extruder_type = extruder["extruder_type"]
+                if extruder_type is None:
+                    values_to_update["type"] = None
+                elif extruder_obj.type is None or extruder_obj.type.id != extruder_type.id:
+                    values_to_update["type"] = self.db_manager.get_printer_extruder_types(id=extruder_type.id)
 
             # Update the extruder data
             self.db_manager.update_printer_extruder(extruder_obj, **values_to_update)
             self.app.logger.info("Printer extruder information changed. New information: {}".format(extruder_obj))
 
+        self.update_scheduler_printer(printer)
+
     def _repair_printing_jobs(self, printer, new_state_str):
         job = printer.current_job
 
@@ -59,10 +71,11 @@ class PrinterNamespaceManager(SocketIOManagerBase):
         elif new_state_str == "Print finished" and job.state.stateString == "Finished":
             return
         elif job.state.stateString == "Printing" and new_state_str != "Printing":
+            self.save_job_progress(job, forget=True)
             self.db_manager.set_finished_job(job)
             if new_state_str != "Print finished":
                 self.db_manager.update_job(job, interrupted=True)
-            self.client_namespace.emit_job_progress_updated(job, broadcast=True)
+            self.client_namespace.emit_job_progress_updated(job, broadcast=True, printer_id=printer.id)
             self.client_namespace.emit_jobs_updated(broadcast=True)
 
         if new_state_str != "Print finished" and job.state.stateString == "Finished":
@@ -83,6 +96,10 @@ class PrinterNamespaceManager(SocketIOManagerBase):
         # Get the printer object
         printer = self.db_manager.get_printers(id=session["identity"]["id"])
 
+        # Save the buffered progress of the current job before the connection is lost
+        if printer.current_job is not None:
+            self.save_job_progress(printer.current_job)
+
         # Change the printer state to offline
         if printer.sid == sid:
             self.printer_state_updated("Offline")
@@ -150,6 +167,7 @@ class PrinterNamespaceManager(SocketIOManagerBase):
         job_obj = self.db_manager.get_jobs(id=job_id)
 
         # Update the job state from 'Waiting' to 'Printing'
+        self.progress_buffer.pop(job_obj.id)
         self.db_manager.set_printing_job(job_obj)
         self.app.logger.info("Job '{}' state changed to 'Printing'".format(job_obj))
 
@@ -159,14 +177,16 @@ class PrinterNamespaceManager(SocketIOManagerBase):
         # Get the job object from the socketio_printer
         job_obj = self.db_manager.get_jobs(id=job_id)
 
-        # Update the job state from 'Waiting' to 'Printing'
+        # Update the job state from 'Printing' to 'Finished'
+        self.save_job_progress(job_obj, forget=True)
         self.db_manager.set_finished_job(job_obj)
         self.app.logger.info("Job '{}' state changed to 'Finished'".format(job_obj))
 
         if cancelled:
             self.db_manager.update_job(job_obj, interrupted=True)
 
-        self.client_namespace.emit_job_progress_updated(job_obj, broadcast=True)
+        self.client_namespace.emit_job_progress_updated(job_obj, broadcast=True,
+                                                        printer_id=session["identity"]["id"])
         self.client_namespace.emit_jobs_updated(broadcast=True)
 
     def print_feedback(self, job_id, feedback_data):
@@ -198,15 +218,41 @@ class PrinterNamespaceManager(SocketIOManagerBase):
 
         self.app.logger.debug(info_str)
 
-        self.client_namespace.emit_printer_temperatures_updated(bed_temp, extruders_temp, broadcast=True)
+        # The temperatures are only kept in memory, see :class:`TemperatureTelemetry`
+        self.temperatures.add_sample(session["identity"]["id"], bed_temp, extruders_temp)
+
+        self.client_namespace.emit_printer_temperatures_updated(bed_temp, extruders_temp, broadcast=True,
+                                                                printer_id=session["identity"]["id"])
 
     def job_progress_updated(self, id, progress, estimated_time_left, **_kwargs):
         # Get the job object from the socketio_printer
         job_obj = self.db_manager.get_jobs(id=id)
 
-        self.app.logger.debug("New printing job (id={}) progress update -> progress: {}% / estimated_time_left: {}".
-                              format(str(id), str(progress), str(estimated_time_left)))
-
-        self.db_manager.update_job(job_obj, progress=progress, estimatedTimeLeft=estimated_time_left)
-
-        self.client_namespace.emit_job_progress_updated(job_obj, broadcast=True)
+        # Map the progress to the printing layer and its own estimation of the time left (if the file has a layer
+        # index). The time left reported by the printer is kept as it is.
+        layer, layer_time_left = self.file_manager.get_job_progress_info(job_obj, progress)
+
+        self.app.logger.debug("New printing job (id={}) progress update -> progress: {}% / layer: {} / "
+                              "estimated_time_left: {}".format(str(id), str(progress), str(layer),
+                                                               str(estimated_time_left)))
+
+        # The progress is kept in memory and only saved from time to time (or when it changes a lot)
+        if self.progress_buffer.update(job_obj.id, progress, estimated_time_left):
+            self.db_manager.update_job(job_obj, progress=progress, estimatedTimeLeft=estimated_time_left)
+            self.progress_buffer.mark_persisted(job_obj.id)
+
+        # Send the last progress without changing the job object, so it isn't written in the database
+        job_progress = {
+            "id": job_obj.id,
+            "name": job_obj.name,
+            "file": job_obj.file,
+            "progress": progress,
+            "estimatedTimeLeft": estimated_time_left
+        }
+        if layer_time_left is not None:
+            job_progress.update(layer=layer, layerEstimatedTimeLeft=layer_time_left)
+        self.client_namespace.emit_job_progress_updated(job_progress, broadcast=True,
+                                                        printer_id=session["identity"]["id"])
+
+        if job_obj.assigned_printer is not None:
+            self.update_prefetch_hint(job_obj.assigned_printer)
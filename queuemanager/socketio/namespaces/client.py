@@ -12,16 +12,20 @@ __status__ = "Development"
 
 import uuid
 
-from flask import request, session
-from flask_socketio import disconnect
+from flask import request, session, g, has_app_context, has_request_context
+from flask_restplus import marshal
+from flask_socketio import disconnect, join_room, leave_room
 
 from .base_class import Namespace
 from ..auth import socketio_auth_required
+from ..coalescer import EventCoalescer
+from ..fanout import TELEMETRY_STREAMS, TelemetryFanout
+from ..payload_cache import PayloadCache
 from ..schemas import (
     EmitJobAnalyzeDoneSchema, EmitJobAnalyzeErrorSchema, EmitJobEnqueueDoneSchema, EmitJobEnqueueErrorSchema,
     EmitPrinterDataUpdatedSchema, EmitPrinterTemperaturesUpdatedSchema, EmitJobProgressUpdatedSchema,
-    OnAnalyzeJobSchema, OnEnqueueJobSchema, EmitAnalyzeErrorHelper, EmitEnqueueErrorHelper,
-    EmitPrinterTemperaturesUpdatedHelper
+    OnAnalyzeJobSchema, OnEnqueueJobSchema, OnSubscribeTelemetrySchema, EmitAnalyzeErrorHelper,
+    EmitEnqueueErrorHelper, EmitPrinterTemperaturesUpdatedHelper
 )
 from ...database import Job, Printer, db_mgr
 
@@ -34,6 +38,13 @@ class ClientNamespace(Namespace):
         super().__init__(namespace)
         self.socketio = socketio
         self.socketio_manager = socketio_manager
+        self.jobs_updated_coalescer = None
+        self.jobs_updated_at_request_end = False
+        self.jobs_delta_coalescer = None
+        self.jobs_delta_enabled = False
+        self.job_changes = None
+        self.payload_cache = PayloadCache()
+        self.telemetry_fanout = TelemetryFanout(socketio, lambda event, data, room: self._emit(event, data, room=room))
 
         # Schema objects
         self.emit_job_analyze_done_schema = EmitJobAnalyzeDoneSchema()
@@ -45,6 +56,37 @@ class ClientNamespace(Namespace):
         self.emit_job_progress_updated_schema = EmitJobProgressUpdatedSchema()
         self.on_analyze_job_schema = OnAnalyzeJobSchema()
         self.on_enqueue_job_schema = OnEnqueueJobSchema()
+        self.on_subscribe_telemetry_schema = OnSubscribeTelemetrySchema()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.jobs_updated_coalescer = EventCoalescer(
+            self.socketio, lambda: self._emit("jobs_updated", broadcast=True),
+            app.config.setdefault('SOCKETIO_JOBS_UPDATED_WINDOW', 0.15),
+            app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+            app.config.setdefault('SOCKETIO_JOBS_UPDATED_KEY', 'queuemanager:jobs_updated'))
+        self.jobs_updated_at_request_end = app.config.setdefault('SOCKETIO_JOBS_UPDATED_AT_REQUEST_END', False)
+        # The deltas are made of the changes committed by this process, so they are only coalesced locally
+        self.jobs_delta_coalescer = EventCoalescer(
+            self.socketio, self.emit_jobs_delta, app.config['SOCKETIO_JOBS_UPDATED_WINDOW'])
+        self.jobs_delta_enabled = app.config.setdefault('SOCKETIO_JOBS_DELTA', True)
+        app.teardown_request(self._flush_request_jobs_updated)
+        self.telemetry_fanout.init_app(app)
+        self.payload_cache.init_app(app)
+
+    def set_job_changes(self, job_changes):
+        self.job_changes = job_changes
+        self.payload_cache.set_job_changes(job_changes)
+
+    def _coalesce_jobs_updated(self):
+        self.jobs_updated_coalescer.emit()
+        if self.jobs_delta_enabled and self.job_changes is not None:
+            self.jobs_delta_coalescer.emit()
+
+    def _flush_request_jobs_updated(self, _exception=None):
+        # Emit the 'jobs_updated' broadcasts delayed until the end of the request
+        if g.pop("jobs_updated_pending", False):
+            self._coalesce_jobs_updated()
 
     def _emit(self, event, *args, **kwargs):
         if 'namespace' in kwargs:
@@ -63,13 +105,62 @@ class ClientNamespace(Namespace):
                            include_self=include_self, callback=callback,
                            ignore_queue=ignore_queue)
 
-    def emit_jobs_updated(self, broadcast: bool = False):
+    def emit_jobs_updated(self, broadcast: bool = False, at_request_end: bool = None):
         """
         Emit the event 'jobs_updated'. This event don't send any data in the payload.
+
+        The broadcasts are coalesced, so all the ones made within the configured window are sent once. If the
+        'at_request_end' option is set (by default, the 'SOCKETIO_JOBS_UPDATED_AT_REQUEST_END' config value), the
+        broadcasts made while handling a request are delayed until the request ends.
         """
-        self._emit("jobs_updated", broadcast=broadcast)
+        if not broadcast:
+            self._emit("jobs_updated")
+            return
+
+        if at_request_end is None:
+            at_request_end = self.jobs_updated_at_request_end
+
+        if at_request_end and has_request_context():
+            g.jobs_updated_pending = True
+        else:
+            self._coalesce_jobs_updated()
 
-    def emit_job_analyze_done(self, job: Job, broadcast: bool = False):
+    def _get_jobs_delta(self):
+        previous_revision, revision, upserted, removed = self.job_changes.pop_pending_changes()
+        if previous_revision is None:
+            return None
+
+        from ...api.jobs.models import job_model
+        # The jobs removed after the changes were committed are sent in the next delta
+        jobs = [job for job in (self.socketio_manager.db_manager.get_jobs(id=job_id) for job_id in upserted)
+                if job is not None]
+
+        return {"previous_revision": previous_revision, "revision": revision,
+                "upserted": marshal(jobs, job_model, skip_none=True), "removed": removed}
+
+    def emit_jobs_delta(self):
+        """
+        Emit the event 'jobs_delta' to all the clients, with the jobs changed and removed by this process since the
+        last delta. The payload is '{previous_revision, revision, upserted, removed}', where 'upserted' is the list of
+        the changed jobs serialized as in the 'GET /jobs' API resource, and 'removed' is the list of the removed job
+        IDs. The delta has all the changes made after 'previous_revision' up to 'revision'.
+
+        Every server process emits its own deltas, so they can arrive out of order and the revisions of the changes
+        made by other processes are skipped. A client that knows the revision R applies the delta only if
+        'previous_revision' <= R < 'revision' (and ignores it if R >= 'revision'). If R < 'previous_revision' some
+        changes were missed, and the client has to catch up with 'GET /jobs?since_revision=R' instead.
+        """
+        # The deltas coalesced in a background task are built in its own application context
+        if has_app_context():
+            delta = self._get_jobs_delta()
+        else:
+            with self.app.app_context():
+                delta = self._get_jobs_delta()
+
+        if delta is not None:
+            self._emit("jobs_delta", delta, broadcast=True)
+
+    def emit_job_analyze_done(self, job: Job, broadcast: bool = False, room: str = None):
         """
         Emit the event 'job_analyze_done'. The data send is defined by
         :class:`EmitJobAnalyzeDoneSchema`.
@@ -77,12 +168,12 @@ class ClientNamespace(Namespace):
         serialized_data = self.emit_job_analyze_done_schema.dump(job)
 
         if not serialized_data.errors:
-            self._emit("job_analyze_done", serialized_data.data, broadcast=broadcast)
+            self._emit("job_analyze_done", serialized_data.data, broadcast=broadcast, room=room)
         else:
             self._log_event_processing_error("job_analyze_done", serialized_data.errors)
 
     def emit_job_analyze_error(self, job: Job, error_message: str, additional_info: dict = None,
-                               broadcast: bool = False):
+                               broadcast: bool = False, room: str = None):
         """
         Emit the event 'job_analyze_error'. The data send is defined by
         :class:`EmitJobAnalyzeErrorSchema`.
@@ -91,7 +182,7 @@ class ClientNamespace(Namespace):
         serialized_data = self.emit_job_analyze_error_schema.dump(helper.__dict__)
 
         if not serialized_data.errors:
-            self._emit("job_analyze_error", serialized_data.data, broadcast=broadcast)
+            self._emit("job_analyze_error", serialized_data.data, broadcast=broadcast, room=room)
         else:
             self._log_event_processing_error("job_analyze_error", serialized_data.errors)
 
@@ -125,38 +216,55 @@ class ClientNamespace(Namespace):
         """
         Emit the event 'printer_data_updated'. The data send is defined by
         :class:`EmitPrinterDataUpdatedSchema`
+
+        The printer is only serialized again when it changes (see :class:`PayloadCache`).
         """
-        serialized_data = self.emit_printer_data_updated_schema.dump(printer)
+        version = self.payload_cache.get_printer_version(printer)
+        data = self.payload_cache.get("printer_data_updated", printer.id, version)
 
-        if not serialized_data.errors:
-            self._emit("printer_data_updated", serialized_data.data, broadcast=broadcast)
-        else:
-            self._log_event_processing_error("printer_data_updated", serialized_data.errors)
+        if data is None:
+            serialized_data = self.emit_printer_data_updated_schema.dump(printer)
+            if serialized_data.errors:
+                self._log_event_processing_error("printer_data_updated", serialized_data.errors)
+                return
+            data = serialized_data.data
+            self.payload_cache.put("printer_data_updated", printer.id, version, data)
 
-    def emit_printer_temperatures_updated(self, bed_temp: float, extruders_temp: list, broadcast: bool = False):
+        self._emit("printer_data_updated", data, broadcast=broadcast)
+
+    def emit_printer_temperatures_updated(self, bed_temp: float, extruders_temp: list, broadcast: bool = False,
+                                          printer_id: int = None):
         """
         Emit the event 'printer_temperatures_updated'. The data send is defined by
         :class:`EmitPrinterTemperaturesUpdatedSchema`
+
+        The broadcasts are sent to each client at the rate it subscribed to (see :class:`TelemetryFanout`).
         """
         helper = EmitPrinterTemperaturesUpdatedHelper(bed_temp, extruders_temp)
         serialized_data = self.emit_printer_temperatures_updated_schema.dump(helper.__dict__)
 
-        if not serialized_data.errors:
-            self._emit("printer_temperatures_updated", serialized_data.data, broadcast=broadcast)
-        else:
+        if serialized_data.errors:
             self._log_event_processing_error("printer_temperatures_updated", serialized_data.errors)
+        elif broadcast:
+            self.telemetry_fanout.publish("printer_temperatures_updated", printer_id, serialized_data.data)
+        else:
+            self._emit("printer_temperatures_updated", serialized_data.data)
 
-    def emit_job_progress_updated(self, job: Job, broadcast: bool = False):
+    def emit_job_progress_updated(self, job: Job, broadcast: bool = False, printer_id: int = None):
         """
         Emit the event 'job_progress_updated'. The data send is defined by
         :class:`EmitJobProgressUpdatedSchema`
+
+        The broadcasts are sent to each client at the rate it subscribed to (see :class:`TelemetryFanout`).
         """
         serialized_data = self.emit_job_progress_updated_schema.dump(job)
 
-        if not serialized_data.errors:
-            self._emit("job_progress_updated", serialized_data.data, broadcast=broadcast)
-        else:
+        if serialized_data.errors:
             self._log_event_processing_error("job_progress_update", serialized_data.errors)
+        elif broadcast:
+            self.telemetry_fanout.publish("job_progress_updated", printer_id, serialized_data.data)
+        else:
+            self._emit("job_progress_updated", serialized_data.data)
 
     def on_connect(self):
         """
@@ -175,6 +283,10 @@ class ClientNamespace(Namespace):
         session["key"] = str(uuid.uuid4())
         self._emit("session_key", session["key"], broadcast=False)
 
+        # Send the telemetry at the default rate until the client subscribes to another one
+        for stream in TELEMETRY_STREAMS:
+            join_room(self.telemetry_fanout.get_room(stream, self.telemetry_fanout.default_rate))
+
         self.app.logger.info("Client %s connected", request.sid)
 
     def on_disconnect(self):
@@ -192,7 +304,7 @@ class ClientNamespace(Namespace):
         deserialized_data = self.on_analyze_job_schema.load(data)
 
         if not deserialized_data.errors:
-            self.socketio_manager.analyze_job(**deserialized_data.data)
+            self.socketio_manager.analyze_job(room=request.sid, **deserialized_data.data)
         else:
             try:
                 job = db_mgr.get_jobs(id=deserialized_data.data["job_id"])
@@ -216,3 +328,30 @@ class ClientNamespace(Namespace):
             except KeyError:
                 job = None
             self.emit_job_enqueue_error(job, "Corrupted event payload", deserialized_data.errors)
+
+    @socketio_auth_required
+    def on_subscribe_telemetry(self, data: dict):
+        """
+        Listen for the event 'subscribe_telemetry'. The data expected is defined by
+        :class:`OnSubscribeTelemetrySchema`
+
+        The client will receive the events of the stream at the highest configured rate not greater than 'max_rate'
+        (events per second), or none if it's 0. The rate applied is returned as the event acknowledgement.
+        """
+        deserialized_data = self.on_subscribe_telemetry_schema.load(data)
+
+        if deserialized_data.errors:
+            self._log_event_processing_error("subscribe_telemetry", deserialized_data.errors)
+            return
+
+        stream, max_rate = deserialized_data.data["stream"], deserialized_data.data["max_rate"]
+        for room in self.telemetry_fanout.get_rooms(stream):
+            leave_room(room)
+
+        rate = self.telemetry_fanout.get_rate(max_rate) if max_rate > 0 else None
+        if rate is not None:
+            join_room(self.telemetry_fanout.get_room(stream, rate))
+
+        self.app.logger.debug("Client {} subscribed to '{}' at {} events/s".format(request.sid, stream, rate or 0))
+
+        return {"stream": stream, "rate": rate or 0}
@@ -18,9 +18,9 @@ from flask_socketio import disconnect
 from .base_class import Namespace
 from ..auth import socketio_auth_required
 from ..schemas import (
-    EmitPrintJobSchema, EmitJobRecoveredSchema, OnInitialDataSchema, OnStateUpdatedSchema, OnExtrudersUpdatedSchema,
-    OnPrintStartedSchema, OnPrintFinishedSchema, OnPrintFeedbackSchema, OnPrinterTemperaturesUpdatedSchema,
-    OnJobProgressUpdatedSchema
+    EmitPrintJobSchema, EmitPrefetchJobSchema, EmitPrefetchJobCancelledSchema, EmitJobRecoveredSchema,
+    OnInitialDataSchema, OnStateUpdatedSchema, OnExtrudersUpdatedSchema, OnPrintStartedSchema, OnPrintFinishedSchema,
+    OnPrintFeedbackSchema, OnPrinterTemperaturesUpdatedSchema, OnJobProgressUpdatedSchema
 )
 from ...database import Job, DBManagerError
 
@@ -36,6 +36,8 @@ class PrinterNamespace(Namespace):
 
         # Schema objects
         self.emit_print_job_schema = EmitPrintJobSchema()
+        self.emit_prefetch_job_schema = EmitPrefetchJobSchema()
+        self.emit_prefetch_job_cancelled_schema = EmitPrefetchJobCancelledSchema()
         self.emit_job_recovered_schema = EmitJobRecoveredSchema()
         self.on_initial_data_schema = OnInitialDataSchema()
         self.on_state_updated_schema = OnStateUpdatedSchema()
@@ -75,6 +77,30 @@ class PrinterNamespace(Namespace):
         else:
             self._log_event_processing_error("print_job", serialized_data.errors)
 
+    def emit_prefetch_job(self, job: Job, sid: str = None, broadcast: bool = False):
+        """
+        Emit the event 'prefetch_job'. The data send is defined by
+        :class:`EmitPrefetchJobSchema`
+        """
+        serialized_data = self.emit_prefetch_job_schema.dump(job)
+
+        if not serialized_data.errors:
+            self._emit("prefetch_job", serialized_data.data, room=sid, broadcast=broadcast)
+        else:
+            self._log_event_processing_error("prefetch_job", serialized_data.errors)
+
+    def emit_prefetch_job_cancelled(self, job_id: int, sid: str = None, broadcast: bool = False):
+        """
+        Emit the event 'prefetch_job_cancelled'. The data send is defined by
+        :class:`EmitPrefetchJobCancelledSchema`
+        """
+        serialized_data = self.emit_prefetch_job_cancelled_schema.dump({"id": job_id})
+
+        if not serialized_data.errors:
+            self._emit("prefetch_job_cancelled", serialized_data.data, room=sid, broadcast=broadcast)
+        else:
+            self._log_event_processing_error("prefetch_job_cancelled", serialized_data.errors)
+
     def emit_job_recovered(self, job: Job, sid: str = None, broadcast: bool = False):
         """
         Emit the event 'job_recovered'. The data send is defined by
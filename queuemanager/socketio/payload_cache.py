@@ -0,0 +1,113 @@
+"""
+This module implements the cache of the serialized payloads of the emitted events.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import (
+    File, Job, Printer, PrinterExtruder, PrinterExtruderType, PrinterMaterial, PrinterModel, PrinterState
+)
+
+# Tables serialized as part of every printer
+_PRINTER_RELATED_MODELS = (PrinterExtruder, PrinterExtruderType, PrinterMaterial, PrinterModel, PrinterState)
+
+
+class PayloadCache(object):
+    """
+    This class keeps the last serialized payload of each event and object, so the same object is only serialized
+    again when it changes. The payloads are saved with the version of the object when they were serialized, and the
+    versions are increased when the printers and the jobs are flushed to the database (listening the session
+    events, so all the changes made through the DBManager are seen). The changes of the extruders, materials,
+    models and states (and the rollbacks) increase the version of all the printers.
+
+    The printers are serialized with its current job, so its version includes the version of the job. The jobs and
+    the current job of the printers can also be changed by the other server processes, so the revision of the job
+    changes tracker is included too.
+
+    The cached payloads are shared by all the emissions, so they must not be modified.
+    """
+    def __init__(self, app=None):
+        self.max_size = None
+        self.job_changes = None
+        self._epoch = 0
+        self._versions = {}
+        self._payloads = OrderedDict()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('SOCKETIO_PAYLOAD_CACHE_SIZE', 1024)
+        self.clear()
+
+        if not event.contains(Session, "after_flush", self._after_flush):
+            event.listen(Session, "after_flush", self._after_flush)
+            event.listen(Session, "after_rollback", self._after_rollback)
+
+    def set_job_changes(self, job_changes):
+        self.job_changes = job_changes
+
+    def clear(self):
+        self._epoch += 1
+        self._versions.clear()
+        self._payloads.clear()
+
+    def _invalidate(self, model, obj_id):
+        key = (model.__name__, obj_id)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _after_flush(self, session, _flush_context):
+        for obj in session.new | session.dirty | session.deleted:
+            if isinstance(obj, Printer):
+                self._invalidate(Printer, obj.id)
+            elif isinstance(obj, Job):
+                self._invalidate(Job, obj.id)
+            elif isinstance(obj, File):
+                for job in obj.jobs:
+                    self._invalidate(Job, job.id)
+            elif isinstance(obj, _PRINTER_RELATED_MODELS):
+                self._epoch += 1
+
+    def _after_rollback(self, _session):
+        # The objects are expired, so they could have been serialized with the values that were rolled back
+        self._epoch += 1
+
+    def get_printer_version(self, printer: Printer):
+        """
+        Return the version of the printer serialized with its current job.
+        """
+        version = (self._epoch, self._versions.get((Printer.__name__, printer.id), 0),
+                   printer.idCurrentJob, self._versions.get((Job.__name__, printer.idCurrentJob), 0))
+        if self.job_changes is not None:
+            version += (self.job_changes.get_revision(),)
+        return version
+
+    def get(self, event_name: str, obj_id: int, version: tuple):
+        """
+        Return the cached payload of the event for the object, or None if there isn't any of this version.
+        """
+        entry = self._payloads.get((event_name, obj_id))
+        if entry is None or entry[0] != version:
+            return None
+
+        self._payloads.move_to_end((event_name, obj_id))
+        return entry[1]
+
+    def put(self, event_name: str, obj_id: int, version: tuple, payload):
+        self._payloads[(event_name, obj_id)] = (version, payload)
+        self._payloads.move_to_end((event_name, obj_id))
+
+        # Forget the least recently used payloads
+        while self.max_size is not None and len(self._payloads) > self.max_size:
+            self._payloads.popitem(last=False)
@@ -0,0 +1,105 @@
+"""
+This module implements the store of the prefetch hints sent to the printers.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+# Replace the hint of a printer only if it's still the expected one (an empty new value removes it)
+_REPLACE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if (current or '') ~= ARGV[2] then
+    return 0
+end
+if ARGV[3] == '' then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+end
+return 1
+"""
+
+
+class PrefetchHints(object):
+    """
+    This class keeps the ID of the job hinted to each printer. The hints are updated by the Socket.IO server and by
+    the API processes (when the queue is changed), and the API checks them before sending a file to a printer, so
+    when a message queue is configured they are kept in the same Redis server used by Socket.IO.
+
+    The hints are only changed with 'replace', which fails if another process changed the hint first. This way a
+    hint is only sent (or cancelled) once, by the process that changed it.
+    """
+    def __init__(self, app=None):
+        self._hints = {}
+        self._redis = None
+        self._replace_script = None
+        self._key = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._key = app.config.setdefault('SOCKETIO_PREFETCH_HINTS_KEY', 'queuemanager:prefetch_hints')
+        self._hints = {}
+
+        message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+        if message_queue is not None and message_queue.startswith("redis://"):
+            import redis
+            self._redis = redis.StrictRedis.from_url(message_queue)
+            self._replace_script = self._redis.register_script(_REPLACE_SCRIPT)
+        else:
+            self._redis = None
+            self._replace_script = None
+
+    def get(self, printer_id: int):
+        """
+        Return the ID of the job hinted to the printer (or None).
+        """
+        if self._redis is None:
+            return self._hints.get(printer_id)
+
+        job_id = self._redis.hget(self._key, printer_id)
+        return int(job_id) if job_id is not None else None
+
+    def replace(self, printer_id: int, hinted_job_id, job_id):
+        """
+        Change the hint of the printer from 'hinted_job_id' to 'job_id' (None removes it). Returns False without
+        changing anything if the current hint isn't 'hinted_job_id'.
+        """
+        if self._redis is None:
+            if self._hints.get(printer_id) != hinted_job_id:
+                return False
+            if job_id is None:
+                self._hints.pop(printer_id, None)
+            else:
+                self._hints[printer_id] = job_id
+            return True
+
+        return bool(self._replace_script(keys=[self._key], args=[
+            printer_id, hinted_job_id if hinted_job_id is not None else "", job_id if job_id is not None else ""
+        ]))
+
+    def pop(self, printer_id: int):
+        """
+        Remove the hint of the printer and return the ID of the hinted job (or None).
+        """
+        if self._redis is None:
+            return self._hints.pop(printer_id, None)
+
+        pipeline = self._redis.pipeline()
+        pipeline.hget(self._key, printer_id)
+        pipeline.hdel(self._key, printer_id)
+        job_id, _ = pipeline.execute()
+        return int(job_id) if job_id is not None else None
+
+    def is_hinted(self, printer_id: int, job_ids):
+        """
+        Check if the job hinted to the printer is any of the given ones.
+        """
+        hinted_job_id = self.get(printer_id)
+        return hinted_job_id is not None and hinted_job_id in job_ids
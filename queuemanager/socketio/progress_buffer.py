@@ -0,0 +1,81 @@
+"""
+This module implements the write-behind buffer of the job progress updates.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import time
+
+
+class JobProgress(object):
+    """
+    This class keeps the last progress received of a job and the last one saved in the database.
+    """
+    def __init__(self, progress: float = None, estimated_time_left=None):
+        self.progress = progress
+        self.estimated_time_left = estimated_time_left
+        self.persisted_progress = None
+        self.persisted_at = None
+        self.dirty = False
+
+
+class JobProgressBuffer(object):
+    """
+    This class keeps the last progress of the printing jobs in memory, so the progress updates can be sent to the
+    clients as soon as they are received, but they are only saved in the database when the last saved progress is
+    older than the persist interval or differs more than the persist delta (in percentage points). The progress
+    is also saved when the state of the job changes (see :meth:`pop`) and when the server is stopped.
+    """
+    def __init__(self, app=None):
+        self.persist_interval = None
+        self.persist_delta = None
+        self._jobs = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.persist_interval = app.config.setdefault('SOCKETIO_PROGRESS_PERSIST_INTERVAL', 30)
+        self.persist_delta = app.config.setdefault('SOCKETIO_PROGRESS_PERSIST_DELTA', 5.0)
+
+    def update(self, job_id: int, progress: float, estimated_time_left):
+        """
+        Save the new progress of the job in memory. Returns True if it has to be saved in the database too.
+        """
+        job_progress = self._jobs.setdefault(job_id, JobProgress())
+        job_progress.progress = progress
+        job_progress.estimated_time_left = estimated_time_left
+        job_progress.dirty = True
+
+        if job_progress.persisted_at is None or not self.persist_interval:
+            return True
+        if time.monotonic() - job_progress.persisted_at >= self.persist_interval:
+            return True
+        return self.persist_delta is not None and \
+            abs(progress - (job_progress.persisted_progress or 0.0)) >= self.persist_delta
+
+    def mark_persisted(self, job_id: int):
+        job_progress = self._jobs.get(job_id)
+        if job_progress is not None:
+            job_progress.persisted_progress = job_progress.progress
+            job_progress.persisted_at = time.monotonic()
+            job_progress.dirty = False
+
+    def get(self, job_id: int):
+        return self._jobs.get(job_id)
+
+    def pop(self, job_id: int):
+        """
+        Forget the job progress and return it (or None if the job doesn't have any), so it can be saved before the
+        state of the job changes.
+        """
+        return self._jobs.pop(job_id, None)
+
+    def get_dirty_job_ids(self):
+        return [job_id for job_id, job_progress in self._jobs.items() if job_progress.dirty]
@@ -0,0 +1,165 @@
+"""
+This module implements the in-memory index used to match the queued jobs with the ready printers.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import heapq
+
+
+def make_capability(extruders):
+    """
+    Build the capability of a printer from a list of (extruder index, material id, extruder type id) tuples, where
+    the material and the extruder type are None when they are unknown.
+    """
+    return tuple(sorted(extruders))
+
+
+def make_requirement(allowed_materials, allowed_extruder_types):
+    """
+    Build the requirement of a job from the lists of (material id, extruder index) and (extruder type id, extruder
+    index) tuples allowed for each extruder. An extruder without allowed materials (or extruder types) accepts any.
+    """
+    materials, extruder_types = {}, {}
+    for material_id, index in allowed_materials:
+        materials.setdefault(index, set()).add(material_id)
+    for extruder_type_id, index in allowed_extruder_types:
+        extruder_types.setdefault(index, set()).add(extruder_type_id)
+
+    return tuple(
+        (index, frozenset(materials[index]) if index in materials else None,
+         frozenset(extruder_types[index]) if index in extruder_types else None)
+        for index in sorted(set(materials) | set(extruder_types))
+    )
+
+
+def is_compatible(capability: tuple, requirement: tuple):
+    extruders = {index: (material_id, extruder_type_id) for index, material_id, extruder_type_id in capability}
+    for index, materials, extruder_types in requirement:
+        if index not in extruders:
+            return False
+        material_id, extruder_type_id = extruders[index]
+        if materials is not None and material_id not in materials:
+            return False
+        if extruder_types is not None and extruder_type_id not in extruder_types:
+            return False
+    return True
+
+
+class JobScheduler(object):
+    """
+    This class indexes the queued jobs by its requirement (the materials and extruder types allowed in each
+    extruder) and the ready printers by its capability (the material and extruder type of each extruder), so a
+    freed printer finds the highest priority job that it can print (and a new job finds a printer) without walking
+    the whole queue.
+
+    The jobs with the same requirement share a heap ordered by its rank in the queue (lower is first), and the
+    compatibility of each capability with each requirement is only checked once. Finding a job takes a look at the
+    top of each requirement heap, so it only depends on the number of different requirements and not on the
+    number of queued jobs. Nothing here queries the database, the caller keeps the index up to date.
+    """
+    def __init__(self):
+        self._jobs = {}
+        self._job_heaps = {}
+        self._printers = {}
+        self._printer_groups = {}
+        self._compatibility = {}
+        self._next_rank = 0
+
+    def _is_compatible(self, capability: tuple, requirement: tuple):
+        key = (capability, requirement)
+        compatible = self._compatibility.get(key)
+        if compatible is None:
+            compatible = self._compatibility[key] = is_compatible(capability, requirement)
+        return compatible
+
+    def set_jobs(self, jobs: list):
+        """
+        Replace the indexed queue with the list of (job id, requirement) tuples, ordered by priority.
+        """
+        self._jobs = {}
+        self._job_heaps = {}
+        self._compatibility = {}
+        for rank, (job_id, requirement) in enumerate(jobs):
+            self._jobs[job_id] = (rank, requirement)
+            # The ranks are added in order, so every list is already a heap
+            self._job_heaps.setdefault(requirement, []).append((rank, job_id))
+        self._next_rank = len(jobs)
+
+    def add_job(self, job_id: int, requirement: tuple, rank: int = None):
+        """
+        Add a job to the queue index, at the end of the queue if the rank isn't given.
+        """
+        if rank is None:
+            rank = self._next_rank
+        self._next_rank = max(self._next_rank, rank + 1)
+        self._jobs[job_id] = (rank, requirement)
+        heapq.heappush(self._job_heaps.setdefault(requirement, []), (rank, job_id))
+
+    def remove_job(self, job_id: int):
+        # The heap entry is dropped the next time it reaches the top of its heap
+        self._jobs.pop(job_id, None)
+
+    def contains_job(self, job_id: int):
+        return job_id in self._jobs
+
+    def get_job_count(self):
+        return len(self._jobs)
+
+    def _get_first_job(self, requirement: tuple):
+        heap = self._job_heaps[requirement]
+        while heap:
+            rank, job_id = heap[0]
+            if self._jobs.get(job_id) == (rank, requirement):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def find_job(self, capability: tuple):
+        """
+        Return the ID of the highest priority job that a printer with this capability can print, or None.
+        """
+        best_entry = None
+        for requirement in list(self._job_heaps):
+            entry = self._get_first_job(requirement)
+            if entry is None:
+                del self._job_heaps[requirement]
+                continue
+            if (best_entry is None or entry < best_entry) and self._is_compatible(capability, requirement):
+                best_entry = entry
+        return best_entry[1] if best_entry is not None else None
+
+    def set_printer(self, printer_id: int, capability: tuple = None, ready: bool = False):
+        """
+        Update the capability of the printer, and index it only if it's ready to print a new job.
+        """
+        previous_capability = self._printers.pop(printer_id, None)
+        if previous_capability is not None:
+            group = self._printer_groups[previous_capability]
+            group.discard(printer_id)
+            if not group:
+                del self._printer_groups[previous_capability]
+
+        if ready and capability is not None:
+            self._printers[printer_id] = capability
+            self._printer_groups.setdefault(capability, set()).add(printer_id)
+
+    def remove_printer(self, printer_id: int):
+        self.set_printer(printer_id)
+
+    def get_ready_printer_ids(self):
+        return sorted(self._printers)
+
+    def find_printer(self, requirement: tuple):
+        """
+        Return the ID of a ready printer (the lowest one) that can print a job with this requirement, or None.
+        """
+        printer_ids = [min(printer_ids) for capability, printer_ids in self._printer_groups.items()
+                       if self._is_compatible(capability, requirement)]
+        return min(printer_ids) if printer_ids else None
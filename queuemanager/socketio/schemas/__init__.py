@@ -13,7 +13,7 @@ __status__ = "Development"
 from .client_namespace import (
     EmitJobAnalyzeDoneSchema, EmitJobAnalyzeErrorSchema, EmitJobEnqueueDoneSchema, EmitJobEnqueueErrorSchema,
     EmitPrinterDataUpdatedSchema, EmitPrinterTemperaturesUpdatedSchema, EmitJobProgressUpdatedSchema,
-    OnAnalyzeJobSchema, OnEnqueueJobSchema
+    OnAnalyzeJobSchema, OnEnqueueJobSchema, OnSubscribeTelemetrySchema
 )
 from .helpers import (
     EmitAnalyzeErrorHelper, EmitEnqueueErrorHelper, EmitPrinterTemperaturesUpdatedHelper
@@ -24,7 +24,8 @@ from .printer import (
     PrinterExtruderSchema, PrinterSchema
 )
 from .printer_namespace import (
-    EmitPrintJobSchema, EmitJobRecoveredSchema, OnInitialDataSchema, OnStateUpdatedSchema, OnExtrudersUpdatedSchema,
+    EmitPrintJobSchema, EmitPrefetchJobSchema, EmitPrefetchJobCancelledSchema, EmitJobRecoveredSchema,
+    OnInitialDataSchema, OnStateUpdatedSchema, OnExtrudersUpdatedSchema,
     OnPrintStartedSchema, OnPrintFinishedSchema, OnPrintFeedbackSchema, OnPrinterTemperaturesUpdatedSchema,
     OnJobProgressUpdatedSchema
 )
@@ -10,12 +10,14 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 from .common_schemas import (
     PrinterTemperaturesUpdatedSchema, JobInfoSchema, CurrentJobInfoSchema
 )
+from .custom_fields import EstimatedSecondsLeft
 from .printer import PrinterSchema
+from ..fanout import TELEMETRY_STREAMS
 
 
 ############################
@@ -58,7 +60,9 @@ class EmitPrinterTemperaturesUpdatedSchema(PrinterTemperaturesUpdatedSchema):
 
 class EmitJobProgressUpdatedSchema(CurrentJobInfoSchema):
     """ Schema of the 'job_progress_updated' event emitted by the server """
-    pass
+    # Only sent when the file has a layer index
+    layer = fields.Integer(allow_none=True)
+    layer_estimated_seconds_left = EstimatedSecondsLeft(attribute="layerEstimatedTimeLeft", allow_none=True)
 
 
 class OnAnalyzeJobSchema(Schema):
@@ -69,3 +73,9 @@ class OnAnalyzeJobSchema(Schema):
 class OnEnqueueJobSchema(Schema):
     """ Schema of the 'enqueue_job' event that the server is listening for """
     job_id = fields.Integer(required=True)
+
+
+class OnSubscribeTelemetrySchema(Schema):
+    """ Schema of the 'subscribe_telemetry' event that the server is listening for """
+    stream = fields.String(required=True, validate=validate.OneOf(TELEMETRY_STREAMS))
+    max_rate = fields.Float(required=True, validate=lambda max_rate: max_rate >= 0)
@@ -14,6 +14,7 @@ from datetime import timedelta
 
 from marshmallow import fields
 
+from ...catalog import catalog_idx
 from ...database import db_mgr
 
 
@@ -37,7 +38,7 @@ class PrinterMaterialField(fields.String):
         if value is None:
             return None
         elif isinstance(value, str):
-            materials = db_mgr.get_printer_materials(type=value)
+            materials = catalog_idx.get_materials_by_type(value)
             if materials:
                 return materials[0]
             else:
@@ -52,7 +53,7 @@ class PrinterExtruderTypeField(fields.Float):
         if value is None:
             return None
         elif isinstance(value, float):
-            extruder_types = db_mgr.get_printer_extruder_types(nozzleDiameter=value)
+            extruder_types = catalog_idx.get_extruder_types_by_nozzle_diameter(value)
 
             if extruder_types:
                 return extruder_types[0]
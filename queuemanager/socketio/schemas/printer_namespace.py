@@ -55,6 +55,18 @@ class EmitPrintJobSchema(Schema):
     file_id = fields.Integer(attribute="file.id", required=True)
 
 
+class EmitPrefetchJobSchema(Schema):
+    """ Schema of the 'prefetch_job' event emitted by the server """
+    id = fields.Integer(required=True)
+    name = fields.String(required=True)
+    file_id = fields.Integer(attribute="file.id", required=True)
+
+
+class EmitPrefetchJobCancelledSchema(Schema):
+    """ Schema of the 'prefetch_job_cancelled' event emitted by the server """
+    id = fields.Integer(required=True)
+
+
 class EmitJobRecoveredSchema(Schema):
     """ Schema of the 'job_recovered' event emitted by the server """
     id = fields.Integer(required=True)
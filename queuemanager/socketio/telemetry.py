@@ -0,0 +1,209 @@
+"""
+This module implements the in-memory history of the printer temperatures.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import io
+import math
+import time
+
+import numpy as np
+
+# Resolutions of the temperatures history and the seconds averaged by each sample (0 means the received samples)
+TEMPERATURE_RESOLUTIONS = {
+    "raw": 0,
+    "10s": 10,
+    "1m": 60
+}
+
+
+class TemperatureRingBuffer(object):
+    """
+    This class keeps the last 'capacity' temperature samples in preallocated arrays, overwriting the oldest ones.
+    The first column of the temperatures array is the bed temperature and the next ones the extruders temperatures
+    (NaN when unknown).
+    """
+    def __init__(self, capacity: int, columns: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.temperatures = np.full((capacity, columns), np.nan, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+
+    def append(self, timestamp: float, temperatures: np.ndarray):
+        self.timestamps[self.position] = timestamp
+        self.temperatures[self.position] = temperatures
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def to_array(self):
+        """
+        Return the samples from the oldest to the newest, with the timestamp as the first column.
+        """
+        indexes = np.arange(self.position - self.size, self.position) % self.capacity
+        return np.column_stack((self.timestamps[indexes], self.temperatures[indexes].astype(np.float64)))
+
+
+class TemperatureHistory(object):
+    """
+    This class keeps the temperatures history of one printer at every resolution. The received samples are saved in
+    the 'raw' buffer and accumulated in the current bucket of the other resolutions, whose average is saved (with
+    the bucket start as its timestamp) when the first sample of the next bucket is received.
+    """
+    def __init__(self, capacities: dict, columns: int):
+        self.buffers = {resolution: TemperatureRingBuffer(capacities[resolution], columns)
+                        for resolution in TEMPERATURE_RESOLUTIONS}
+        self._bucket_starts = {}
+        self._bucket_sums = {}
+        self._bucket_counts = {}
+
+        for resolution, interval in TEMPERATURE_RESOLUTIONS.items():
+            if interval:
+                self._bucket_starts[resolution] = None
+                self._bucket_sums[resolution] = np.zeros(columns, dtype=np.float64)
+                self._bucket_counts[resolution] = np.zeros(columns, dtype=np.int64)
+
+    def _close_bucket(self, resolution: str):
+        sums, counts = self._bucket_sums[resolution], self._bucket_counts[resolution]
+        averages = np.full(len(sums), np.nan, dtype=np.float64)
+        np.divide(sums, counts, out=averages, where=counts > 0)
+        self.buffers[resolution].append(self._bucket_starts[resolution], averages)
+        sums.fill(0.0)
+        counts.fill(0)
+
+    def add_sample(self, timestamp: float, temperatures: np.ndarray):
+        """
+        Save a new sample and return the resolutions that got a new sample too.
+        """
+        self.buffers["raw"].append(timestamp, temperatures)
+        known = ~np.isnan(temperatures)
+        updated_resolutions = []
+
+        for resolution, bucket_start in self._bucket_starts.items():
+            interval = TEMPERATURE_RESOLUTIONS[resolution]
+            new_bucket_start = timestamp - timestamp % interval
+            if bucket_start != new_bucket_start:
+                if bucket_start is not None:
+                    self._close_bucket(resolution)
+                    updated_resolutions.append(resolution)
+                self._bucket_starts[resolution] = new_bucket_start
+            self._bucket_sums[resolution][known] += temperatures[known]
+            self._bucket_counts[resolution][known] += 1
+
+        return updated_resolutions
+
+    def dump(self, resolution: str):
+        with io.BytesIO() as f:
+            np.save(f, self.buffers[resolution].to_array(), allow_pickle=False)
+            return f.getvalue()
+
+
+class TemperatureTelemetry(object):
+    """
+    This class keeps the temperatures history of every printer in fixed size ring buffers (one for each resolution),
+    so the clients can load the temperature charts at once without saving the samples in the database.
+
+    The history lives in the process where the printer is connected. When a message queue is configured, the
+    history of a printer is also copied to the same Redis server used by Socket.IO every time a new averaged sample
+    is saved, so the other server processes (like the API one) can read it. The 'raw' samples read from another
+    process may be one averaging interval behind.
+    """
+    def __init__(self, app=None):
+        self.capacities = {}
+        self.extruders = None
+        self._histories = {}
+        self._redis = None
+        self._key = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.extruders = app.config.setdefault('SOCKETIO_TEMPERATURES_MAX_EXTRUDERS', 2)
+        self.capacities = {
+            "raw": app.config.setdefault('SOCKETIO_TEMPERATURES_RAW_SIZE', 600),
+            "10s": app.config.setdefault('SOCKETIO_TEMPERATURES_10S_SIZE', 360),
+            "1m": app.config.setdefault('SOCKETIO_TEMPERATURES_1M_SIZE', 1440)
+        }
+        self._key = app.config.setdefault('SOCKETIO_TEMPERATURES_KEY', 'queuemanager:temperatures')
+        self._histories = {}
+
+        message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+        if message_queue is not None and message_queue.startswith("redis://"):
+            import redis
+            self._redis = redis.StrictRedis.from_url(message_queue)
+        else:
+            self._redis = None
+
+    def _get_printer_key(self, printer_id: int):
+        return "{}:{}".format(self._key, printer_id)
+
+    def add_sample(self, printer_id: int, bed_temp: float, extruders_temp: list, timestamp: float = None):
+        """
+        Save the temperatures received from a printer. The extruders with an index greater than the maximum number of
+        extruders are ignored.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        temperatures = np.full(self.extruders + 1, np.nan, dtype=np.float64)
+        temperatures[0] = bed_temp
+        for extruder_temp in extruders_temp:
+            if 0 <= extruder_temp["index"] < self.extruders:
+                temperatures[extruder_temp["index"] + 1] = extruder_temp["temp_value"]
+
+        history = self._histories.get(printer_id)
+        if history is None:
+            history = self._histories[printer_id] = TemperatureHistory(self.capacities, self.extruders + 1)
+
+        if history.add_sample(timestamp, temperatures) and self._redis is not None:
+            pipeline = self._redis.pipeline()
+            for resolution in TEMPERATURE_RESOLUTIONS:
+                pipeline.hset(self._get_printer_key(printer_id), resolution, history.dump(resolution))
+            pipeline.execute()
+
+    def _get_samples(self, printer_id: int, resolution: str):
+        history = self._histories.get(printer_id)
+        if history is not None:
+            return history.buffers[resolution].to_array()
+
+        if self._redis is not None:
+            dump = self._redis.hget(self._get_printer_key(printer_id), resolution)
+            if dump is not None:
+                return np.load(io.BytesIO(dump), allow_pickle=False)
+
+        return np.zeros((0, self.extruders + 2), dtype=np.float64)
+
+    @staticmethod
+    def _to_list(values: np.ndarray, decimals: int):
+        # The unknown temperatures (NaN) are returned as null
+        return [None if math.isnan(value) else value for value in np.round(values, decimals).tolist()]
+
+    def get_history(self, printer_id: int, resolution: str = "raw", since: float = None, limit: int = None):
+        """
+        Return the temperatures history of the printer as columns (from the oldest to the newest sample), optionally
+        only the samples taken after 'since' (a UNIX timestamp) and only the last 'limit' ones.
+        """
+        if resolution not in TEMPERATURE_RESOLUTIONS:
+            raise ValueError("Unknown temperatures resolution '{}'".format(resolution))
+
+        samples = self._get_samples(printer_id, resolution)
+        if since is not None:
+            samples = samples[samples[:, 0] > since]
+        if limit is not None:
+            samples = samples[-limit:] if limit > 0 else samples[:0]
+
+        return {
+            "resolution": resolution,
+            "interval": TEMPERATURE_RESOLUTIONS[resolution],
+            "timestamps": self._to_list(samples[:, 0], 3),
+            "bed": self._to_list(samples[:, 1], 1),
+            "extruders": [self._to_list(samples[:, column], 1) for column in range(2, samples.shape[1])]
+        }
@@ -5,6 +5,7 @@ import pytest
 from sqlalchemy.orm import close_all_sessions
 
 from ... import create_app
+from ...catalog import catalog_idx
 from ...database import db as _db
 from ...database import db_mgr
 from ...file_storage import FileManager
@@ -81,8 +82,11 @@ def db_manager(app, session):
     db_mgr.init_app(app)
     db_mgr.update_session(session)
     db_mgr.init_static_values()
+    catalog_idx.load()
     db_mgr.init_printers_state()
     db_mgr.init_jobs_can_be_printed()
+    # The database is created again, so the scheduler has to load it again too
+    socketio_mgr.set_db_manager(db_mgr)
 
     return db_mgr
 
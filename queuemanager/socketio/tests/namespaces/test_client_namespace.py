@@ -11,11 +11,13 @@ __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
 from datetime import timedelta
+from shutil import copyfile
 
 from sqlalchemy.orm import Session
 
+from queuemanager.analysis import AnalysisWorker, LocalAnalysisQueue
 from queuemanager.file_storage import FileDescriptor
-from queuemanager.socketio import client_namespace
+from queuemanager.socketio import client_namespace, job_changes, socketio, socketio_mgr
 
 
 def test_emit_jobs_updated(socketio_client, db_manager):
@@ -28,6 +30,67 @@ def test_emit_jobs_updated(socketio_client, db_manager):
     assert received_events[0]['args'] == [None]
 
 
+def test_emit_jobs_updated_coalesced(app, socketio_client, db_manager):
+    coalescer = client_namespace.jobs_updated_coalescer
+    coalescer.window = 0.05
+
+    try:
+        # All the broadcasts made within the window are sent once
+        for _ in range(3):
+            client_namespace.emit_jobs_updated(broadcast=True)
+        assert socketio_client.get_received("/client") == []
+
+        socketio.sleep(0.1)
+        received_events = socketio_client.get_received("/client")
+        assert len(received_events) == 1
+        assert received_events[0]['name'] == 'jobs_updated'
+    finally:
+        coalescer.window = 0
+
+    # The broadcasts made while handling a request are sent when it ends
+    with app.test_request_context():
+        client_namespace.emit_jobs_updated(broadcast=True, at_request_end=True)
+        client_namespace.emit_jobs_updated(broadcast=True, at_request_end=True)
+        assert socketio_client.get_received("/client") == []
+
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 1
+    assert received_events[0]['name'] == 'jobs_updated'
+
+
+def test_emit_jobs_delta(socketio_client, db_manager):
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test", "/home/Marc/test")
+    job = db_manager.insert_job("test", file, user)
+    removed_job = db_manager.insert_job("test-removed", file, user)
+    job_changes.pop_pending_changes()
+
+    db_manager.update_job(job, name="test-renamed")
+    db_manager.delete_job(removed_job)
+
+    client_namespace.jobs_delta_enabled = True
+    try:
+        client_namespace.emit_jobs_updated(broadcast=True)
+    finally:
+        client_namespace.jobs_delta_enabled = False
+
+    received_events = socketio_client.get_received("/client")
+
+    assert len(received_events) == 2
+    assert received_events[0]['name'] == 'jobs_updated'
+    assert received_events[1]['name'] == 'jobs_delta'
+    delta = received_events[1]['args'][0]
+    assert delta["revision"] == job_changes.get_revision()
+    assert delta["previous_revision"] == delta["revision"] - 2
+    assert [job_data["id"] for job_data in delta["upserted"]] == [job.id]
+    assert delta["upserted"][0]["name"] == "test-renamed"
+    assert delta["removed"] == [2]
+
+    # The changes are only sent once
+    client_namespace.emit_jobs_delta()
+    assert socketio_client.get_received("/client") == []
+
+
 def test_emit_job_analyze_done(socketio_client, db_manager):
     user = db_manager.get_users(id=1)
     file = db_manager.insert_file(user, "test", "/home/Marc/test")
@@ -153,6 +216,34 @@ def test_emit_printer_data_updated(socketio_client, db_manager):
     }
 
 
+def test_emit_printer_data_updated_cached(socketio_client, db_manager):
+    payload_cache = client_namespace.payload_cache
+    printer = db_manager.get_printers(id=1)
+
+    client_namespace.emit_printer_data_updated(printer, broadcast=True)
+    version = payload_cache.get_printer_version(printer)
+    cached_data = payload_cache.get("printer_data_updated", printer.id, version)
+    assert cached_data is not None
+
+    # The printer isn't serialized again until it changes
+    client_namespace.emit_printer_data_updated(printer, broadcast=True)
+    assert payload_cache.get_printer_version(printer) == version
+    assert payload_cache.get("printer_data_updated", printer.id, version) is cached_data
+
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 2
+    assert received_events[0]['args'] == received_events[1]['args']
+
+    db_manager.update_printer(printer, name="Sigmax 4.0 renamed")
+    assert payload_cache.get_printer_version(printer) != version
+
+    client_namespace.emit_printer_data_updated(printer, broadcast=True)
+
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 1
+    assert received_events[0]['args'][0]["name"] == "Sigmax 4.0 renamed"
+
+
 def test_emit_printer_temperatures_updated(socketio_client, db_manager):
     bed_temp = 55.1
     extruders_temp = [
@@ -209,12 +300,59 @@ def test_emit_job_progress_updated(socketio_client, db_manager):
     }
 
 
+def test_on_subscribe_telemetry(socketio_client, client_session_key, db_manager):
+    fanout = client_namespace.telemetry_fanout
+    fanout.flush(5.0)
+
+    # The subscribed rate is rounded down to the configured ones
+    ack = socketio_client.emit("subscribe_telemetry", {
+        "stream": "printer_temperatures_updated",
+        "max_rate": 8,
+        "session_key": client_session_key
+    }, namespace="/client", callback=True)
+    assert ack == {"stream": "printer_temperatures_updated", "rate": 5.0}
+
+    # Only the latest temperatures are sent when the rate allows it
+    for bed_temp in (50.0, 51.0, 52.0):
+        client_namespace.emit_printer_temperatures_updated(bed_temp, [], broadcast=True, printer_id=1)
+    assert socketio_client.get_received("/client") == []
+
+    socketio.sleep(0.3)
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 1
+    assert received_events[0]['name'] == 'printer_temperatures_updated'
+    assert received_events[0]['args'][0] == {"bed_temp": 52.0, "extruders_temp": []}
+
+    # The streams not subscribed are still sent at the default rate
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test-file", "/home/Marc/test")
+    job = db_manager.insert_job("test-job", file, user)
+    client_namespace.emit_job_progress_updated(job, broadcast=True, printer_id=1)
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 1
+    assert received_events[0]['name'] == 'job_progress_updated'
+
+    ack = socketio_client.emit("subscribe_telemetry", {
+        "stream": "printer_temperatures_updated",
+        "max_rate": 0,
+        "session_key": client_session_key
+    }, namespace="/client", callback=True)
+    assert ack == {"stream": "printer_temperatures_updated", "rate": 0}
+
+    client_namespace.emit_printer_temperatures_updated(53.0, [], broadcast=True, printer_id=1)
+    socketio.sleep(0.3)
+    assert socketio_client.get_received("/client") == []
+
+
 def test_on_analyze_job(socketio_client, client_session_key, db_manager, file_manager):
     user = db_manager.get_users(id=1)
-    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file-no-header.gcode")
+    # The files are moved from the given path, so use a copy of the test files
+    copyfile("./test-file-no-header.gcode", "./test-file-no-header-tmp.gcode")
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file-no-header-tmp.gcode")
     file = file_manager.save_file(file_descriptor, user)
     db_manager.insert_job("test-job-no-header", file, user)
-    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file.gcode")
+    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode")
     file = file_manager.save_file(file_descriptor, user)
     db_manager.insert_job("test-job", file, user)
 
@@ -231,19 +369,20 @@ def test_on_analyze_job(socketio_client, client_session_key, db_manager, file_ma
         "additional_info": None
     }
 
+    # The job without the slicer data is analyzed from the file moves
     job_no_header = db_manager.get_jobs(name="test-job-no-header")
     data = {"session_key": client_session_key, "job_id": job_no_header.id}
     socketio_client.emit("analyze_job", data, namespace="/client")
 
     received_events = socketio_client.get_received("/client")
+    job_no_header = db_manager.get_jobs(name="test-job-no-header")
 
-    assert len(received_events) == 1
-    assert received_events[0]['name'] == 'job_analyze_error'
-    assert received_events[0]['args'][0] == {
-        "job": {'id': 1, 'name': 'test-job-no-header'},
-        "message": "The file data can't be loaded. Details: The file don't contain the data dictionary",
-        "additional_info": None
-    }
+    assert len(received_events) == 2
+    assert received_events[0]['name'] == 'job_analyze_done'
+    assert received_events[0]['args'][0] == {'id': 1, 'name': 'test-job-no-header'}
+    assert received_events[1]['name'] == 'jobs_updated'
+    assert job_no_header.analyzed is True
+    assert len(job_no_header.extruders_data) == 1
 
     job = db_manager.get_jobs(name="test-job")
     data = {"session_key": client_session_key, "job_id": job.id}
@@ -260,6 +399,39 @@ def test_on_analyze_job(socketio_client, client_session_key, db_manager, file_ma
     assert received_events[1]['args'] == [None]
 
 
+def test_on_analyze_job_with_worker(app, socketio_client, client_session_key, db_manager, file_manager):
+    user = db_manager.get_users(id=1)
+    copyfile("./test-file.gcode", "./test-file-tmp.gcode")
+    file_descriptor = FileDescriptor("test-file.gcode", path="./test-file-tmp.gcode")
+    file = file_manager.save_file(file_descriptor, user)
+    job = db_manager.insert_job("test-job", file, user)
+
+    analysis_queue = LocalAnalysisQueue()
+    socketio_mgr.analysis_queue = analysis_queue
+    try:
+        data = {"session_key": client_session_key, "job_id": job.id}
+        socketio_client.emit("analyze_job", data, namespace="/client")
+
+        # The job is only queued until a worker analyzes it
+        assert len(socketio_client.get_received("/client")) == 0
+        assert len(analysis_queue) == 1
+
+        worker = AnalysisWorker(app, analysis_queue)
+        assert worker.process_next(timeout=0) is True
+        assert worker.process_next(timeout=0) is False
+    finally:
+        socketio_mgr.analysis_queue = None
+
+    received_events = socketio_client.get_received("/client")
+    job = db_manager.get_jobs(name="test-job")
+
+    assert job.analyzed is True
+    assert len(received_events) == 2
+    assert received_events[0]['name'] == 'job_analyze_done'
+    assert received_events[0]['args'][0] == {"id": job.id, "name": job.name}
+    assert received_events[1]['name'] == 'jobs_updated'
+
+
 def test_on_enqueue_job(app, socketio_client, socketio_printer, client_session_key, printer_session_key,
                         db_manager, file_manager):
     user = db_manager.get_users(id=1)
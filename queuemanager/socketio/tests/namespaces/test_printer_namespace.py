@@ -10,9 +10,10 @@ __maintainer__ = "Marc Bermejo"
 __email__ = "mbermejo@bcn3dtechnologies.com"
 __status__ = "Development"
 
+import signal
 from datetime import timedelta
 
-from queuemanager.socketio import printer_namespace
+from queuemanager.socketio import printer_namespace, socketio_mgr
 
 
 def test_printer_connected(socketio_printer, socketio_client):
@@ -429,3 +430,166 @@ def test_on_job_progress_updated(socketio_printer, socketio_client, printer_sess
     job = db_manager.get_jobs(id=1)
     assert job.progress == progress_data["progress"]
     assert job.estimatedTimeLeft == timedelta(seconds=progress_data["estimated_seconds_left"])
+
+
+
+def test_on_job_progress_updated_layer(socketio_printer, socketio_client, printer_session_key, db_manager,
+                                       monkeypatch):
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test", "/home/Marc/test")
+    job = db_manager.insert_job("test", file, user)
+    printer = db_manager.get_printers(id=1)
+    db_manager.enqueue_created_job(job)
+    db_manager.update_job(job, canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, job)
+    db_manager.set_printing_job(job)
+
+    # The layer estimation is sent apart, the time left reported by the printer isn't replaced
+    monkeypatch.setattr(socketio_mgr.file_manager, "get_job_progress_info",
+                        lambda _job, _progress: (3, timedelta(seconds=40.0)))
+    socketio_printer.emit("job_progress_updated", {
+        "id": 1,
+        "progress": 1.2,
+        "estimated_seconds_left": 61.1,
+        "session_key": printer_session_key
+    }, namespace="/printer")
+
+    received_events = socketio_client.get_received("/client")
+    assert len(received_events) == 1
+    assert received_events[0]['args'][0] == {
+        "id": 1,
+        "name": "test",
+        "file_name": "test",
+        "progress": 1.2,
+        "estimated_seconds_left": 61.1,
+        "layer": 3,
+        "layer_estimated_seconds_left": 40.0
+    }
+    assert db_manager.get_jobs(id=1).estimatedTimeLeft == timedelta(seconds=61.1)
+
+def test_prefetch_job(socketio_printer, socketio_client, printer_session_key, db_manager):
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test", "/home/Marc/test")
+    job = db_manager.insert_job("test", file, user)
+    next_job = db_manager.insert_job("test-next", file, user)
+    printer = db_manager.get_printers(id=1)
+    db_manager.update_printer(printer, idState=db_manager.printer_state_ids["Printing"], sid=socketio_printer.sid)
+    for job_obj in (job, next_job):
+        db_manager.enqueue_created_job(job_obj)
+        db_manager.update_job(job_obj, canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, job)
+    db_manager.set_printing_job(job)
+
+    progress_data = {
+        "id": 1,
+        "progress": 50.0,
+        "estimated_seconds_left": 3600,
+        "session_key": printer_session_key
+    }
+
+    # The next job isn't sent until the current print is about to finish
+    socketio_printer.emit("job_progress_updated", progress_data, namespace="/printer")
+    assert socketio_printer.get_received("/printer") == []
+
+    progress_data.update(progress=99.0, estimated_seconds_left=60)
+    socketio_printer.emit("job_progress_updated", progress_data, namespace="/printer")
+    socketio_printer.emit("job_progress_updated", progress_data, namespace="/printer")
+
+    received_events = socketio_printer.get_received("/printer")
+    assert len(received_events) == 1
+    assert received_events[0]['name'] == 'prefetch_job'
+    assert received_events[0]['args'][0] == {"id": next_job.id, "name": "test-next", "file_id": file.id}
+
+    # The hint is cancelled when the queue changes
+    db_manager.delete_job(next_job)
+    socketio_mgr.update_prefetch_hints()
+
+    received_events = socketio_printer.get_received("/printer")
+    assert len(received_events) == 1
+    assert received_events[0]['name'] == 'prefetch_job_cancelled'
+    assert received_events[0]['args'][0] == {"id": 2}
+    assert socketio_mgr.prefetch_hints.get(printer.id) is None
+
+
+def test_job_progress_buffered(socketio_printer, socketio_client, printer_session_key, db_manager):
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test", "/home/Marc/test")
+    job = db_manager.insert_job("test", file, user)
+    printer = db_manager.get_printers(id=1)
+    db_manager.enqueue_created_job(job)
+    db_manager.update_job(job, canBePrinted=True)
+    db_manager.assign_job_to_printer(printer, job)
+    db_manager.set_printing_job(job)
+
+    socketio_mgr.progress_buffer.persist_interval = 60
+    try:
+        for progress in (1.0, 2.0, 7.0):
+            socketio_printer.emit("job_progress_updated", {
+                "id": 1,
+                "progress": progress,
+                "estimated_seconds_left": 100 - progress,
+                "session_key": printer_session_key
+            }, namespace="/printer")
+
+        # All the updates are sent to the clients
+        received_events = socketio_client.get_received("/client")
+        assert [event['args'][0]['progress'] for event in received_events] == [1.0, 2.0, 7.0]
+
+        # But only the first one and the one that changed more than the persist delta are saved
+        job = db_manager.get_jobs(id=1)
+        assert job.progress == 7.0
+
+        socketio_printer.emit("job_progress_updated", {
+            "id": 1,
+            "progress": 8.0,
+            "estimated_seconds_left": 92.0,
+            "session_key": printer_session_key
+        }, namespace="/printer")
+        socketio_client.get_received("/client")
+        assert db_manager.get_jobs(id=1).progress == 7.0
+
+        # The pending progress updates are saved when the server is stopped (before the previous SIGTERM handler)
+        terminated = []
+        socketio_mgr._on_terminate(lambda signum, _frame: terminated.append(signum), signal.SIGTERM, None)
+        assert terminated == [signal.SIGTERM]
+        job = db_manager.get_jobs(id=1)
+        assert job.progress == 8.0
+        assert job.estimatedTimeLeft == timedelta(seconds=92.0)
+
+        # The job is forgotten when the print finishes
+        socketio_printer.emit("print_finished", {"job_id": 1, "cancelled": False, "session_key": printer_session_key},
+                              namespace="/printer")
+        assert socketio_mgr.progress_buffer.get(1) is None
+    finally:
+        socketio_mgr.progress_buffer.persist_interval = 0
+
+
+def test_sync_scheduler_changes(db_manager, monkeypatch):
+    user = db_manager.get_users(id=1)
+    file = db_manager.insert_file(user, "test", "/home/Marc/test")
+    job = db_manager.insert_job("test", file, user)
+    other_job = db_manager.insert_job("test-other", file, user)
+    for job_obj in (job, other_job):
+        db_manager.enqueue_created_job(job_obj)
+        db_manager.update_job(job_obj, canBePrinted=True)
+
+    socketio_mgr.sync_scheduler()
+    assert socketio_mgr.scheduler.contains_job(job.id)
+    assert socketio_mgr.scheduler.contains_job(other_job.id)
+
+    # After the first load only the changed jobs are read again
+    def get_printers(*_args, **_kwargs):
+        raise AssertionError("The whole queue was loaded again")
+
+    monkeypatch.setattr(db_manager, "get_printers", get_printers)
+
+    db_manager.delete_job(other_job)
+    db_manager.update_job(job, canBePrinted=False)
+    socketio_mgr.sync_scheduler()
+    assert not socketio_mgr.scheduler.contains_job(job.id)
+    assert not socketio_mgr.scheduler.contains_job(other_job.id)
+
+    db_manager.update_job(job, canBePrinted=True)
+    socketio_mgr.sync_scheduler()
+    assert socketio_mgr.scheduler.get_job_count() == 1
+    assert socketio_mgr.scheduler.contains_job(job.id)
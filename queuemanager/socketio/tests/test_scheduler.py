@@ -0,0 +1,152 @@
+"""
+This module implements the job scheduler testing.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.1.0"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import random
+
+import pytest
+
+from queuemanager.socketio.scheduler import JobScheduler, is_compatible, make_capability, make_requirement
+
+
+class ReferenceScheduler(object):
+    """ Linear implementation of the scheduler, used to check the results of the indexed one """
+    def __init__(self):
+        self.jobs = {}
+        self.printers = {}
+        self.next_rank = 0
+
+    def add_job(self, job_id, requirement):
+        self.jobs[job_id] = (self.next_rank, requirement)
+        self.next_rank += 1
+
+    def remove_job(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def set_printer(self, printer_id, capability, ready):
+        if ready:
+            self.printers[printer_id] = capability
+        else:
+            self.printers.pop(printer_id, None)
+
+    def find_job(self, capability):
+        jobs = sorted((rank, job_id) for job_id, (rank, requirement) in self.jobs.items()
+                      if is_compatible(capability, requirement))
+        return jobs[0][1] if jobs else None
+
+    def find_printer(self, requirement):
+        printer_ids = [printer_id for printer_id, capability in self.printers.items()
+                       if is_compatible(capability, requirement)]
+        return min(printer_ids) if printer_ids else None
+
+
+def _random_capability(rng, materials, extruder_types):
+    return make_capability((index, rng.choice(materials), rng.choice(extruder_types)) for index in range(2))
+
+
+def _random_requirement(rng, materials, extruder_types):
+    allowed_materials, allowed_extruder_types = [], []
+    for index in rng.sample(range(2), rng.randint(0, 2)):
+        allowed_materials.extend((material, index) for material in rng.sample(materials, rng.randint(1, 2)))
+        if rng.random() < 0.5:
+            allowed_extruder_types.append((rng.choice(extruder_types), index))
+    return make_requirement(allowed_materials, allowed_extruder_types)
+
+
+def test_compatibility():
+    capability = make_capability([(0, 1, 4), (1, 2, None)])
+
+    assert is_compatible(capability, make_requirement([], []))
+    assert is_compatible(capability, make_requirement([(1, 0), (3, 0)], [(4, 0)]))
+    assert is_compatible(capability, make_requirement([(2, 1)], []))
+    assert not is_compatible(capability, make_requirement([(2, 0)], []))
+    assert not is_compatible(capability, make_requirement([], [(4, 1)]))
+    assert not is_compatible(capability, make_requirement([(1, 2)], []))
+
+
+def test_head_of_line_job_skipped():
+    scheduler = JobScheduler()
+    scheduler.set_jobs([
+        (1, make_requirement([(2, 0)], [])),
+        (2, make_requirement([(1, 0)], [])),
+        (3, make_requirement([(1, 0)], []))
+    ])
+
+    # The first job doesn't fit the printer, so it gets the next compatible one
+    capability = make_capability([(0, 1, 4)])
+    assert scheduler.find_job(capability) == 2
+    scheduler.remove_job(2)
+    assert scheduler.find_job(capability) == 3
+    scheduler.remove_job(3)
+    assert scheduler.find_job(capability) is None
+    assert scheduler.find_job(make_capability([(0, 2, 4)])) == 1
+
+    scheduler.set_printer(7, capability, ready=True)
+    scheduler.set_printer(5, make_capability([(0, 2, 4)]), ready=True)
+    assert scheduler.find_printer(make_requirement([(1, 0)], [])) == 7
+    assert scheduler.find_printer(make_requirement([], [])) == 5
+    scheduler.set_printer(5, make_capability([(0, 2, 4)]), ready=False)
+    assert scheduler.find_printer(make_requirement([(2, 0)], [])) is None
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_scheduler_matches_reference(seed):
+    # The operations are generated from the seed, so every run checks the same fleet and queue
+    rng = random.Random(seed)
+    materials = list(range(1, 9))
+    extruder_types = list(range(1, 5))
+    scheduler = JobScheduler()
+    reference = ReferenceScheduler()
+
+    for job_id in range(1, 2001):
+        requirement = _random_requirement(rng, materials, extruder_types)
+        scheduler.add_job(job_id, requirement)
+        reference.add_job(job_id, requirement)
+
+    for printer_id in range(1, 501):
+        capability = _random_capability(rng, materials, extruder_types)
+        ready = rng.random() < 0.3
+        scheduler.set_printer(printer_id, capability, ready)
+        reference.set_printer(printer_id, capability, ready)
+
+    next_job_id = 2001
+    for _ in range(3000):
+        operation = rng.random()
+        if operation < 0.5:
+            # A printer gets free and prints the best job it can
+            capability = _random_capability(rng, materials, extruder_types)
+            job_id = scheduler.find_job(capability)
+            assert job_id == reference.find_job(capability)
+            if job_id is not None:
+                scheduler.remove_job(job_id)
+                reference.remove_job(job_id)
+        elif operation < 0.7:
+            # A new job looks for a ready printer
+            requirement = _random_requirement(rng, materials, extruder_types)
+            assert scheduler.find_printer(requirement) == reference.find_printer(requirement)
+            scheduler.add_job(next_job_id, requirement)
+            reference.add_job(next_job_id, requirement)
+            next_job_id += 1
+        elif operation < 0.85:
+            # A printer changes its state or its extruders
+            printer_id = rng.randint(1, 500)
+            capability = _random_capability(rng, materials, extruder_types)
+            ready = rng.random() < 0.5
+            scheduler.set_printer(printer_id, capability, ready)
+            reference.set_printer(printer_id, capability, ready)
+        else:
+            # A job is removed from the queue
+            job_id = rng.randint(1, next_job_id - 1)
+            scheduler.remove_job(job_id)
+            reference.remove_job(job_id)
+
+    assert scheduler.get_job_count() == len(reference.jobs)
+    assert scheduler.get_ready_printer_ids() == sorted(reference.printers)
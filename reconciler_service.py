@@ -0,0 +1,48 @@
+"""
+This file implements the way to run the file storage reconciler and tiering service.
+"""
+
+__author__ = "Marc Bermejo"
+__credits__ = ["Marc Bermejo"]
+__license__ = "GPL-3.0"
+__version__ = "0.0.1"
+__maintainer__ = "Marc Bermejo"
+__email__ = "mbermejo@bcn3dtechnologies.com"
+__status__ = "Development"
+
+import argparse
+import signal
+import threading
+
+from queuemanager import create_app
+
+parser = argparse.ArgumentParser(description='Run the queue manager file storage reconciler')
+parser.add_argument('--interval', type=float, default=1.0,
+                    help='Seconds between the reconciled batches (Default: 1.0)')
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    app = create_app(__name__, enabled_modules={"app-database", "file-storage"})
+
+    from queuemanager.file_storage import StorageReconciler, StorageTiering, file_mgr
+    reconciler = StorageReconciler(app)
+    # The tiering moves the old files to the cold storage or, with a remote storage backend, removes its local copy
+    tiering = StorageTiering(app) if file_mgr.cold_storage is not None or not file_mgr.storage.is_local else None
+
+    def stop(_signum, _frame):
+        reconciler.stop()
+        app.logger.info("Reconciler counters: {}".format(dict(reconciler.counters)))
+        if tiering is not None:
+            tiering.stop()
+            app.logger.info("Tiering counters: {}".format(dict(tiering.counters)))
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if tiering is not None:
+        app.logger.info("Starting the file storage tiering...")
+        threading.Thread(target=tiering.run, kwargs={"interval": args.interval}, daemon=True).start()
+
+    app.logger.info("Starting the file storage reconciler...")
+    reconciler.run(interval=args.interval)
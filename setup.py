@@ -27,6 +27,11 @@ setup(
         'eventlet',
         'psycopg2',
         'redis',
-        'parse'
-    ]
+        'parse',
+        'numpy'
+    ],
+    extras_require={
+        's3': ['boto3'],
+        'zstd': ['zstandard']
+    }
 )